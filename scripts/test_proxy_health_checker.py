@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试代理健康检查（ProxyHealthChecker）
+使用本地 http.server 充当代理和检查目标，不访问外部网络
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+src_dir = os.path.join(project_root, 'src')
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from space_planning.spider.proxy_verifier import ProxyHealthChecker
+
+TARGET_URL = 'http://health-check.local/ping'
+
+
+def make_handler(status):
+    """代理请求（GET 绝对地址）一律返回 status"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(status)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, format, *args):
+            pass
+    return Handler
+
+
+def start_server(status):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(status))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def proxy_of(port):
+    url = f'http://127.0.0.1:{port}'
+    return {'http': url, 'https': url}
+
+
+def unused_port():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(200))
+    port = server.server_address[1]
+    server.server_close()
+    return port
+
+
+def test_filter_healthy():
+    """可用代理保留，返回错误状态码的代理剔除"""
+    good, bad = start_server(200), start_server(502)
+    try:
+        checker = ProxyHealthChecker(target_url=TARGET_URL, timeout=2, workers=4)
+        proxies = [proxy_of(good.server_address[1]), proxy_of(bad.server_address[1])]
+        healthy = checker.filter_healthy(proxies)
+        assert healthy == proxies[:1], healthy
+        print(f"准入检查: {len(proxies)} 个代理，保留 {len(healthy)} 个")
+    finally:
+        good.shutdown()
+        bad.shutdown()
+
+
+def test_all_failed_is_inconclusive():
+    """全部检查失败时不判定为代理不可用：不记录结果，代理全部保留"""
+    checker = ProxyHealthChecker(target_url=TARGET_URL, timeout=1, workers=4)
+    proxies = [proxy_of(unused_port()), proxy_of(unused_port())]
+    assert checker.check_all(proxies) == {}
+    assert checker.filter_healthy(proxies) == proxies
+    assert checker.get_stats() == {}
+    print("全部检查失败: 结果不计入，代理全部保留")
+
+
+def main() -> int:
+    test_filter_healthy()
+    test_all_failed_is_inconclusive()
+    print("测试完成")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文压缩存储模块
+提供基于共享字典的正文压缩/解压，以及读取压缩正文所需的SQL函数
+
+政策正文篇幅长、措辞高度重复，使用跨记录共享的字典压缩后通常可缩小数倍。
+压缩后的正文以 BLOB 保存（头部记录编码方式和字典ID），未压缩的旧记录仍为 TEXT，
+读取时通过 decompress_value() 或 SQL 函数 policy_content() 透明解压，两种格式可以混存。
+
+优先使用 zstd（需安装 zstandard 包，支持训练字典）；未安装时可使用标准库 zlib 的预设字典。
+"""
+
+import zlib
+import struct
+import random
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+# 存储格式
+CONTENT_COMPRESSION_NONE = 'none'
+CONTENT_COMPRESSION_ZSTD = 'zstd'
+CONTENT_COMPRESSION_ZLIB = 'zlib'
+SUPPORTED_COMPRESSIONS = (CONTENT_COMPRESSION_NONE, CONTENT_COMPRESSION_ZSTD, CONTENT_COMPRESSION_ZLIB)
+
+# BLOB头部：1字节编码方式 + 4字节字典ID（大端）
+_CODEC_MARKERS = {CONTENT_COMPRESSION_ZSTD: 0x01, CONTENT_COMPRESSION_ZLIB: 0x02}
+_MARKER_CODECS = {v: k for k, v in _CODEC_MARKERS.items()}
+_HEADER = struct.Struct('>BI')
+
+# 字典参数
+ZSTD_DICT_SIZE = 112 * 1024     # zstd 训练字典大小
+ZSTD_LEVEL = 9
+ZLIB_DICT_SIZE = 32 * 1024      # zlib 预设字典最大32KB
+ZLIB_LEVEL = 9
+DICT_SAMPLE_COUNT = 2000        # 训练字典的采样记录数
+
+# 短于该长度（字节）的正文压缩收益很小，保持原样
+MIN_COMPRESS_BYTES = 256
+
+_dictionaries = {}
+_dictionaries_lock = threading.Lock()
+_codec_local = threading.local()
+
+
+def ensure_schema(c):
+    """创建压缩字典表"""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS content_dict (
+            id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            created_time TEXT
+        )
+    ''')
+
+
+def load_dictionaries(c):
+    """把数据库中的压缩字典加载到进程缓存（解压时按字典ID查找）"""
+    try:
+        c.execute('SELECT id, codec, data FROM content_dict')
+        rows = c.fetchall()
+    except Exception:
+        # 旧数据库没有字典表
+        return 0
+    with _dictionaries_lock:
+        for dict_id, codec, data in rows:
+            _dictionaries[dict_id] = (codec, bytes(data))
+    return len(rows)
+
+
+def get_active_dictionary(c, codec):
+    """
+    获取指定编码方式最新的字典ID
+
+    Returns:
+        int: 字典ID，没有可用字典时返回None
+    """
+    c.execute('SELECT id FROM content_dict WHERE codec=? ORDER BY created_time DESC, rowid DESC LIMIT 1',
+              (codec,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+
+def resolve_codec(codec):
+    """检查编码方式是否可用（未安装 zstandard 时 zstd 退回 zlib）"""
+    if codec not in SUPPORTED_COMPRESSIONS:
+        logger.warning(f"不支持的正文压缩格式 {codec}，不压缩")
+        return CONTENT_COMPRESSION_NONE
+    if codec == CONTENT_COMPRESSION_ZSTD and not ZSTD_AVAILABLE:
+        logger.warning("未安装 zstandard 包，正文压缩改用zlib")
+        return CONTENT_COMPRESSION_ZLIB
+    return codec
+
+
+def _build_zlib_dictionary(samples):
+    """
+    由样本构建zlib预设字典
+
+    zlib 没有字典训练功能：取在样本中最常出现的行（公文抬头、落款、固定表述等），
+    出现越多的放在越靠后的位置（距离越近，匹配代价越低）。
+    """
+    counts = {}
+    for text in samples:
+        for line in set(text.splitlines()):
+            line = line.strip()
+            if 4 <= len(line) <= 200:
+                counts[line] = counts.get(line, 0) + 1
+    common = sorted((item for item in counts.items() if item[1] > 1), key=lambda item: item[1])
+    data = b''
+    for line, _ in reversed(common):
+        encoded = line.encode('utf-8') + b'\n'
+        if len(data) + len(encoded) > ZLIB_DICT_SIZE:
+            break
+        data = encoded + data
+    if not data:
+        # 没有重复行时退回到样本开头的拼接
+        data = ''.join(text[:200] for text in samples).encode('utf-8')[-ZLIB_DICT_SIZE:]
+    return data
+
+
+def train_dictionary(c, codec, samples):
+    """
+    由正文样本训练字典并保存到数据库
+
+    Args:
+        c: 数据库游标
+        codec: CONTENT_COMPRESSION_ZSTD 或 CONTENT_COMPRESSION_ZLIB
+        samples: 正文样本列表
+
+    Returns:
+        int: 新字典ID，样本不足时返回None
+    """
+    samples = [s for s in samples if s]
+    if not samples:
+        return None
+    if len(samples) > DICT_SAMPLE_COUNT:
+        samples = random.sample(samples, DICT_SAMPLE_COUNT)
+
+    if codec == CONTENT_COMPRESSION_ZSTD:
+        try:
+            trained = zstandard.train_dictionary(ZSTD_DICT_SIZE, [s.encode('utf-8') for s in samples])
+            data = trained.as_bytes()
+        except zstandard.ZstdError as e:
+            # 样本过少时无法训练，退回为原始内容字典
+            logger.warning(f"zstd字典训练失败，使用原始样本作为字典: {e}")
+            data = ''.join(samples).encode('utf-8')[-ZSTD_DICT_SIZE:]
+    else:
+        data = _build_zlib_dictionary(samples)
+
+    # 字典ID取内容摘要，归档库复制字典后ID仍然一致
+    dict_id = int.from_bytes(hashlib.blake2b(data, digest_size=4).digest(), 'big') & 0x7fffffff
+    with _dictionaries_lock:
+        _dictionaries[dict_id] = (codec, data)
+    save_dictionary(c, dict_id)
+    logger.info(f"正文压缩字典已生成: {codec} #{dict_id}（{len(data)} 字节，样本 {len(samples)} 条）")
+    return dict_id
+
+
+def save_dictionary(c, dict_id):
+    """把已加载的字典写入游标所在的数据库（归档库等需要解压同一字典的库）"""
+    codec, data = _get_dictionary(dict_id)
+    c.execute('''
+        INSERT OR IGNORE INTO content_dict (id, codec, data, created_time)
+        VALUES (?, ?, ?, ?)
+    ''', (dict_id, codec, data, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+
+def _get_dictionary(dict_id):
+    entry = _dictionaries.get(dict_id)
+    if entry is None:
+        raise ValueError(f"未找到正文压缩字典 #{dict_id}")
+    return entry
+
+
+def _zstd_compressor(dict_id):
+    """获取线程本地的zstd压缩器（压缩器对象不能跨线程共享）"""
+    cache = getattr(_codec_local, 'compressors', None)
+    if cache is None:
+        cache = _codec_local.compressors = {}
+    compressor = cache.get(dict_id)
+    if compressor is None:
+        _, data = _get_dictionary(dict_id)
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zstandard.ZstdCompressionDict(data))
+        cache[dict_id] = compressor
+    return compressor
+
+
+def _zstd_decompressor(dict_id):
+    """获取线程本地的zstd解压器"""
+    cache = getattr(_codec_local, 'decompressors', None)
+    if cache is None:
+        cache = _codec_local.decompressors = {}
+    decompressor = cache.get(dict_id)
+    if decompressor is None:
+        _, data = _get_dictionary(dict_id)
+        decompressor = zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(data))
+        cache[dict_id] = decompressor
+    return decompressor
+
+
+def compress_text(text, dict_id):
+    """
+    使用指定字典压缩正文
+
+    Returns:
+        bytes 或 str: 压缩后的BLOB；正文过短或压缩无收益时返回原文
+    """
+    if text is None or dict_id is None:
+        return text
+    raw = str(text).encode('utf-8')
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return text
+
+    codec, data = _get_dictionary(dict_id)
+    if codec == CONTENT_COMPRESSION_ZSTD:
+        payload = _zstd_compressor(dict_id).compress(raw)
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -15, zdict=data)
+        payload = compressor.compress(raw) + compressor.flush()
+
+    blob = _HEADER.pack(_CODEC_MARKERS[codec], dict_id) + payload
+    return blob if len(blob) < len(raw) else text
+
+
+def decompress_value(value):
+    """
+    解压数据库中读出的正文值（TEXT 原样返回）
+
+    Raises:
+        ValueError: BLOB格式无法识别或字典不存在
+    """
+    if not isinstance(value, (bytes, memoryview)):
+        return value
+    value = bytes(value)
+    if len(value) < _HEADER.size:
+        raise ValueError("正文BLOB格式无效")
+    marker, dict_id = _HEADER.unpack_from(value)
+    codec = _MARKER_CODECS.get(marker)
+    payload = value[_HEADER.size:]
+    if codec == CONTENT_COMPRESSION_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("读取zstd压缩的正文需要安装 zstandard 包")
+        raw = _zstd_decompressor(dict_id).decompress(payload)
+    elif codec == CONTENT_COMPRESSION_ZLIB:
+        _, data = _get_dictionary(dict_id)
+        decompressor = zlib.decompressobj(-15, zdict=data)
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    else:
+        raise ValueError(f"未知的正文压缩格式: {marker}")
+    return raw.decode('utf-8')
+
+
+def is_compressed(value):
+    """正文值是否为压缩格式"""
+    return isinstance(value, (bytes, memoryview))
+
+
+def register_functions(conn):
+    """注册 policy_content() SQL函数（读取正文时透明解压）"""
+    conn.create_function('policy_content', 1, decompress_value, deterministic=True)
+    return conn
@@ -31,6 +31,19 @@ DATABASE_CONFIG = {
     'backup_enabled': True,     # 是否启用数据库备份
     'backup_interval': 7,       # 备份间隔（天）
     'max_backup_count': 10,     # 最大备份文件数量
+    'backup_compression': 'none',  # 备份压缩格式（none/gzip/zstd，zstd需安装zstandard）
+    'journal_mode': 'WAL',      # 日志模式（WAL允许读写并发）
+    'pool_size': 8,             # 数据库连接池最大连接数
+    'pool_timeout': 30,         # 等待连接/锁的超时时间（秒）
+    'cache_size_kb': 20000,     # 每个连接的页缓存大小（KB）
+    'mmap_size': 268435456,     # 内存映射大小（字节）
+    'fts_tokenizer': 'cjk',     # 全文检索分词模式（cjk: 中文按字切分；unicode61: 旧版）
+    'content_compression': 'none',  # 正文压缩存储（none/zstd/zlib，zstd需安装zstandard）
+    'fts_maintenance_interval': 1800,  # 全文索引合并间隔（秒，0表示不自动维护）
+    'fts_merge_pages': 500,     # 每次merge最多处理的页数
+    'fts_merge_max_steps': 20,  # 每轮维护最多执行的merge次数
+    'archive_cutoff_years': 0,  # 早于N年前1月1日发布的政策移入按年份划分的归档库（0表示不归档）
+    'archive_batch_size': 1000, # 每批归档的记录数
 }
 
 # 爬虫配置
@@ -183,6 +196,12 @@ class AppConfig:
         os.makedirs(backup_dir, exist_ok=True)
         return backup_dir
     
+    def get_archive_dir(self):
+        """获取归档目录"""
+        archive_dir = self.config.get('archive_dir', os.path.join(self.app_data_dir, 'archive'))
+        os.makedirs(archive_dir, exist_ok=True)
+        return archive_dir
+    
     def update_config(self, key, value):
         """更新配置"""
         self.config[key] = value
@@ -5,6 +5,10 @@ import shutil
 from datetime import datetime, timedelta
 import json
 import logging
+import re
+import hashlib
+import heapq
+import threading
 
 # 导入配置模块
 from . import config
@@ -14,7 +18,10 @@ from .exceptions import (
     DatabaseIntegrityError,
     DatabaseError
 )
-from .db_connection import get_db_connection
+from .db_connection import (get_db_connection, configure_connection, close_db_pool, get_pool_stats,
+                            begin_immediate, commit_batch, rollback_batch, is_nested_scope)
+from . import fts
+from . import compression
 
 logger = logging.getLogger(__name__)
 
@@ -37,17 +44,139 @@ def get_conn():
     # 确保数据库目录存在
     try:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        return sqlite3.connect(db_path)
+        return configure_connection(sqlite3.connect(db_path))
     except sqlite3.Error as e:
         raise DatabaseConnectionError(f"无法连接数据库 {db_path}: {e}") from e
     except OSError as e:
         raise DatabaseConnectionError(f"无法创建数据库目录: {e}") from e
 
-def init_db():
-    """初始化数据库"""
-    conn = get_conn()
-    c = conn.cursor()
+# 去重键相关
+_WHITESPACE_RE = re.compile(r'\s+')
+_dedup_backfill_done = threading.Event()
+_dedup_backfill_lock = threading.Lock()
+_dedup_backfill_thread = None
+
+def normalize_content(content):
+    """规范化政策正文（去除所有空白），用于计算内容哈希"""
+    if not content:
+        return ''
+    return _WHITESPACE_RE.sub('', str(content))
+
+def compute_content_hash(content):
+    """计算规范化正文的BLAKE2b哈希（32位十六进制）"""
+    return hashlib.blake2b(normalize_content(content).encode('utf-8'), digest_size=16).hexdigest()
+
+def compute_title_date_key(title, pub_date):
+    """计算 标题+发布日期 去重键（32位十六进制）"""
+    raw = f"{title or ''}\x1f{pub_date or ''}"
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+def _migrate_dedup_columns(c):
+    """数据库迁移：添加去重哈希列及索引"""
+    c.execute('PRAGMA table_info(policy)')
+    columns = {row[1] for row in c.fetchall()}
+    if 'content_hash' not in columns:
+        logger.info("正在添加content_hash字段到现有数据库...")
+        c.execute('ALTER TABLE policy ADD COLUMN content_hash TEXT')
+    if 'title_date_key' not in columns:
+        logger.info("正在添加title_date_key字段到现有数据库...")
+        c.execute('ALTER TABLE policy ADD COLUMN title_date_key TEXT')
+    
+    # title_date_key 唯一（历史重复数据在回填时保留NULL，由 deduplicate_database 清理）
+    c.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_policy_title_date_key
+        ON policy(title_date_key) WHERE title_date_key IS NOT NULL
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_policy_content_hash ON policy(content_hash)
+    ''')
+    # 标题+来源组合去重使用覆盖索引
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_policy_title_source ON policy(title, source)
+    ''')
+    # 用于快速定位尚未回填的记录
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_policy_hash_pending ON policy(id) WHERE content_hash IS NULL
+    ''')
+
+def backfill_dedup_keys(batch_size=1000, stop_event=None):
+    """
+    为历史记录回填 content_hash 和 title_date_key
+    
+    分批处理，每批一个短事务，不会长时间阻塞写入。
+    与已有记录 标题+日期 冲突的历史重复行保持 title_date_key 为 NULL。
+    
+    Returns:
+        int: 本次回填的记录数
+    """
+    total = 0
+    last_id = 0
+    while stop_event is None or not stop_event.is_set():
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            c.execute('''SELECT id, title, pub_date, content FROM policy
+                         WHERE content_hash IS NULL AND id > ? ORDER BY id LIMIT ?''',
+                      (last_id, batch_size))
+            rows = c.fetchall()
+            if not rows:
+                break
+            c.executemany('UPDATE policy SET content_hash=? WHERE id=?',
+                          [(compute_content_hash(compression.decompress_value(r[3])), r[0]) for r in rows])
+            c.executemany('UPDATE OR IGNORE policy SET title_date_key=? WHERE id=?',
+                          [(compute_title_date_key(r[1], r[2]), r[0]) for r in rows])
+            last_id = rows[-1][0]
+            total += len(rows)
+    else:
+        return total
+    
+    _dedup_backfill_done.set()
+    if total:
+        logger.info(f"去重键回填完成，共处理 {total} 条记录")
+    return total
+
+def start_dedup_key_backfill():
+    """在后台线程中回填去重键（重复调用时不会重复启动）"""
+    global _dedup_backfill_thread
+    with _dedup_backfill_lock:
+        if _dedup_backfill_thread is not None and _dedup_backfill_thread.is_alive():
+            return _dedup_backfill_thread
+        
+        _dedup_backfill_done.clear()
+        
+        def run():
+            try:
+                backfill_dedup_keys()
+            except Exception as e:
+                logger.error(f"去重键回填失败: {e}", exc_info=True)
+        
+        _dedup_backfill_thread = threading.Thread(target=run, name='dedup-key-backfill', daemon=True)
+        _dedup_backfill_thread.start()
+        return _dedup_backfill_thread
+
+def is_dedup_backfill_done():
+    """去重键是否已全部回填（未完成时插入去重会额外使用旧的全字段比较）"""
+    return _dedup_backfill_done.is_set()
+
+# 正文压缩：按编码方式缓存当前使用的字典ID
+_content_dict_cache = {}
+
+def _get_content_dict_id(c):
+    """
+    获取入库时压缩正文使用的字典ID
     
+    Returns:
+        int: 字典ID；未启用压缩（content_compression='none'）或尚未生成字典时返回None
+    """
+    codec = config.app_config.get_database_config().get(
+        'content_compression', compression.CONTENT_COMPRESSION_NONE)
+    if codec == compression.CONTENT_COMPRESSION_NONE:
+        return None
+    if codec not in _content_dict_cache:
+        _content_dict_cache[codec] = compression.get_active_dictionary(c, compression.resolve_codec(codec))
+    return _content_dict_cache[codec]
+
+def _ensure_policy_schema(c):
+    """创建/迁移 policy 表、索引和系统信息表（热库与归档库共用）"""
     # 创建主表
     c.execute('''
         CREATE TABLE IF NOT EXISTS policy (
@@ -71,12 +200,11 @@ def init_db():
         c.execute('ALTER TABLE policy ADD COLUMN category TEXT')
         logger.info("category字段添加完成")
     
-    # 创建全文检索表
-    c.execute('''
-        CREATE VIRTUAL TABLE IF NOT EXISTS policy_fts USING fts5(
-            title, content, level, content='policy', content_rowid='id'
-        )
-    ''')
+    # 去重哈希列迁移
+    _migrate_dedup_columns(c)
+    
+    # 正文压缩字典表
+    compression.ensure_schema(c)
     
     # 创建索引以提高查询性能
     # 1. level字段索引（用于按机构筛选）
@@ -122,6 +250,20 @@ def init_db():
             update_time TEXT
         )
     ''')
+
+def init_db():
+    """
+    初始化数据库
+    
+    全文索引由 policy 表上的触发器同步，触发器调用应用注册的SQL函数
+    （policy_content、fts_segment，见 fts.register_functions）。
+    因此写入 policy 表必须使用 configure_connection() 配置过的连接（连接池已自动配置）；
+    sqlite3 命令行、临时脚本或旧版本程序未注册这些函数，只能只读访问，写入会报 "no such function"。
+    """
+    conn = get_conn()
+    c = conn.cursor()
+    
+    _ensure_policy_schema(c)
     
     # 初始化系统信息
     c.execute('''
@@ -129,26 +271,168 @@ def init_db():
         VALUES (?, ?, ?)
     ''', ('db_version', '2.0', datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
     
+    # 创建/迁移全文检索表（分词模式变化时自动重建索引）
+    fts.ensure_fts_schema(
+        c, config.app_config.get_database_config().get('fts_tokenizer', fts.FTS_TOKENIZER_CJK))
+    
+    # 加载正文压缩字典（解压时使用）
+    compression.load_dictionaries(c)
+    _content_dict_cache.clear()
+    
     conn.commit()
     conn.close()
     
+    # 归档库与热库保持相同的表结构和分词模式
+    for year in get_archive_years():
+        try:
+            _init_archive_db(year)
+        except Exception as e:
+            logger.error(f"初始化归档库 {year} 失败: {e}", exc_info=True)
+    
+    # 后台回填历史记录的去重键
+    start_dedup_key_backfill()
+    
+    # 定期合并全文索引段
+    start_fts_maintenance_scheduler()
+    
     logger.info(f"数据库初始化完成: {get_database_path()}")
 
-def backup_database():
-    """备份数据库"""
+# 备份文件命名
+BACKUP_FILE_PREFIX = 'policy_backup_'
+BACKUP_COMPRESSION_NONE = 'none'
+BACKUP_COMPRESSION_GZIP = 'gzip'
+BACKUP_COMPRESSION_ZSTD = 'zstd'
+BACKUP_EXTENSIONS = {
+    BACKUP_COMPRESSION_NONE: '.db',
+    BACKUP_COMPRESSION_GZIP: '.db.gz',
+    BACKUP_COMPRESSION_ZSTD: '.db.zst',
+}
+
+# 在线备份每步复制的页数（步间释放GIL并回调进度）
+BACKUP_PAGES_PER_STEP = 1024
+
+_backup_executor = None
+_backup_future = None
+_backup_lock = threading.Lock()
+
+def _is_backup_filename(filename):
+    """是否为本系统生成的备份文件（含压缩格式）"""
+    return filename.startswith(BACKUP_FILE_PREFIX) and any(
+        filename.endswith(ext) for ext in BACKUP_EXTENSIONS.values())
+
+def _get_backup_compression(filename):
+    """根据文件名判断备份压缩格式"""
+    for method, ext in BACKUP_EXTENSIONS.items():
+        if method != BACKUP_COMPRESSION_NONE and filename.endswith(ext):
+            return method
+    return BACKUP_COMPRESSION_NONE
+
+def _import_zstd():
+    """zstd为可选依赖（zstandard包），未安装时返回None"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+def _compress_file(src_path, dst_path, method):
+    """流式压缩文件"""
+    with open(src_path, 'rb') as src:
+        if method == BACKUP_COMPRESSION_GZIP:
+            import gzip
+            with gzip.open(dst_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        elif method == BACKUP_COMPRESSION_ZSTD:
+            zstd = _import_zstd()
+            with open(dst_path, 'wb') as dst:
+                zstd.ZstdCompressor(level=3, threads=-1).copy_stream(src, dst)
+        else:
+            raise ValueError(f"不支持的压缩格式: {method}")
+
+def _decompress_file(src_path, dst_path, method):
+    """流式解压文件"""
+    with open(dst_path, 'wb') as dst:
+        if method == BACKUP_COMPRESSION_GZIP:
+            import gzip
+            with gzip.open(src_path, 'rb') as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        elif method == BACKUP_COMPRESSION_ZSTD:
+            zstd = _import_zstd()
+            if zstd is None:
+                raise DatabaseError("恢复zstd压缩备份需要安装 zstandard 包")
+            with open(src_path, 'rb') as src:
+                zstd.ZstdDecompressor().copy_stream(src, dst)
+        else:
+            raise ValueError(f"不支持的压缩格式: {method}")
+
+def _online_copy(src_path, dst_path, progress_callback=None):
+    """
+    使用 sqlite3 备份API在线复制数据库
+    
+    源连接持有一个读事务，保证得到一致的快照；WAL模式下写入者不会被阻塞，
+    复制也不会因为并发写入而重新开始。
+    """
+    source = sqlite3.connect(src_path, timeout=30)
+    dest = sqlite3.connect(dst_path)
+    try:
+        source.execute('BEGIN')
+        source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        
+        def progress(status, remaining, total):
+            if progress_callback:
+                try:
+                    progress_callback(total - remaining, total)
+                except Exception as e:
+                    logger.warning(f"备份进度回调失败: {e}")
+        
+        source.backup(dest, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+        source.rollback()
+    finally:
+        dest.close()
+        source.close()
+
+def backup_database(compression=None, progress_callback=None):
+    """
+    备份数据库（在线备份，不阻塞并发写入）
+    
+    Args:
+        compression: 'none' / 'gzip' / 'zstd'，默认读取配置 backup_compression
+        progress_callback: 进度回调 callback(copied_pages, total_pages)
+    
+    Returns:
+        bool: 是否成功
+    """
+    tmp_path = None
     try:
         db_path = get_database_path()
         if not os.path.exists(db_path):
             logger.warning("数据库文件不存在，无需备份")
             return False
         
+        if compression is None:
+            compression = config.app_config.get_database_config().get(
+                'backup_compression', BACKUP_COMPRESSION_NONE)
+        if compression not in BACKUP_EXTENSIONS:
+            logger.warning(f"未知的备份压缩格式 {compression}，不压缩")
+            compression = BACKUP_COMPRESSION_NONE
+        if compression == BACKUP_COMPRESSION_ZSTD and _import_zstd() is None:
+            logger.warning("未安装 zstandard 包，改用gzip压缩备份")
+            compression = BACKUP_COMPRESSION_GZIP
+        
         backup_dir = get_backup_dir()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_filename = f"policy_backup_{timestamp}.db"
+        backup_filename = f"{BACKUP_FILE_PREFIX}{timestamp}{BACKUP_EXTENSIONS[compression]}"
         backup_path = os.path.join(backup_dir, backup_filename)
+        tmp_path = os.path.join(backup_dir, f".{BACKUP_FILE_PREFIX}{timestamp}.db.tmp")
         
-        # 复制数据库文件
-        shutil.copy2(db_path, backup_path)
+        # 在线复制到临时文件，完成后再压缩/改名，避免留下不完整的备份
+        _online_copy(db_path, tmp_path, progress_callback)
+        if compression == BACKUP_COMPRESSION_NONE:
+            os.replace(tmp_path, backup_path)
+        else:
+            _compress_file(tmp_path, backup_path, compression)
+            os.remove(tmp_path)
+        tmp_path = None
         
         # 更新最后备份时间
         config.app_config.update_config('last_backup_time', datetime.now().isoformat())
@@ -159,12 +443,46 @@ def backup_database():
         cleanup_old_backups()
         
         return True
+    except sqlite3.Error as e:
+        logger.error(f"数据库备份失败（数据库错误）: {e}", exc_info=True)
+        return False
     except OSError as e:
         logger.error(f"数据库备份失败（文件操作错误）: {e}", exc_info=True)
         return False
     except Exception as e:
         logger.error(f"数据库备份失败（未知错误）: {e}", exc_info=True)
         return False
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def backup_database_async(compression=None, progress_callback=None):
+    """
+    在后台线程中备份数据库
+    
+    同一时间只运行一个备份任务，已有备份在进行时直接返回该任务。
+    
+    Returns:
+        concurrent.futures.Future: 结果为 backup_database() 的返回值
+    """
+    global _backup_executor, _backup_future
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with _backup_lock:
+        if _backup_future is not None and not _backup_future.done():
+            return _backup_future
+        if _backup_executor is None:
+            _backup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-backup')
+        _backup_future = _backup_executor.submit(backup_database, compression, progress_callback)
+        return _backup_future
+
+def is_backup_running():
+    """是否有后台备份正在进行"""
+    future = _backup_future
+    return future is not None and not future.done()
 
 def cleanup_old_backups():
     """清理旧的备份文件"""
@@ -175,7 +493,7 @@ def cleanup_old_backups():
         # 获取所有备份文件
         backup_files = []
         for filename in os.listdir(backup_dir):
-            if filename.startswith('policy_backup_') and filename.endswith('.db'):
+            if _is_backup_filename(filename):
                 file_path = os.path.join(backup_dir, filename)
                 backup_files.append((file_path, os.path.getmtime(file_path)))
         
@@ -202,11 +520,11 @@ def clear_database():
             c.execute('SELECT COUNT(*) FROM policy')
             policy_count = c.fetchone()[0]
             
-            # 删除所有政策数据
-            c.execute('DELETE FROM policy')
-            
-            # 清理FTS表
-            c.execute('DELETE FROM policy_fts')
+            # 整表删除时暂停触发器，直接清空全文索引（外部内容FTS表使用 delete-all 命令），
+            # 避免逐行触发 'delete'
+            with fts.triggers_suspended(c):
+                c.execute('DELETE FROM policy')
+                c.execute("INSERT INTO policy_fts(policy_fts) VALUES('delete-all')")
             
             # 重置自增ID
             c.execute('DELETE FROM sqlite_sequence WHERE name="policy"')
@@ -246,20 +564,134 @@ def should_backup_database():
         logger.error(f"检查备份状态失败: {e}", exc_info=True)
         return False
 
+# 增量爬取高水位（保存在 system_info，键为 crawl_watermark:<来源>）
+WATERMARK_KEY_PREFIX = 'crawl_watermark:'
+
+def get_crawl_watermark(source):
+    """
+    读取来源的增量爬取高水位
+
+    Returns:
+        dict: 高水位数据；没有记录或读取失败时返回None
+    """
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute('SELECT value FROM system_info WHERE key=?',
+                               (WATERMARK_KEY_PREFIX + source,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+    except Exception as e:
+        logger.warning(f"读取增量爬取高水位失败 [{source}]: {e}")
+        return None
+
+def save_crawl_watermark(source, watermark):
+    """保存来源的增量爬取高水位"""
+    try:
+        with get_db_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO system_info (key, value, update_time)
+                VALUES (?, ?, ?)
+            ''', (WATERMARK_KEY_PREFIX + source, json.dumps(watermark, ensure_ascii=False),
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        return True
+    except Exception as e:
+        logger.error(f"保存增量爬取高水位失败 [{source}]: {e}", exc_info=True)
+        return False
+
+def clear_crawl_watermarks(source_prefix=''):
+    """
+    清除增量爬取高水位（下次爬取将完整翻页）
+
+    Args:
+        source_prefix: 来源前缀，如 'guangdong' 清除广东省全部分类；为空时清除全部
+
+    Returns:
+        int: 清除的条数
+    """
+    try:
+        with get_db_connection() as conn:
+            prefix = WATERMARK_KEY_PREFIX + source_prefix
+            cur = conn.execute('DELETE FROM system_info WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+            return cur.rowcount
+    except Exception as e:
+        logger.error(f"清除增量爬取高水位失败: {e}", exc_info=True)
+        return 0
+
+# 列表接口协商得到的页大小（保存在 system_info，键为 page_size:<接口>）
+PAGE_SIZE_KEY_PREFIX = 'page_size:'
+
+def get_negotiated_page_size(endpoint):
+    """
+    读取列表接口协商得到的页大小记录
+
+    Returns:
+        dict: {'page_size': int, 'negotiated_at': str}；没有记录或读取失败时返回None
+    """
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute('SELECT value FROM system_info WHERE key=?',
+                               (PAGE_SIZE_KEY_PREFIX + endpoint,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+    except Exception as e:
+        logger.warning(f"读取列表页大小记录失败 [{endpoint}]: {e}")
+        return None
+
+def save_negotiated_page_size(endpoint, record):
+    """保存列表接口协商得到的页大小记录"""
+    try:
+        with get_db_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO system_info (key, value, update_time)
+                VALUES (?, ?, ?)
+            ''', (PAGE_SIZE_KEY_PREFIX + endpoint, json.dumps(record, ensure_ascii=False),
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        return True
+    except Exception as e:
+        logger.error(f"保存列表页大小记录失败 [{endpoint}]: {e}", exc_info=True)
+        return False
+
+def clear_negotiated_page_sizes(endpoint_prefix=''):
+    """
+    清除列表接口的页大小记录（下次爬取将重新试探）
+
+    Returns:
+        int: 清除的条数
+    """
+    try:
+        with get_db_connection() as conn:
+            prefix = PAGE_SIZE_KEY_PREFIX + endpoint_prefix
+            cur = conn.execute('DELETE FROM system_info WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+            return cur.rowcount
+    except Exception as e:
+        logger.error(f"清除列表页大小记录失败: {e}", exc_info=True)
+        return 0
+
 def insert_policy(level, title, pub_date, source, content, crawl_time, category=None):
     """插入政策数据 - 增强去重逻辑（使用上下文管理器）"""
     from .db_connection import get_db_connection
     
     try:
+        content_hash = compute_content_hash(content)
+        title_date_key = compute_title_date_key(title, pub_date)
+        # 0. 已归档（移出热库）的相同政策
+        archived_keys, archived_hashes = _archived_duplicate_keys([
+            {'pub_date': pub_date, 'title_date_key': title_date_key, 'content_hash': content_hash}
+        ])
+        if archived_keys or archived_hashes:
+            logger.debug(f"跳过已归档的重复政策: {title} ({pub_date})")
+            return None
+        
         with get_db_connection() as conn:
             c = conn.cursor()
             
-            # 增强去重逻辑：检查多种组合
-            # 1. 标题+日期组合
-            c.execute('SELECT id FROM policy WHERE title=? AND pub_date=?', (title, pub_date))
-            if c.fetchone():
-                logger.debug(f"跳过重复政策: {title} ({pub_date})")
-                return None
+            legacy_check = not is_dedup_backfill_done()
+            
+            # 增强去重逻辑：检查多种组合（均走索引）
+            # 1. 标题+日期组合（同时由唯一索引保证）
+            if legacy_check:
+                c.execute('SELECT id FROM policy WHERE title=? AND pub_date=?', (title, pub_date))
+                if c.fetchone():
+                    logger.debug(f"跳过重复政策: {title} ({pub_date})")
+                    return None
             
             # 2. 标题+来源组合（如果来源相同）
             if source:
@@ -268,26 +700,34 @@ def insert_policy(level, title, pub_date, source, content, crawl_time, category=
                     logger.debug(f"跳过重复政策: {title} (来源: {source})")
                     return None
             
-            # 3. 内容相似度检查（如果内容完全相同）
-            c.execute('SELECT id FROM policy WHERE content=?', (content,))
-            if c.fetchone():
+            # 3. 内容相同检查（比较规范化内容的哈希）
+            c.execute('SELECT id FROM policy WHERE content_hash=?', (content_hash,))
+            duplicate = c.fetchone()
+            if not duplicate and legacy_check:
+                c.execute('SELECT id FROM policy WHERE content_hash IS NULL AND content=?', (content,))
+                duplicate = c.fetchone()
+            if duplicate:
                 logger.debug(f"跳过重复内容政策: {title}")
                 return None
-            
-            c.execute('''INSERT INTO policy (level, title, pub_date, source, content, category, crawl_time)
-                         VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                      (level, title, pub_date, source, content, category, crawl_time))
+
+            # 标题+日期重复由唯一索引拦截（启用压缩时正文以BLOB保存）
+            stored_content = compression.compress_text(content, _get_content_dict_id(c))
+            c.execute('''INSERT INTO policy (level, title, pub_date, source, content, category, crawl_time,
+                                             content_hash, title_date_key)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         ON CONFLICT DO NOTHING''',
+                      (level, title, pub_date, source, stored_content, category, crawl_time,
+                       content_hash, title_date_key))
+            if c.rowcount == 0:
+                logger.debug(f"跳过重复政策: {title} ({pub_date})")
+                return None
             rowid = c.lastrowid
             
-            # 同步到FTS表
-            c.execute('INSERT INTO policy_fts(rowid, title, content, level) VALUES (?, ?, ?, ?)',
-                      (rowid, title, content, level))
-            
-            # 上下文管理器会自动commit
+            # 全文索引由触发器同步，上下文管理器会自动commit
         
-        # 检查是否需要备份（在连接关闭后）
+        # 检查是否需要备份（在连接关闭后，后台执行不阻塞入库）
         if should_backup_database():
-            backup_database()
+            backup_database_async()
         
         return rowid
     except DatabaseIntegrityError as e:
@@ -303,9 +743,284 @@ def insert_policy(level, title, pub_date, source, content, crawl_time, category=
         logger.error(f"插入政策失败（未知错误）: {e}", exc_info=True)
         return None
 
-def deduplicate_database():
-    """清理数据库中的重复记录（使用上下文管理器）"""
-    from .db_connection import get_db_connection
+# 批量插入结果状态
+INSERT_STATUS_INSERTED = 'inserted'
+INSERT_STATUS_DUP_TITLE_DATE = 'duplicate_title_date'
+INSERT_STATUS_DUP_TITLE_SOURCE = 'duplicate_title_source'
+INSERT_STATUS_DUP_CONTENT = 'duplicate_content'
+INSERT_STATUS_INVALID = 'invalid'
+
+# 批量插入默认批大小
+DEFAULT_BULK_BATCH_SIZE = 500
+
+# SQLite单条语句的参数上限（兼容旧版本的999限制）
+_SQLITE_MAX_VARIABLES = 900
+
+
+def _normalize_policy_record(policy):
+    """
+    将政策记录统一转换为字典
+
+    支持字典格式，以及 (id, level, title, pub_date, source, content[, category]) 元组格式
+
+    Returns:
+        dict或None（格式无法识别时）
+    """
+    if isinstance(policy, dict):
+        return {
+            'level': policy.get('level', ''),
+            'title': policy.get('title', ''),
+            'pub_date': policy.get('pub_date', ''),
+            'source': policy.get('source', ''),
+            'content': policy.get('content', '') or '',
+            'category': policy.get('category'),
+            'crawl_time': policy.get('crawl_time') or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+    if isinstance(policy, (list, tuple)) and len(policy) >= 6:
+        return {
+            'level': policy[1],
+            'title': policy[2],
+            'pub_date': policy[3],
+            'source': policy[4],
+            'content': policy[5] or '',
+            'category': policy[6] if len(policy) > 6 else None,
+            'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+    return None
+
+
+def _fetch_existing_keys(c, column_sql, values):
+    """分块执行 IN 查询，返回命中的行"""
+    rows = []
+    values = list(values)
+    for start in range(0, len(values), _SQLITE_MAX_VARIABLES):
+        chunk = values[start:start + _SQLITE_MAX_VARIABLES]
+        placeholders = ','.join('?' * len(chunk))
+        c.execute(column_sql.format(placeholders=placeholders), chunk)
+        rows.extend(c.fetchall())
+    return rows
+
+
+def _archived_duplicate_keys(records):
+    """
+    在发布日期所在年份的归档库中查找相同的 标题+日期 键或内容哈希
+
+    归档后热库中已没有这些记录，不检查归档库时重新爬取会把它们再次插入热库。
+
+    Args:
+        records: 含 pub_date、title_date_key、content_hash 的字典列表
+
+    Returns:
+        tuple: (已归档的 title_date_key 集合, 已归档的 content_hash 集合)
+    """
+    title_date_keys, content_hashes = set(), set()
+    with _archive_lookup_lock:
+        archive_conns = _get_archive_lookup_conns()
+        if not archive_conns:
+            return title_date_keys, content_hashes
+
+        by_year = {}
+        for p in records:
+            year = str(p.get('pub_date') or '').strip()[:4]
+            if year.isdigit() and int(year) in archive_conns:
+                by_year.setdefault(int(year), []).append(p)
+
+        for year, items in by_year.items():
+            c = archive_conns[year].cursor()
+            title_date_keys.update(row[0] for row in _fetch_existing_keys(
+                c, 'SELECT title_date_key FROM policy WHERE title_date_key IN ({placeholders})',
+                {p['title_date_key'] for p in items}))
+            content_hashes.update(row[0] for row in _fetch_existing_keys(
+                c, 'SELECT content_hash FROM policy WHERE content_hash IN ({placeholders})',
+                {p['content_hash'] for p in items}))
+    return title_date_keys, content_hashes
+
+
+def _insert_policy_batch(batch):
+    """
+    在单个事务中对一批政策去重并插入
+
+    去重规则与 insert_policy 保持一致（标题+日期、标题+来源、内容哈希相同），
+    同时对批内记录互相去重。
+
+    Args:
+        batch: 已规范化的政策字典列表
+
+    Returns:
+        list: 与batch等长的结果列表，每项为 {'status': ..., 'id': ...}
+    """
+    outcomes = [None] * len(batch)
+
+    for p in batch:
+        p['content_hash'] = compute_content_hash(p['content'])
+        p['title_date_key'] = compute_title_date_key(p['title'], p['pub_date'])
+    # 已归档（移出热库）的记录在写锁之外查询，归档库只由归档任务写入
+    archived_keys, archived_hashes = _archived_duplicate_keys(batch)
+
+    with get_db_connection() as conn:
+        c = conn.cursor()
+        # 立即获取写锁，保证去重检查与插入之间不会有其他写入者（嵌套使用时由外层事务持有）
+        begin_immediate(conn)
+
+        legacy_check = not is_dedup_backfill_done()
+
+        # 一次性查询本批次涉及的已有记录（均走索引）
+        title_date_keys = archived_keys | {row[0] for row in _fetch_existing_keys(
+            c, 'SELECT title_date_key FROM policy WHERE title_date_key IN ({placeholders})',
+            {p['title_date_key'] for p in batch})}
+        content_hashes = archived_hashes | {row[0] for row in _fetch_existing_keys(
+            c, 'SELECT content_hash FROM policy WHERE content_hash IN ({placeholders})',
+            {p['content_hash'] for p in batch})}
+
+        title_source_keys = set()
+        for row in _fetch_existing_keys(
+                c, 'SELECT title, pub_date, source, content_hash FROM policy WHERE title IN ({placeholders})',
+                {p['title'] for p in batch}):
+            if row[2]:
+                title_source_keys.add((row[0], row[2]))
+            if legacy_check and row[3] is None:
+                # 尚未回填的历史记录，按原始字段计算去重键
+                title_date_keys.add(compute_title_date_key(row[0], row[1]))
+
+        if legacy_check:
+            for row in _fetch_existing_keys(
+                    c, 'SELECT content FROM policy WHERE content_hash IS NULL AND content IN ({placeholders})',
+                    {p['content'] for p in batch}):
+                content_hashes.add(compute_content_hash(row[0]))
+
+        # 逐条判断（批内新插入的记录也参与后续去重）
+        dict_id = _get_content_dict_id(c)
+        to_insert = []
+        to_insert_index = {}
+        for i, p in enumerate(batch):
+            title, source = p['title'], p['source']
+            if p['title_date_key'] in title_date_keys:
+                outcomes[i] = {'status': INSERT_STATUS_DUP_TITLE_DATE, 'id': None}
+                continue
+            if source and (title, source) in title_source_keys:
+                outcomes[i] = {'status': INSERT_STATUS_DUP_TITLE_SOURCE, 'id': None}
+                continue
+            if p['content_hash'] in content_hashes:
+                outcomes[i] = {'status': INSERT_STATUS_DUP_CONTENT, 'id': None}
+                continue
+
+            title_date_keys.add(p['title_date_key'])
+            if source:
+                title_source_keys.add((title, source))
+            content_hashes.add(p['content_hash'])
+            to_insert.append((p['level'], title, p['pub_date'], source,
+                              compression.compress_text(p['content'], dict_id), p['category'],
+                              p['crawl_time'], p['content_hash'], p['title_date_key']))
+            to_insert_index[p['title_date_key']] = i
+
+        if to_insert:
+            c.execute('SELECT COALESCE(MAX(id), 0) FROM policy')
+            max_id_before = c.fetchone()[0]
+
+            c.executemany('''INSERT INTO policy (level, title, pub_date, source, content, category, crawl_time,
+                                                content_hash, title_date_key)
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                             ON CONFLICT DO NOTHING''', to_insert)
+
+            # 按去重键把新分配的ID对应回输入记录
+            c.execute('SELECT id, title_date_key FROM policy WHERE id > ?', (max_id_before,))
+            for rowid, key in c.fetchall():
+                i = to_insert_index.pop(key, None)
+                if i is not None:
+                    outcomes[i] = {'status': INSERT_STATUS_INSERTED, 'id': rowid}
+            # 被唯一索引拦截的记录
+            for i in to_insert_index.values():
+                outcomes[i] = {'status': INSERT_STATUS_DUP_TITLE_DATE, 'id': None}
+
+        # 全文索引由触发器同步，上下文管理器会自动commit
+
+    return outcomes
+
+
+def insert_policies_bulk(policies, batch_size=DEFAULT_BULK_BATCH_SIZE):
+    """
+    批量插入政策数据
+
+    每个批次在一个事务内完成去重和插入（executemany），备份检查每批只执行一次，
+    避免 insert_policy 逐条建立连接、提交和读取配置的开销。
+
+    Args:
+        policies: 政策记录的可迭代对象（字典，或 (id, level, title, pub_date, source, content[, category]) 元组）
+        batch_size: 每个事务处理的记录数
+
+    Returns:
+        list: 与输入顺序一致的结果列表，每项为 {'status': ..., 'id': ...}，
+              status 取值为 INSERT_STATUS_* 常量之一
+    """
+    batch_size = max(1, int(batch_size or DEFAULT_BULK_BATCH_SIZE))
+    outcomes = []
+    batch = []
+    batch_positions = []
+
+    def flush():
+        if not batch:
+            return
+        batch_outcomes = _insert_policy_batch(batch)
+        for pos, outcome in zip(batch_positions, batch_outcomes):
+            outcomes[pos] = outcome
+        batch.clear()
+        batch_positions.clear()
+
+        # 每批只检查一次是否需要备份（在连接关闭后，后台执行不阻塞入库）
+        if should_backup_database() and not is_backup_running():
+            backup_database_async()
+
+    try:
+        for policy in policies:
+            record = _normalize_policy_record(policy)
+            outcomes.append({'status': INSERT_STATUS_INVALID, 'id': None})
+            if record is None or not record['title']:
+                logger.warning(f"跳过无法识别的政策记录: {type(policy)}")
+                continue
+            batch.append(record)
+            batch_positions.append(len(outcomes) - 1)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    except DatabaseError as e:
+        logger.error(f"批量插入政策失败（数据库错误）: {e}", exc_info=True)
+        raise
+
+    inserted = sum(1 for o in outcomes if o['status'] == INSERT_STATUS_INSERTED)
+    logger.info(f"批量插入完成: 共 {len(outcomes)} 条，新增 {inserted} 条，跳过 {len(outcomes) - inserted} 条")
+    return outcomes
+
+
+def _rekey_orphan_title_date_keys(c, batch_size):
+    """为去重后仍缺少 title_date_key 的记录补齐去重键"""
+    last_id = 0
+    while True:
+        c.execute('''SELECT id, title, pub_date FROM policy
+                     WHERE title_date_key IS NULL AND content_hash IS NOT NULL AND id > ?
+                     ORDER BY id LIMIT ?''', (last_id, batch_size))
+        rows = c.fetchall()
+        if not rows:
+            break
+        c.executemany('UPDATE OR IGNORE policy SET title_date_key=? WHERE id=?',
+                      [(compute_title_date_key(r[1], r[2]), r[0]) for r in rows])
+        last_id = rows[-1][0]
+
+def deduplicate_database(dry_run=False, batch_size=1000, progress_callback=None):
+    """
+    清理数据库中的重复记录（按 标题+日期 分组，保留ID最大的记录）
+    
+    使用窗口函数在SQL中定位重复ID，并写入临时表后分批删除，
+    全程只处理ID，不把正文读入内存。
+    
+    Args:
+        dry_run: 为True时只统计不删除
+        batch_size: 每批删除的记录数（每批一个事务）
+        progress_callback: 进度回调 callback(removed, total_duplicates)
+    
+    Returns:
+        dict: {'success', 'removed', 'duplicates', 'total', 'original', 'dry_run'}
+    """
+    batch_size = max(1, int(batch_size or 1000))
     
     try:
         with get_db_connection() as conn:
@@ -313,54 +1028,72 @@ def deduplicate_database():
             
             logger.info("🔍 开始清理数据库重复记录...")
             
-            # 获取所有政策
-            c.execute('SELECT id, title, pub_date, source, content FROM policy ORDER BY id')
-            all_policies = c.fetchall()
+            c.execute('SELECT COUNT(*) FROM policy')
+            original_count = c.fetchone()[0]
             
-            if not all_policies:
+            if not original_count:
                 logger.info("数据库中没有政策数据")
-                return {'success': True, 'removed': 0, 'total': 0}
-            
-            logger.info(f"总政策数量: {len(all_policies)}")
-            
-            # 按标题+日期分组，保留最新的记录
-            policy_groups = {}
-            for policy in all_policies:
-                policy_id, title, pub_date, source, content = policy
-                key = (title, pub_date)
-                if key not in policy_groups:
-                    policy_groups[key] = []
-                policy_groups[key].append(policy)
-            
-            # 找出重复的记录
-            duplicates_to_remove = []
-            for key, policies in policy_groups.items():
-                if len(policies) > 1:
-                    # 保留ID最大的记录（最新的），删除其他的
-                    policies.sort(key=lambda x: x[0])  # 按ID排序
-                    duplicates_to_remove.extend(policies[:-1])  # 除了最后一个都删除
-            
-            if not duplicates_to_remove:
+                return {'success': True, 'removed': 0, 'duplicates': 0, 'total': 0, 'dry_run': dry_run}
+            
+            logger.info(f"总政策数量: {original_count}")
+            
+            # 定位重复记录：每组 (title, pub_date) 中除ID最大者外的全部记录
+            c.execute('DROP TABLE IF EXISTS temp.dedup_ids')
+            c.execute('CREATE TEMP TABLE dedup_ids (id INTEGER PRIMARY KEY)')
+            c.execute('''
+                INSERT INTO temp.dedup_ids (id)
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY title, pub_date ORDER BY id DESC
+                    ) AS rn
+                    FROM policy
+                ) WHERE rn > 1
+            ''')
+            c.execute('SELECT COUNT(*) FROM temp.dedup_ids')
+            duplicate_count = c.fetchone()[0]
+            commit_batch(conn)
+            
+            if not duplicate_count:
+                c.execute('DROP TABLE IF EXISTS temp.dedup_ids')
                 logger.info("✅ 没有发现重复记录")
-                return {'success': True, 'removed': 0, 'total': len(all_policies)}
+                return {'success': True, 'removed': 0, 'duplicates': 0,
+                        'total': original_count, 'original': original_count, 'dry_run': dry_run}
+            
+            logger.info(f"发现 {duplicate_count} 条重复记录需要删除")
             
-            logger.info(f"发现 {len(duplicates_to_remove)} 条重复记录需要删除")
+            if dry_run:
+                c.execute('DROP TABLE IF EXISTS temp.dedup_ids')
+                logger.info(f"试运行模式，未删除任何记录（将删除 {duplicate_count} 条）")
+                return {'success': True, 'removed': 0, 'duplicates': duplicate_count,
+                        'total': original_count, 'original': original_count, 'dry_run': True}
             
-            # 删除重复记录
+            # 分批删除，每批一个事务
             removed_count = 0
-            for policy in duplicates_to_remove:
-                policy_id, title, pub_date, source, content = policy
-                try:
-                    # 删除主表记录
-                    c.execute('DELETE FROM policy WHERE id = ?', (policy_id,))
-                    # 删除FTS表记录
-                    c.execute('DELETE FROM policy_fts WHERE rowid = ?', (policy_id,))
-                    removed_count += 1
-                    logger.debug(f"删除重复记录: {title} ({pub_date})")
-                except sqlite3.Error as e:
-                    logger.error(f"删除记录失败 ID {policy_id}（数据库错误）: {e}", exc_info=True)
-                except Exception as e:
-                    logger.error(f"删除记录失败 ID {policy_id}（未知错误）: {e}", exc_info=True)
+            last_id = 0
+            while True:
+                c.execute('SELECT id FROM temp.dedup_ids WHERE id > ? ORDER BY id LIMIT ?',
+                          (last_id, batch_size))
+                ids = [row[0] for row in c.fetchall()]
+                if not ids:
+                    break
+                placeholders = ','.join('?' * len(ids))
+                # 全文索引条目由删除触发器同步移除
+                c.execute(f'DELETE FROM policy WHERE id IN ({placeholders})', ids)
+                commit_batch(conn)
+                
+                removed_count += len(ids)
+                last_id = ids[-1]
+                logger.debug(f"已删除重复记录 {removed_count}/{duplicate_count}")
+                if progress_callback:
+                    try:
+                        progress_callback(removed_count, duplicate_count)
+                    except Exception as e:
+                        logger.warning(f"去重进度回调失败: {e}")
+            
+            c.execute('DROP TABLE IF EXISTS temp.dedup_ids')
+            
+            # 被保留的记录如果此前因冲突没有去重键，现在补齐
+            _rekey_orphan_title_date_keys(c, batch_size)
             
             # 上下文管理器会自动commit
             
@@ -373,8 +1106,10 @@ def deduplicate_database():
             return {
                 'success': True,
                 'removed': removed_count,
+                'duplicates': duplicate_count,
                 'total': new_count,
-                'original': len(all_policies)
+                'original': original_count,
+                'dry_run': False
             }
         
     except DatabaseError as e:
@@ -384,10 +1119,454 @@ def deduplicate_database():
         logger.error(f"清理数据库失败（未知错误）: {e}", exc_info=True)
         return {'success': False, 'error': str(e)}
 
-def search_policies(level=None, keywords=None, start_date=None, end_date=None, limit=None, offset=0):
+def _stored_size(value):
+    """正文在数据库中占用的字节数"""
+    if value is None:
+        return 0
+    return len(value.encode('utf-8')) if isinstance(value, str) else len(value)
+
+def _convert_content_rows(conn, codec, dict_id, batch_size, progress_callback, stats):
+    """把一个库中的正文转换为目标存储格式（FTS索引内容不变，转换期间暂停触发器）"""
+    c = conn.cursor()
+    last_id = 0
+    while True:
+        c.execute('SELECT id, content FROM policy WHERE id > ? ORDER BY id LIMIT ?', (last_id, batch_size))
+        rows = c.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        
+        updates = []
+        for rowid, value in rows:
+            text = compression.decompress_value(value)
+            if codec == compression.CONTENT_COMPRESSION_NONE:
+                stored = text
+            else:
+                stored = compression.compress_text(text, dict_id)
+            stats['bytes_before'] += _stored_size(value)
+            stats['bytes_after'] += _stored_size(stored)
+            if stored != value:
+                updates.append((stored, rowid))
+        
+        if updates:
+            with fts.triggers_suspended(c):
+                c.executemany('UPDATE policy SET content=? WHERE id=?', updates)
+        commit_batch(conn)
+        
+        stats['converted'] += len(updates)
+        stats['total'] += len(rows)
+        if progress_callback:
+            try:
+                progress_callback(stats['total'])
+            except Exception as e:
+                logger.warning(f"正文转换进度回调失败: {e}")
+
+def convert_content_storage(codec=None, batch_size=500, vacuum=False, progress_callback=None):
+    """
+    把已有数据库（含归档库）的正文转换为指定的存储格式
+    
+    压缩时先从现有正文采样训练共享字典，再分批把正文替换为压缩格式；
+    codec='none' 时把压缩正文还原为文本。正文内容不变，全文索引无需重建。
+    
+    Args:
+        codec: 'zstd' / 'zlib' / 'none'，默认读取配置 content_compression
+        batch_size: 每批转换的记录数
+        vacuum: 转换后是否执行 VACUUM 回收空间（转换后文件不会自动变小）
+        progress_callback: 进度回调 callback(processed_count)
+    
+    Returns:
+        dict: {'success', 'codec', 'dict_id', 'converted', 'total', 'bytes_before', 'bytes_after'}
+    """
+    if codec is None:
+        codec = config.app_config.get_database_config().get(
+            'content_compression', compression.CONTENT_COMPRESSION_NONE)
+    codec = compression.resolve_codec(codec)
+    stats = {'success': True, 'codec': codec, 'dict_id': None, 'converted': 0, 'total': 0,
+             'bytes_before': 0, 'bytes_after': 0}
+    
+    try:
+        with get_db_connection() as conn:
+            c = conn.cursor()
+            if codec != compression.CONTENT_COMPRESSION_NONE:
+                c.execute('''SELECT policy_content(content) FROM policy WHERE id IN (
+                                 SELECT id FROM policy WHERE content IS NOT NULL ORDER BY random() LIMIT ?)''',
+                          (compression.DICT_SAMPLE_COUNT,))
+                samples = [row[0] for row in c.fetchall()]
+                stats['dict_id'] = compression.train_dictionary(c, codec, samples)
+                commit_batch(conn)
+                _content_dict_cache.clear()
+                if stats['dict_id'] is None:
+                    logger.info("没有可用于训练字典的正文，跳过转换")
+                    return stats
+            
+            _convert_content_rows(conn, codec, stats['dict_id'], batch_size, progress_callback, stats)
+        
+        for year in get_archive_years():
+            conn = _connect_archive(year)
+            if conn is None:
+                continue
+            try:
+                if stats['dict_id'] is not None:
+                    compression.save_dictionary(conn.cursor(), stats['dict_id'])
+                _convert_content_rows(conn, codec, stats['dict_id'], batch_size, progress_callback, stats)
+                if vacuum:
+                    conn.execute('VACUUM')
+            finally:
+                conn.close()
+        
+        if vacuum:
+            with get_db_connection() as conn:
+                conn.execute('VACUUM')
+        
+        logger.info(f"正文存储格式转换完成（{codec}）：处理 {stats['total']} 条，转换 {stats['converted']} 条，"
+                    f"正文 {stats['bytes_before'] / 1048576:.1f}MB -> {stats['bytes_after'] / 1048576:.1f}MB")
+        return stats
+    except sqlite3.Error as e:
+        logger.error(f"正文存储格式转换失败（数据库错误）: {e}", exc_info=True)
+        stats.update(success=False, error=f'数据库错误: {str(e)}')
+        return stats
+    except Exception as e:
+        logger.error(f"正文存储格式转换失败（未知错误）: {e}", exc_info=True)
+        stats.update(success=False, error=str(e))
+        return stats
+
+# 归档存储：发布日期早于截止日期的政策按年份迁移到独立的SQLite文件，
+# 热库只保留近期数据，页缓存不再被多年的历史正文占用
+ARCHIVE_FILE_PREFIX = 'policy_archive_'
+_ARCHIVE_FILE_RE = re.compile(r'^policy_archive_(\d{4})\.db$')
+
+# 详情查询的列（与表定义顺序一致，正文透明解压）
+POLICY_DETAIL_COLUMNS = ('id, level, title, pub_date, source, policy_content(content) AS content, '
+                         'category, crawl_time, content_hash, title_date_key')
+
+# policy 表的全部列（归档时整行复制，保留原ID）
+_POLICY_COLUMNS = ('id', 'level', 'title', 'pub_date', 'source', 'content', 'category', 'crawl_time',
+                   'content_hash', 'title_date_key')
+
+def get_archive_dir():
+    """获取归档目录"""
+    return config.app_config.get_archive_dir()
+
+def _get_archive_path(year):
+    """获取指定年份归档库的路径"""
+    return os.path.join(get_archive_dir(), f"{ARCHIVE_FILE_PREFIX}{int(year)}.db")
+
+def get_archive_years():
+    """
+    获取已有归档库的年份
+    
+    Returns:
+        list: 年份列表（倒序）
+    """
+    try:
+        years = []
+        for filename in os.listdir(get_archive_dir()):
+            match = _ARCHIVE_FILE_RE.match(filename)
+            if match:
+                years.append(int(match.group(1)))
+        return sorted(years, reverse=True)
+    except OSError as e:
+        logger.error(f"读取归档目录失败: {e}", exc_info=True)
+        return []
+
+def get_archive_cutoff_date():
+    """
+    根据配置计算归档截止日期（发布日期早于该日期的政策会被归档）
+    
+    Returns:
+        str: 'YYYY-01-01'，未启用归档（archive_cutoff_years<=0）时返回None
+    """
+    years = config.app_config.get_database_config().get('archive_cutoff_years', 0)
+    if not years or years <= 0:
+        return None
+    return f"{datetime.now().year - int(years)}-01-01"
+
+def _connect_archive(year):
+    """打开归档库连接（文件不存在时返回None），调用方负责关闭"""
+    path = _get_archive_path(year)
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return configure_connection(conn)
+
+# 入库去重使用的归档库只读连接（按年份），由 _archive_lookup_lock 保护；
+# 归档任务执行后失效，避免每次插入都扫描归档目录和重新建立连接
+_archive_lookup_lock = threading.Lock()
+_archive_lookup = {'db_path': None, 'conns': None}
+
+def _get_archive_lookup_conns():
+    """获取各归档年份的只读连接（需持有 _archive_lookup_lock）"""
+    db_path = get_database_path()
+    if _archive_lookup['conns'] is None or _archive_lookup['db_path'] != db_path:
+        _close_archive_lookup_conns()
+        conns = {}
+        for year in get_archive_years():
+            path = _get_archive_path(year)
+            try:
+                conns[year] = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30,
+                                              check_same_thread=False)
+            except sqlite3.Error as e:
+                logger.warning(f"打开归档库失败 [{year}]: {e}")
+        _archive_lookup['db_path'] = db_path
+        _archive_lookup['conns'] = conns
+    return _archive_lookup['conns']
+
+def _close_archive_lookup_conns():
+    """关闭归档库只读连接（需持有 _archive_lookup_lock）"""
+    for conn in (_archive_lookup['conns'] or {}).values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _archive_lookup['conns'] = None
+
+def invalidate_archive_lookup():
+    """归档库发生变化后使入库去重的归档缓存失效（下次插入时重新扫描）"""
+    with _archive_lookup_lock:
+        _close_archive_lookup_conns()
+
+def _init_archive_db(year):
+    """创建/迁移归档库的表结构和全文索引"""
+    conn = configure_connection(sqlite3.connect(_get_archive_path(year), timeout=30))
+    try:
+        c = conn.cursor()
+        _ensure_policy_schema(c)
+        fts.ensure_fts_schema(
+            c, config.app_config.get_database_config().get('fts_tokenizer', fts.FTS_TOKENIZER_CJK))
+        compression.load_dictionaries(c)
+        conn.commit()
+    finally:
+        conn.close()
+
+def _get_archive_years_for_range(start_date, end_date):
+    """获取日期范围涉及的归档年份（与检索条件一致：起止日期均有效时才按范围筛选）"""
+    years = get_archive_years()
+    if not years or not (start_date and end_date):
+        return years
+    from ..utils.validator import InputValidator
+    validated_start = InputValidator.validate_date(start_date)
+    validated_end = InputValidator.validate_date(end_date)
+    if not (validated_start and validated_end):
+        return years
+    return [y for y in years if int(validated_start[:4]) <= y <= int(validated_end[:4])]
+
+def _iter_search_tiers(start_date, end_date):
+    """
+    依次产出 (tier, cursor)：先是热库（tier为None），再是日期范围涉及的归档库（tier为年份，倒序）
+    
+    调用方提前结束迭代时，尚未打开的归档库不会被访问。
+    """
+    with get_db_connection() as conn:
+        yield None, conn.cursor()
+    for year in _get_archive_years_for_range(start_date, end_date):
+        conn = _connect_archive(year)
+        if conn is None:
+            continue
+        try:
+            yield year, conn.cursor()
+        finally:
+            conn.close()
+
+def _date_sort_key(row):
+    """与 ORDER BY pub_date DESC, id DESC 一致的排序键（配合 reverse=True 使用，NULL日期排在最后）"""
+    return (row['pub_date'] is not None, row['pub_date'] or '', row['id'])
+
+def archive_old_policies(cutoff_date=None, batch_size=None, progress_callback=None):
+    """
+    把发布日期早于截止日期的政策迁移到按年份划分的归档库
+    
+    每批在一个事务内把记录复制到归档库（保留原ID）并从热库删除；两个文件的提交不是原子的，
+    中断后重新执行会跳过归档库中已存在的记录并继续删除热库中的副本。
+    归档库中已有相同标题+日期的记录时，热库中的重复记录直接删除。
+    释放的页会被后续入库复用，文件大小不会立即缩小。
+    归档库在事务提交后才能分离，因此不能在外层 get_db_connection 作用域内调用。
+    
+    Args:
+        cutoff_date: 截止日期 'YYYY-MM-DD'，默认按配置 archive_cutoff_years 计算
+        batch_size: 每批迁移的记录数，默认读取配置 archive_batch_size
+        progress_callback: 进度回调 callback(archived_count)
+    
+    Returns:
+        dict: {'success': bool, 'archived': int, 'years': list}
+    """
+    if cutoff_date is None:
+        cutoff_date = get_archive_cutoff_date()
+    if not cutoff_date:
+        return {'success': True, 'archived': 0, 'years': []}
+    if batch_size is None:
+        batch_size = config.app_config.get_database_config().get('archive_batch_size', 1000)
+    
+    archived = 0
+    try:
+        with get_db_connection() as conn:
+            if is_nested_scope(conn):
+                raise DatabaseConnectionError("归档需要独立提交每一批，不能在外层数据库事务中执行")
+            c = conn.cursor()
+            c.execute('''SELECT DISTINCT substr(pub_date, 1, 4) FROM policy
+                         WHERE pub_date < ? AND pub_date GLOB '[0-9][0-9][0-9][0-9]-*' ''', (cutoff_date,))
+            years = sorted(int(row[0]) for row in c.fetchall())
+        if not years:
+            return {'success': True, 'archived': 0, 'years': []}
+        
+        os.makedirs(get_archive_dir(), exist_ok=True)
+        columns = ', '.join(_POLICY_COLUMNS)
+        for year in years:
+            _init_archive_db(year)
+            year_start = f"{year:04d}"
+            year_end = f"{year + 1:04d}"
+            
+            with get_db_connection() as conn:
+                c = conn.cursor()
+                c.execute('ATTACH DATABASE ? AS archive', (_get_archive_path(year),))
+                try:
+                    # 压缩正文依赖的字典一并复制（字典ID由内容决定，各库一致）
+                    c.execute('INSERT OR IGNORE INTO archive.content_dict SELECT * FROM main.content_dict')
+                    while True:
+                        c.execute('''SELECT id FROM main.policy
+                                     WHERE pub_date >= ? AND pub_date < ? AND pub_date < ?
+                                     ORDER BY id LIMIT ?''',
+                                  (year_start, year_end, cutoff_date, batch_size))
+                        ids = [row[0] for row in c.fetchall()]
+                        if not ids:
+                            break
+                        placeholders = ','.join('?' * len(ids))
+                        # 全文索引由两个库各自的触发器同步
+                        c.execute(f'''INSERT INTO archive.policy ({columns})
+                                       SELECT {columns} FROM main.policy WHERE id IN ({placeholders})
+                                       ON CONFLICT DO NOTHING''', ids)
+                        c.execute(f'DELETE FROM main.policy WHERE id IN ({placeholders})', ids)
+                        commit_batch(conn)
+                        
+                        archived += len(ids)
+                        if progress_callback:
+                            try:
+                                progress_callback(archived)
+                            except Exception as e:
+                                logger.warning(f"归档进度回调失败: {e}")
+                except BaseException:
+                    # 分离归档库前先回滚未提交的一批
+                    rollback_batch(conn)
+                    raise
+                finally:
+                    c.execute('DETACH DATABASE archive')
+            logger.info(f"{year} 年政策已归档")
+            invalidate_archive_lookup()
+        
+        logger.info(f"归档完成，共迁移 {archived} 条政策（截止日期 {cutoff_date}）")
+        return {'success': True, 'archived': archived, 'years': years}
+    except sqlite3.Error as e:
+        logger.error(f"归档政策失败（数据库错误）: {e}", exc_info=True)
+        return {'success': False, 'archived': archived, 'error': f'数据库错误: {str(e)}'}
+    except Exception as e:
+        logger.error(f"归档政策失败（未知错误）: {e}", exc_info=True)
+        return {'success': False, 'archived': archived, 'error': str(e)}
+
+# 列表查询只返回轻量字段（不含正文）
+POLICY_LIST_COLUMNS = ('id', 'level', 'title', 'pub_date', 'source', 'category')
+
+# 列表分页默认大小
+DEFAULT_LIST_PAGE_SIZE = 200
+
+# 排序方式
+ORDER_BY_DATE = 'date'            # 按发布日期倒序
+ORDER_BY_RELEVANCE = 'relevance'  # 按bm25相关度（仅关键词检索时有效）
+
+def _build_search_filters(c, level, keywords, start_date, end_date):
+    """
+    构建搜索条件（search_policies 与 search_policy_list 共用）
+    
+    Returns:
+        dict: {
+            'fts_query': FTS MATCH表达式或None,
+            'conditions': WHERE条件片段列表（以 p. 为表别名）,
+            'params': 条件参数列表,
+            'empty': 关键词全部被过滤导致查询必然为空时为True
+        }
+    """
+    from ..utils.validator import InputValidator
+    
+    filters = {'fts_query': None, 'conditions': [], 'params': [], 'empty': False}
+    
+    # 验证level参数（白名单机制）
+    if level:
+        validated_level = InputValidator.sanitize_level(level)
+        if validated_level:
+            filters['conditions'].append('p.level = ?')
+            filters['params'].append(validated_level)
+        else:
+            logger.warning(f"无效的机构级别参数，已忽略: {level}")
+    
+    # 验证和添加日期条件
+    if start_date and end_date:
+        validated_start = InputValidator.validate_date(start_date)
+        validated_end = InputValidator.validate_date(end_date)
+        if validated_start and validated_end:
+            filters['conditions'].append('p.pub_date BETWEEN ? AND ?')
+            filters['params'].extend([validated_start, validated_end])
+        else:
+            logger.warning(f"无效的日期参数: {start_date} - {end_date}")
+    
+    # 验证和清理关键词
+    sanitized_keywords = []
+    for kw in keywords or []:
+        if isinstance(kw, str):
+            sanitized = InputValidator.sanitize_fts_query(kw)
+            if sanitized:
+                sanitized_keywords.append(sanitized)
+    
+    if sanitized_keywords:
+        # 构建FTS查询：cjk分词模式下中文按相邻字符短语匹配
+        if fts.get_tokenizer(c) == fts.FTS_TOKENIZER_CJK:
+            fts_query = fts.build_match_expression(sanitized_keywords)
+        else:
+            fts_query = ' OR '.join(sanitized_keywords)
+        
+        # 再次清理完整查询（双重保护，短语所需的双引号由查询构建器生成）
+        if fts_query and InputValidator.sanitize_fts_query(fts_query.replace('"', ''), max_length=500):
+            filters['fts_query'] = fts_query[:1000]
+        else:
+            # 查询被过滤，返回空结果
+            filters['empty'] = True
+    
+    return filters
+
+def _build_search_from_clause(filters):
+    """根据搜索条件构建 FROM/WHERE 子句及参数"""
+    if filters['fts_query']:
+        # 注意：FTS辅助函数（bm25/snippet/highlight）要求使用表名而不是别名
+        sql = ''' FROM policy p JOIN policy_fts ON p.id = policy_fts.rowid
+                  WHERE policy_fts MATCH ?'''
+        params = [filters['fts_query']]
+    else:
+        sql = ' FROM policy p WHERE 1=1'
+        params = []
+    if filters['empty']:
+        sql += ' AND 1=0'
+    for condition in filters['conditions']:
+        sql += ' AND ' + condition
+    params.extend(filters['params'])
+    return sql, params
+
+def _resolve_order_by(order_by, filters):
+    """关键词检索默认按相关度排序，其余按日期排序"""
+    if order_by is None:
+        order_by = ORDER_BY_RELEVANCE if filters['fts_query'] else ORDER_BY_DATE
+    if order_by == ORDER_BY_RELEVANCE and not filters['fts_query']:
+        order_by = ORDER_BY_DATE
+    return order_by
+
+def search_policies(level=None, keywords=None, start_date=None, end_date=None, limit=None, offset=0,
+                    order_by=None):
     """
     搜索政策，支持时间区间（改进：添加输入验证和分页，使用上下文管理器）
     
+    先查询热库，日期范围涉及归档年份时再依次查询对应的归档库。
+    按日期排序时合并各库结果；按相关度排序时各库的bm25分值基于各自的语料统计、
+    不能直接比较，因此按热库、归档库（年份倒序）的顺序拼接。
+    
+    注意：返回结果包含正文，只需列表展示时请使用 search_policy_list()
+    
     Args:
         level: 机构级别
         keywords: 关键词列表
@@ -395,124 +1574,242 @@ def search_policies(level=None, keywords=None, start_date=None, end_date=None, l
         end_date: 结束日期
         limit: 返回结果数量限制（用于分页）
         offset: 结果偏移量（用于分页）
+        order_by: ORDER_BY_DATE 或 ORDER_BY_RELEVANCE，默认关键词检索按相关度排序
     
     Returns:
         政策数据列表
     """
-    # 导入验证器和连接管理器
+    # 导入验证器
     from ..utils.validator import InputValidator
-    from .db_connection import get_db_connection
     
     try:
         # 验证limit和offset参数（防止注入和DoS攻击）
         validated_limit = InputValidator.validate_integer(limit, min_val=1, max_val=10000, default=None)
         validated_offset = InputValidator.validate_integer(offset, min_val=0, max_val=1000000, default=0)
+        # 每个库最多需要取出的行数
+        needed = validated_limit + validated_offset if validated_limit else None
         
-        # 验证level参数（白名单机制）
-        validated_level = None
-        if level:
-            validated_level = InputValidator.sanitize_level(level)
-            if not validated_level:
-                logger.warning(f"无效的机构级别参数，已忽略: {level}")
-        
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            params = []
-            # 使用列表构建SQL片段，避免字符串拼接
-            where_conditions = []
-            
-            # 验证和添加日期条件
-            if start_date and end_date:
-                validated_start = InputValidator.validate_date(start_date)
-                validated_end = InputValidator.validate_date(end_date)
-                if validated_start and validated_end:
-                    where_conditions.append('p.pub_date BETWEEN ? AND ?')
-                    params.extend([validated_start, validated_end])
-                else:
-                    logger.warning(f"无效的日期参数: {start_date} - {end_date}")
-            
-            # 构建WHERE子句（安全的方式）
-            where_clause = ''
-            if where_conditions:
-                where_clause = ' AND ' + ' AND '.join(where_conditions)
-            
-            # 验证和清理关键词
-            if keywords:
-                # 清理关键词（防止注入攻击）
-                sanitized_keywords = []
-                for kw in keywords:
-                    if isinstance(kw, str):
-                        sanitized = InputValidator.sanitize_fts_query(kw)
-                        if sanitized:
-                            sanitized_keywords.append(sanitized)
+        filters = None
+        tier_results = []
+        for tier, c in _iter_search_tiers(start_date, end_date):
+            if filters is None:
+                filters = _build_search_filters(c, level, keywords, start_date, end_date)
+                from_clause, params = _build_search_from_clause(filters)
+                by_relevance = _resolve_order_by(order_by, filters) == ORDER_BY_RELEVANCE
                 
-                if sanitized_keywords:
-                    # 构建FTS查询（使用参数化方式）
-                    if validated_level:
-                        # 使用参数化方式构建FTS查询
-                        fts_query_parts = [f"level:{validated_level}"]
-                        fts_query_parts.append(f"({' OR '.join(sanitized_keywords)})")
-                        fts_query = ' AND '.join(fts_query_parts)
-                    else:
-                        fts_query = ' OR '.join(sanitized_keywords)
-                    
-                    # 再次清理完整查询（双重保护）
-                    fts_query = InputValidator.sanitize_fts_query(fts_query, max_length=500)
-                    
-                    if fts_query:
-                        # 使用参数化查询（避免SQL注入）
-                        sql = '''SELECT p.id, p.level, p.title, p.pub_date, p.source, p.content, p.category 
-                                 FROM policy p JOIN policy_fts fts ON p.id = fts.rowid 
-                                 WHERE policy_fts MATCH ?'''
-                        sql += where_clause
-                        sql += ' ORDER BY p.pub_date DESC'
-                        
-                        query_params = [fts_query] + params
-                        
-                        if validated_limit:
-                            sql += ' LIMIT ? OFFSET ?'
-                            query_params.extend([validated_limit, validated_offset])
-                        
-                        c.execute(sql, query_params)
-                    else:
-                        # 查询被过滤，返回空结果（使用参数化查询）
-                        sql = '''SELECT id, level, title, pub_date, source, content, category 
-                                 FROM policy p WHERE 1=0'''
-                        sql += where_clause
-                        c.execute(sql, params)
+                sql = ('SELECT p.id, p.level, p.title, p.pub_date, p.source, '
+                       'policy_content(p.content) AS content, p.category')
+                sql += from_clause
+                if by_relevance:
+                    sql += ' ORDER BY policy_fts.rank, p.pub_date DESC'
                 else:
-                    # 所有关键词都被过滤，使用普通查询
-                    keywords = None
+                    sql += ' ORDER BY p.pub_date DESC, p.id DESC'
+                if needed:
+                    sql += ' LIMIT ?'
+                    params.append(needed)
             
-            if not keywords:
-                # 普通查询（不使用FTS）
-                sql = '''SELECT id, level, title, pub_date, source, content, category 
-                         FROM policy p'''
-                
-                if validated_level:
-                    sql += ' WHERE level = ?'
-                    sql += where_clause
-                    params = [validated_level] + params
-                elif where_clause:
-                    sql += ' WHERE 1=1' + where_clause
-                
-                sql += ' ORDER BY pub_date DESC'
-                
-                if validated_limit:
-                    sql += ' LIMIT ? OFFSET ?'
-                    params.extend([validated_limit, validated_offset])
-                
-                c.execute(sql, params)
-            
-            results = c.fetchall()
-            return results
+            c.execute(sql, params)
+            tier_results.append(c.fetchall())
+            if by_relevance and needed and sum(len(rows) for rows in tier_results) >= needed:
+                break
+        
+        if len(tier_results) == 1:
+            results = tier_results[0]
+        elif by_relevance:
+            results = [row for rows in tier_results for row in rows]
+        else:
+            results = list(heapq.merge(*tier_results, key=_date_sort_key, reverse=True))
+        
+        if needed:
+            results = results[validated_offset:needed]
+        return results
     except Exception as e:
         logger.error(f"搜索政策失败: {e}", exc_info=True)
         return []
 
+def search_policy_list(level=None, keywords=None, start_date=None, end_date=None,
+                       limit=DEFAULT_LIST_PAGE_SIZE, after=None, order_by=None):
+    """
+    搜索政策列表（只返回轻量字段，键集分页）
+    
+    与 search_policies 相比不读取正文，也不使用 OFFSET，翻页代价与页码无关。
+    关键词检索时默认按bm25相关度排序，并附带 snippet（正文摘要）和
+    title_highlight（标题高亮）列；正文请通过 get_policy_content() 按需读取。
+    日期范围涉及归档年份时同样查询归档库（合并方式与 search_policies 相同）。
+    
+    Args:
+        level: 机构级别
+        keywords: 关键词列表
+        start_date: 开始日期
+        end_date: 结束日期
+        limit: 每页数量
+        after: 上一页返回的游标，为None时从第一页开始
+        order_by: ORDER_BY_DATE 或 ORDER_BY_RELEVANCE，翻页时需与首页保持一致
+    
+    Returns:
+        tuple: (rows, next_cursor)
+            rows 为 (id, level, title, pub_date, source, category[, snippet, title_highlight]) 行列表，
+            next_cursor 为下一页游标，没有更多数据时为None
+    """
+    from ..utils.validator import InputValidator
+    
+    try:
+        validated_limit = InputValidator.validate_integer(
+            limit, min_val=1, max_val=10000, default=DEFAULT_LIST_PAGE_SIZE)
+        
+        filters = None
+        tier_results = []
+        last_tier = None
+        for tier, c in _iter_search_tiers(start_date, end_date):
+            if filters is None:
+                filters = _build_search_filters(c, level, keywords, start_date, end_date)
+                base_from_clause, base_params = _build_search_from_clause(filters)
+                by_relevance = _resolve_order_by(order_by, filters) == ORDER_BY_RELEVANCE
+                
+                columns = [f'p.{col}' for col in POLICY_LIST_COLUMNS]
+                if filters['fts_query']:
+                    columns.append(fts.snippet_expression() + ' AS snippet')
+                    columns.append(fts.highlight_expression() + ' AS title_highlight')
+                if by_relevance:
+                    columns.append('policy_fts.rank AS rank')
+                    # 相关度游标为 (rank, id[, 所在库])，翻页从游标所在的库继续
+                    after_tier = after[2] if after is not None and len(after) > 2 else None
+                    tier_reached = after is None or after_tier is None
+            
+            from_clause, params = base_from_clause, list(base_params)
+            if by_relevance:
+                # 各库依次拼接，跳过游标所在库之前的库
+                if not tier_reached:
+                    if tier != after_tier:
+                        continue
+                    tier_reached = True
+                    after_in_tier = after
+                else:
+                    after_in_tier = after if tier == after_tier and after is not None else None
+                # 键集分页：按 rank ASC, id ASC 排序（rank越小越相关）
+                if after_in_tier is not None:
+                    after_rank, after_id = after_in_tier[0], after_in_tier[1]
+                    from_clause += ''' AND (policy_fts.rank > ?
+                                         OR (policy_fts.rank = ? AND p.id > ?))'''
+                    params.extend([after_rank, after_rank, int(after_id)])
+                order_clause = ' ORDER BY policy_fts.rank, p.id'
+                remaining = validated_limit - sum(len(rows) for rows in tier_results)
+            else:
+                # 键集分页：按 pub_date DESC, id DESC 排序（NULL日期排在最后），各库使用同一游标
+                if after is not None:
+                    after_date, after_id = after
+                    if after_date is None:
+                        from_clause += ' AND (p.pub_date IS NULL AND p.id < ?)'
+                        params.append(int(after_id))
+                    else:
+                        from_clause += ''' AND (p.pub_date < ? OR (p.pub_date = ? AND p.id < ?)
+                                             OR p.pub_date IS NULL)'''
+                        params.extend([after_date, after_date, int(after_id)])
+                order_clause = ' ORDER BY p.pub_date DESC, p.id DESC'
+                remaining = validated_limit
+            
+            sql = 'SELECT ' + ', '.join(columns) + from_clause + order_clause + ' LIMIT ?'
+            params.append(remaining)
+            
+            c.execute(sql, params)
+            rows = c.fetchall()
+            tier_results.append(rows)
+            if rows:
+                last_tier = tier
+            if by_relevance and remaining - len(rows) <= 0:
+                break
+        
+        if len(tier_results) == 1:
+            rows = tier_results[0]
+        elif by_relevance:
+            rows = [row for tier_rows in tier_results for row in tier_rows]
+        else:
+            rows = list(heapq.merge(*tier_results, key=_date_sort_key, reverse=True))[:validated_limit]
+        
+        next_cursor = None
+        if len(rows) == validated_limit:
+            last = rows[-1]
+            if by_relevance:
+                next_cursor = (last['rank'], last['id']) if last_tier is None else \
+                    (last['rank'], last['id'], last_tier)
+            else:
+                next_cursor = (last['pub_date'], last['id'])
+        return rows, next_cursor
+    except Exception as e:
+        logger.error(f"搜索政策列表失败: {e}", exc_info=True)
+        return [], None
+
+def _fetch_rows_by_ids(sql_template, ids):
+    """
+    按ID读取记录：先查热库，未找到的ID再依次查归档库（归档时保留原ID，ID在各库间唯一）
+    
+    Args:
+        sql_template: 含 {placeholders} 的查询语句，第一列须为 id
+        ids: ID列表
+    
+    Returns:
+        dict: {id: row}
+    """
+    found = {}
+    with get_db_connection() as conn:
+        for row in _fetch_existing_keys(conn.cursor(), sql_template, ids):
+            found[row[0]] = row
+    missing = [pid for pid in ids if pid not in found]
+    for year in get_archive_years():
+        if not missing:
+            break
+        conn = _connect_archive(year)
+        if conn is None:
+            continue
+        try:
+            for row in _fetch_existing_keys(conn.cursor(), sql_template, missing):
+                found[row[0]] = row
+        finally:
+            conn.close()
+        missing = [pid for pid in missing if pid not in found]
+    return found
+
+def get_policy_content(policy_id):
+    """
+    按需读取单条政策正文（含归档库）
+    
+    Args:
+        policy_id: 政策ID
+    
+    Returns:
+        正文字符串，记录不存在时返回None
+    """
+    try:
+        rows = _fetch_rows_by_ids('SELECT id, policy_content(content) FROM policy WHERE id IN ({placeholders})', [policy_id])
+        row = rows.get(policy_id)
+        return row[1] if row else None
+    except Exception as e:
+        logger.error(f"获取政策正文失败 ID {policy_id}: {e}", exc_info=True)
+        return None
+
+def get_policy_contents(policy_ids):
+    """
+    批量读取政策正文（含归档库）
+    
+    Args:
+        policy_ids: 政策ID列表
+    
+    Returns:
+        dict: {id: content}
+    """
+    ids = [pid for pid in dict.fromkeys(policy_ids) if pid is not None]
+    if not ids:
+        return {}
+    try:
+        rows = _fetch_rows_by_ids('SELECT id, policy_content(content) FROM policy WHERE id IN ({placeholders})', ids)
+        return {pid: row[1] for pid, row in rows.items()}
+    except Exception as e:
+        logger.error(f"批量获取政策正文失败: {e}", exc_info=True)
+        return {}
+
 def get_policy_by_id(policy_id):
     """
-    根据ID获取政策详情（改进：使用上下文管理器）
+    根据ID获取政策详情（含归档库）
     
     Args:
         policy_id: 政策ID
@@ -520,17 +1817,145 @@ def get_policy_by_id(policy_id):
     Returns:
         政策数据元组或None
     """
-    from .db_connection import get_db_connection
+    try:
+        rows = _fetch_rows_by_ids(
+            f'SELECT {POLICY_DETAIL_COLUMNS} FROM policy WHERE id IN ({{placeholders}})', [policy_id])
+        return rows.get(policy_id)
+    except Exception as e:
+        logger.error(f"获取政策详情失败 ID {policy_id}: {e}", exc_info=True)
+        return None
+
+_fts_maintenance_stop = threading.Event()
+_fts_maintenance_thread = None
+_fts_maintenance_lock = threading.Lock()
+
+def run_fts_maintenance(merge_pages=None, max_steps=None):
+    """
+    全文索引增量维护：分多次执行有界的 merge，合并持续追加产生的小索引段
     
+    每次 merge 单独提交，写锁只持有很短时间，不影响并发入库。
+    
+    Args:
+        merge_pages: 每次 merge 最多处理的页数
+        max_steps: 本轮最多执行的 merge 次数
+    
+    Returns:
+        int: 实际执行了合并工作的次数
+    """
+    db_config = config.app_config.get_database_config()
+    if merge_pages is None:
+        merge_pages = db_config.get('fts_merge_pages', fts.FTS_MERGE_PAGES)
+    if max_steps is None:
+        max_steps = db_config.get('fts_merge_max_steps', 20)
+    
+    steps = 0
     try:
         with get_db_connection() as conn:
             c = conn.cursor()
-            c.execute('SELECT * FROM policy WHERE id = ?', (policy_id,))
-            result = c.fetchone()
-            return result
+            for _ in range(max_steps):
+                worked = fts.merge(c, merge_pages)
+                commit_batch(conn)
+                if not worked:
+                    break
+                steps += 1
+        if steps:
+            logger.debug(f"全文索引维护完成，执行合并 {steps} 次")
+        return steps
     except Exception as e:
-        logger.error(f"获取政策详情失败 ID {policy_id}: {e}", exc_info=True)
+        logger.error(f"全文索引维护失败: {e}", exc_info=True)
+        return steps
+
+def _needs_content_conversion():
+    """已启用正文压缩但尚未生成字典（首次启用后由后台维护线程完成转换）"""
+    codec = config.app_config.get_database_config().get(
+        'content_compression', compression.CONTENT_COMPRESSION_NONE)
+    if codec == compression.CONTENT_COMPRESSION_NONE:
+        return False
+    try:
+        with get_db_connection() as conn:
+            return _get_content_dict_id(conn.cursor()) is None
+    except Exception as e:
+        logger.warning(f"检查正文压缩字典失败: {e}")
+        return False
+
+def start_fts_maintenance_scheduler(interval=None):
+    """
+    启动后台线程，按固定间隔执行 run_fts_maintenance()
+    
+    启用归档时同时归档历史政策；首次启用正文压缩时生成字典并转换已有正文。
+    
+    Args:
+        interval: 间隔秒数，默认读取配置 fts_maintenance_interval，<=0 表示不启动
+    """
+    global _fts_maintenance_thread
+    if interval is None:
+        interval = config.app_config.get_database_config().get('fts_maintenance_interval', 1800)
+    if not interval or interval <= 0:
         return None
+    
+    with _fts_maintenance_lock:
+        if _fts_maintenance_thread is not None and _fts_maintenance_thread.is_alive():
+            return _fts_maintenance_thread
+        _fts_maintenance_stop.clear()
+        
+        def run():
+            while not _fts_maintenance_stop.wait(interval):
+                if get_archive_cutoff_date():
+                    archive_old_policies()
+                if _needs_content_conversion():
+                    convert_content_storage()
+                run_fts_maintenance()
+        
+        _fts_maintenance_thread = threading.Thread(target=run, name='fts-maintenance', daemon=True)
+        _fts_maintenance_thread.start()
+        return _fts_maintenance_thread
+
+def stop_fts_maintenance_scheduler():
+    """停止全文索引维护线程"""
+    _fts_maintenance_stop.set()
+
+def optimize_fts_index():
+    """把全文索引完全合并为一个段（耗时较长，适合空闲时手动执行）"""
+    try:
+        with get_db_connection() as conn:
+            fts.optimize(conn.cursor())
+        logger.info("全文索引优化完成")
+        return True
+    except Exception as e:
+        logger.error(f"全文索引优化失败: {e}", exc_info=True)
+        return False
+
+def check_fts_index(rebuild_on_error=False):
+    """
+    检查全文索引完整性
+    
+    Args:
+        rebuild_on_error: 检查失败时是否自动重建
+    
+    Returns:
+        tuple: (索引是否一致, 错误信息)，自动重建成功时返回 (True, 原错误信息)
+    """
+    with get_db_connection() as conn:
+        ok, error = fts.integrity_check(conn.cursor())
+    if ok:
+        logger.info("全文索引完整性检查通过")
+        return True, None
+    
+    logger.warning(f"全文索引完整性检查失败: {error}")
+    if rebuild_on_error and rebuild_fts_index():
+        return True, error
+    return False, error
+
+def rebuild_fts_index():
+    """从 policy 表完整重建全文索引"""
+    try:
+        with get_db_connection() as conn:
+            fts.rebuild(conn.cursor())
+        logger.info("全文索引重建完成")
+        return True
+    except Exception as e:
+        logger.error(f"全文索引重建失败: {e}", exc_info=True)
+        return False
 
 def get_database_info():
     """获取数据库信息（改进：使用上下文管理器）"""
@@ -562,6 +1987,15 @@ def get_database_info():
             # 获取最后备份时间
             last_backup_time = config.app_config.get_config('last_backup_time')
             
+            # 归档库信息
+            archive_years = get_archive_years()
+            archive_size = 0
+            for year in archive_years:
+                try:
+                    archive_size += os.path.getsize(_get_archive_path(year))
+                except OSError:
+                    pass
+            
             return {
                 'policy_count': policy_count,
                 'latest_date': latest_date,
@@ -569,7 +2003,10 @@ def get_database_info():
                 'file_size_mb': round(float(file_size) / (1024 * 1024), 2),
                 'last_backup_time': last_backup_time,
                 'database_path': db_path,
-                'backup_dir': get_backup_dir()
+                'backup_dir': get_backup_dir(),
+                'pool_stats': get_pool_stats(),
+                'archive_years': archive_years,
+                'archive_size_mb': round(float(archive_size) / (1024 * 1024), 2)
             }
     except sqlite3.Error as e:
         logger.error(f"获取数据库信息失败（数据库错误）: {e}", exc_info=True)
@@ -579,7 +2016,8 @@ def get_database_info():
         return {}
 
 def restore_database(backup_file):
-    """从备份文件恢复数据库"""
+    """从备份文件恢复数据库（支持压缩备份）"""
+    tmp_path = None
     try:
         db_path = get_database_path()
         backup_path = os.path.join(get_backup_dir(), backup_file)
@@ -588,15 +2026,29 @@ def restore_database(backup_file):
             logger.warning(f"备份文件不存在: {backup_path}")
             return False
         
+        # 压缩备份先解压到临时文件
+        compression = _get_backup_compression(backup_file)
+        source_path = backup_path
+        if compression != BACKUP_COMPRESSION_NONE:
+            tmp_path = os.path.join(get_backup_dir(), f".restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db.tmp")
+            _decompress_file(backup_path, tmp_path, compression)
+            source_path = tmp_path
+        
         # 备份当前数据库
         if os.path.exists(db_path):
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             current_backup = os.path.join(get_backup_dir(), f"before_restore_{timestamp}.db")
-            shutil.copy2(db_path, current_backup)
+            _online_copy(db_path, current_backup)
             logger.info(f"当前数据库已备份到: {current_backup}")
         
-        # 恢复数据库
-        shutil.copy2(backup_path, db_path)
+        # 关闭连接池，恢复后重新建立连接
+        close_db_pool()
+        
+        # 通过备份API写回（经由WAL写入，无需手动处理-wal/-shm文件）
+        _online_copy(source_path, db_path)
+        
+        # 旧版本备份可能缺少新字段/索引，恢复后重新执行迁移
+        init_db()
         logger.info(f"数据库恢复完成: {backup_path}")
         return True
     except (OSError, IOError) as e:
@@ -605,6 +2057,12 @@ def restore_database(backup_file):
     except Exception as e:
         logger.error(f"数据库恢复失败（未知错误）: {e}", exc_info=True)
         return False
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
 def get_backup_files():
     """获取所有备份文件"""
@@ -613,7 +2071,7 @@ def get_backup_files():
         backup_files = []
         
         for filename in os.listdir(backup_dir):
-            if filename.startswith('policy_backup_') and filename.endswith('.db'):
+            if _is_backup_filename(filename):
                 file_path = os.path.join(backup_dir, filename)
                 try:
                     # 使用os.stat避免大文件大小溢出
@@ -629,7 +2087,8 @@ def get_backup_files():
                         'file_path': file_path,
                         'file_size': file_size,
                         'file_size_mb': file_size_mb,
-                        'file_time': file_time.strftime('%Y-%m-%d %H:%M:%S')
+                        'file_time': file_time.strftime('%Y-%m-%d %H:%M:%S'),
+                        'compression': _get_backup_compression(filename)
                     })
                 except (OSError, OverflowError) as e:
                     logger.warning(f"处理文件 {filename} 时出错: {e}")
@@ -665,17 +2124,34 @@ class DatabaseManager:
         """插入政策数据"""
         return insert_policy(level, title, pub_date, source, content, crawl_time)
     
+    def insert_policies_bulk(self, policies, batch_size=DEFAULT_BULK_BATCH_SIZE):
+        """批量插入政策数据"""
+        return insert_policies_bulk(policies, batch_size)
+    
     def search_policies(self, level=None, keywords=None, start_date=None, end_date=None):
         """搜索政策，支持时间区间"""
         return search_policies(level, keywords, start_date, end_date)
     
+    def search_policy_list(self, level=None, keywords=None, start_date=None, end_date=None,
+                           limit=DEFAULT_LIST_PAGE_SIZE, after=None, order_by=None):
+        """搜索政策列表（轻量字段，键集分页）"""
+        return search_policy_list(level, keywords, start_date, end_date, limit, after, order_by)
+    
     def get_policy_by_id(self, policy_id):
         """根据ID获取政策详情"""
         return get_policy_by_id(policy_id)
     
-    def backup_database(self):
+    def get_policy_content(self, policy_id):
+        """按需读取政策正文"""
+        return get_policy_content(policy_id)
+    
+    def backup_database(self, compression=None, progress_callback=None):
         """备份数据库"""
-        return backup_database()
+        return backup_database(compression, progress_callback)
+    
+    def backup_database_async(self, compression=None, progress_callback=None):
+        """在后台线程中备份数据库"""
+        return backup_database_async(compression, progress_callback)
     
     def restore_database(self, backup_file):
         """从备份文件恢复数据库"""
@@ -695,4 +2171,28 @@ class DatabaseManager:
     
     def clear_database(self):
         """清理数据库 - 删除所有政策数据"""
-        return clear_database() 
\ No newline at end of file
+        return clear_database()
+    
+    def deduplicate_database(self, dry_run=False, batch_size=1000, progress_callback=None):
+        """清理数据库中的重复记录"""
+        return deduplicate_database(dry_run, batch_size, progress_callback)
+    
+    def convert_content_storage(self, codec=None, batch_size=500, vacuum=False, progress_callback=None):
+        """转换正文存储格式（压缩/解压）"""
+        return convert_content_storage(codec, batch_size, vacuum, progress_callback)
+    
+    def archive_old_policies(self, cutoff_date=None, batch_size=None, progress_callback=None):
+        """把历史政策迁移到按年份划分的归档库"""
+        return archive_old_policies(cutoff_date, batch_size, progress_callback)
+    
+    def run_fts_maintenance(self, merge_pages=None, max_steps=None):
+        """全文索引增量维护"""
+        return run_fts_maintenance(merge_pages, max_steps)
+    
+    def check_fts_index(self, rebuild_on_error=False):
+        """检查全文索引完整性"""
+        return check_fts_index(rebuild_on_error)
+    
+    def rebuild_fts_index(self):
+        """重建全文索引"""
+        return rebuild_fts_index() 
\ No newline at end of file
@@ -2,19 +2,353 @@
 # -*- coding: utf-8 -*-
 """
 数据库连接管理模块
-提供上下文管理器，确保数据库连接正确关闭
+提供上下文管理器和线程感知的连接池，确保数据库连接正确复用和归还
 """
 
+import os
+import queue
 import sqlite3
+import threading
+import time
+import atexit
 import logging
 from contextlib import contextmanager
 from typing import Optional
 
 from .exceptions import DatabaseConnectionError
 from . import config
+from . import fts
 
 logger = logging.getLogger(__name__)
 
+# 连接池默认参数（可在配置文件 database 节中覆盖）
+DEFAULT_POOL_SIZE = 8
+DEFAULT_POOL_TIMEOUT = 30.0
+DEFAULT_CACHE_SIZE_KB = 20000           # 每个连接约20MB页缓存
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024   # 256MB内存映射
+
+
+def _get_db_setting(key, default):
+    """读取数据库配置项（旧配置文件可能缺少新键）"""
+    try:
+        return config.app_config.get_database_config().get(key, default)
+    except Exception:
+        return default
+
+
+def configure_connection(conn):
+    """
+    为新建连接设置性能相关的PRAGMA（每个连接只执行一次）
+
+    - journal_mode=WAL: 读写互不阻塞
+    - synchronous=NORMAL: WAL模式下安全且显著减少fsync
+    - cache_size/mmap_size/temp_store: 减少磁盘IO
+    - 注册全文检索所需的SQL函数
+    """
+    journal_mode = str(_get_db_setting('journal_mode', 'WAL')).upper()
+    cache_size_kb = int(_get_db_setting('cache_size_kb', DEFAULT_CACHE_SIZE_KB))
+    mmap_size = int(_get_db_setting('mmap_size', DEFAULT_MMAP_SIZE))
+
+    try:
+        conn.execute(f'PRAGMA journal_mode={journal_mode}')
+    except sqlite3.Error as e:
+        # 网络文件系统等环境不支持WAL时保持默认日志模式
+        logger.warning(f"设置journal_mode={journal_mode}失败，使用默认模式: {e}")
+    conn.execute('PRAGMA synchronous=NORMAL')
+    # 负值表示以KiB为单位
+    conn.execute(f'PRAGMA cache_size=-{cache_size_kb}')
+    conn.execute(f'PRAGMA mmap_size={mmap_size}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    # 全文检索分词视图和摘要依赖的SQL函数
+    fts.register_functions(conn)
+    return conn
+
+
+class ConnectionPool:
+    """
+    线程感知的SQLite连接池
+
+    - 连接长期保持，避免每次操作都重新连接和解析schema
+    - 同一线程嵌套使用时复用同一连接（不会因池耗尽而自锁）
+    - 池大小有上限，超出时等待其他线程归还
+    - 记录命中/未命中和等待时间统计
+    """
+
+    def __init__(self, db_path, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.max_size = max(1, int(max_size))
+        self.timeout = float(timeout)
+
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        self._stats = {
+            'hits': 0,              # 复用空闲连接
+            'misses': 0,            # 新建连接
+            'reentrant': 0,         # 同一线程嵌套复用
+            'waits': 0,             # 因池耗尽而等待的次数
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'timeouts': 0,
+        }
+
+    def _create_connection(self):
+        """新建并配置连接"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 返回字典式行对象
+        configure_connection(conn)
+        logger.debug(f"数据库连接已建立: {self.db_path}")
+        return conn
+
+    def acquire(self):
+        """
+        获取连接（同一线程内可重入）
+
+        Returns:
+            sqlite3.Connection
+
+        Raises:
+            DatabaseConnectionError: 连接池已关闭或等待超时
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            with self._lock:
+                self._stats['reentrant'] += 1
+            return held
+
+        if self._closed:
+            raise DatabaseConnectionError("数据库连接池已关闭")
+
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats['hits'] += 1
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.max_size
+                if can_create:
+                    self._created += 1
+                    self._stats['misses'] += 1
+            if can_create:
+                try:
+                    conn = self._create_connection()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats['timeouts'] += 1
+                    raise DatabaseConnectionError(
+                        f"等待数据库连接超时（{self.timeout}秒，连接池大小 {self.max_size}）")
+                waited = time.perf_counter() - start
+                with self._lock:
+                    self._stats['hits'] += 1
+                    self._stats['waits'] += 1
+                    self._stats['total_wait_time'] += waited
+                    self._stats['max_wait_time'] = max(self._stats['max_wait_time'], waited)
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """归还连接；嵌套使用时只有最外层才真正归还"""
+        if getattr(self._local, 'conn', None) is not conn:
+            return
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        # 归还前确保没有未结束的事务
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"归还连接时回滚失败，丢弃该连接: {e}")
+            self._discard(conn)
+            return
+
+        if self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def is_outermost(self, conn):
+        """当前线程是否处于该连接的最外层使用"""
+        return getattr(self._local, 'conn', None) is conn and self._local.depth == 1
+
+    def is_nested(self, conn):
+        """当前线程是否在该连接的内层作用域中使用（外层事务尚未结束）"""
+        return getattr(self._local, 'conn', None) is conn and self._local.depth > 1
+
+    def depth(self):
+        """当前线程的嵌套层数（未持有连接时为0）"""
+        return getattr(self._local, 'depth', 0) if getattr(self._local, 'conn', None) is not None else 0
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception as close_error:
+            logger.error(f"关闭数据库连接失败: {close_error}", exc_info=True)
+        with self._lock:
+            self._created -= 1
+
+    def close_all(self):
+        """关闭全部空闲连接；正在使用的连接在归还时关闭"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+        logger.debug(f"数据库连接池已关闭: {self.db_path}")
+
+    def get_stats(self):
+        """获取连接池统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['created'] = self._created
+        stats['idle'] = self._idle.qsize()
+        stats['in_use'] = stats['created'] - stats['idle']
+        stats['max_size'] = self.max_size
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / total, 4) if total else 0.0
+        stats['avg_wait_time'] = (stats['total_wait_time'] / stats['waits']) if stats['waits'] else 0.0
+        return stats
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """获取当前数据库路径对应的全局连接池（数据库路径变化时自动重建）"""
+    global _pool
+    db_path = config.app_config.get_database_path()
+    pool = _pool
+    if pool is not None and pool.db_path == db_path and not pool._closed:
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.db_path != db_path or _pool._closed:
+            if _pool is not None:
+                _pool.close_all()
+            # 换用了另一个数据库文件：缓存的FTS结构信息属于旧文件
+            fts.reset_fts_cache()
+            _pool = ConnectionPool(
+                db_path,
+                max_size=_get_db_setting('pool_size', DEFAULT_POOL_SIZE),
+                timeout=_get_db_setting('pool_timeout', DEFAULT_POOL_TIMEOUT),
+            )
+        return _pool
+
+
+def close_db_pool():
+    """
+    关闭全局连接池
+
+    在替换数据库文件（如恢复备份）之前必须调用，下次使用时会自动重建
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+        fts.reset_fts_cache()
+
+
+def get_pool_stats():
+    """获取全局连接池统计信息（命中/未命中、等待时间等）"""
+    pool = _pool
+    if pool is None:
+        return {}
+    return pool.get_stats()
+
+
+atexit.register(close_db_pool)
+
+
+def _begin_savepoint(conn, name):
+    """嵌套使用时开启保存点（先确保外层事务已开始，保存点释放后并入外层事务）"""
+    if not conn.in_transaction:
+        conn.execute('BEGIN')
+    conn.execute(f'SAVEPOINT {name}')
+
+
+def _release_savepoint(conn, name):
+    """释放保存点（内层代码已自行提交时保存点已不存在，忽略）"""
+    if conn.in_transaction:
+        try:
+            conn.execute(f'RELEASE SAVEPOINT {name}')
+        except sqlite3.OperationalError as e:
+            logger.debug(f"释放保存点 {name} 失败（可能已提交）: {e}")
+
+
+def _rollback_scope(conn, savepoint):
+    """回滚当前作用域：嵌套使用时只回滚到本层保存点，最外层回滚整个事务"""
+    if savepoint is None:
+        conn.rollback()
+        return
+    if not conn.in_transaction:
+        return
+    try:
+        conn.execute(f'ROLLBACK TO SAVEPOINT {savepoint}')
+        conn.execute(f'RELEASE SAVEPOINT {savepoint}')
+    except sqlite3.OperationalError as e:
+        logger.debug(f"回滚到保存点 {savepoint} 失败（可能已提交）: {e}")
+
+
+def begin_immediate(conn):
+    """
+    开启立即获取写锁的事务
+
+    嵌套作用域（或外层已开启事务）时事务已由外层持有，只在本层保存点内执行，
+    避免 "cannot start a transaction within a transaction"。
+    """
+    if not conn.in_transaction:
+        conn.execute('BEGIN IMMEDIATE')
+
+
+def is_nested_scope(conn):
+    """连接是否处于外层 get_db_connection 作用域之内（外层事务由外层提交或回滚）"""
+    pool = _pool
+    return pool is not None and pool.is_nested(conn)
+
+
+def commit_batch(conn):
+    """
+    分批写入时提交当前批次
+
+    最外层作用域（或不属于连接池的连接）直接提交；嵌套在外层事务中时不提交，
+    由最外层的 get_db_connection 统一提交或回滚。
+    """
+    if is_nested_scope(conn):
+        return
+    conn.commit()
+
+
+def rollback_batch(conn):
+    """
+    分批写入出错时回滚当前未提交的批次
+
+    嵌套在外层事务中时不回滚，由出错时的 get_db_connection 回滚到本层保存点。
+    """
+    if is_nested_scope(conn):
+        return
+    conn.rollback()
+
 
 @contextmanager
 def get_db_connection():
@@ -26,38 +360,51 @@ def get_db_connection():
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM policy")
             results = cursor.fetchall()
-        # 连接自动关闭
+        # 事务自动提交，连接归还连接池
+    
+    同一线程内嵌套使用时复用同一连接：内层作用域使用保存点（SAVEPOINT），
+    内层出错只回滚内层的修改，外层的修改由最外层统一提交或回滚。
     
     Yields:
-        sqlite3.Connection: 数据库连接对象
+        sqlite3.Connection: 数据库连接对象（来自连接池，同一线程内可嵌套使用）
     
     Raises:
         DatabaseConnectionError: 连接失败时抛出
     """
-    db_path = config.app_config.get_database_path()
+    pool = get_connection_pool()
+    db_path = pool.db_path
     conn = None
+    savepoint = None
     try:
-        # 确保数据库目录存在
-        import os
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = pool.acquire()
+        if not pool.is_outermost(conn):
+            savepoint = f"db_scope_{pool.depth()}"
+            _begin_savepoint(conn, savepoint)
         
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # 返回字典式行对象
-        
-        logger.debug(f"数据库连接已建立: {db_path}")
         yield conn
         
-        conn.commit()
-        logger.debug("数据库连接已提交并关闭")
+        # 嵌套使用时释放保存点，由最外层统一提交
+        if savepoint is None:
+            conn.commit()
+            logger.debug("数据库事务已提交，连接已归还连接池")
+        else:
+            _release_savepoint(conn, savepoint)
+    except DatabaseConnectionError:
+        if conn and conn.in_transaction:
+            _rollback_scope(conn, savepoint)
+        raise
     except sqlite3.Error as e:
         if conn:
-            conn.rollback()
+            _rollback_scope(conn, savepoint)
+        if fts.is_missing_function_error(e):
+            logger.error(f"数据库写入失败: {e}。{fts.MISSING_FUNCTIONS_HINT}")
+            raise DatabaseConnectionError(f"数据库写入失败: {e}。{fts.MISSING_FUNCTIONS_HINT}") from e
         logger.error(f"数据库操作失败: {e}", exc_info=True)
         raise DatabaseConnectionError(f"无法连接数据库 {db_path}: {e}") from e
     except OSError as e:
         if conn:
             try:
-                conn.rollback()
+                _rollback_scope(conn, savepoint)
             except (sqlite3.Error, OSError):
                 pass
         logger.error(f"数据库文件操作失败: {e}", exc_info=True)
@@ -65,17 +412,14 @@ def get_db_connection():
     except Exception as e:
         if conn:
             try:
-                conn.rollback()
+                _rollback_scope(conn, savepoint)
             except (sqlite3.Error, OSError):
                 pass
         logger.error(f"数据库操作出现未知错误: {e}", exc_info=True)
         raise DatabaseConnectionError(f"数据库操作失败: {e}") from e
     finally:
         if conn:
-            try:
-                conn.close()
-            except Exception as close_error:
-                logger.error(f"关闭数据库连接失败: {close_error}", exc_info=True)
+            pool.release(conn)
 
 
 @contextmanager
@@ -87,7 +431,7 @@ def get_db_cursor():
         with get_db_cursor() as cursor:
             cursor.execute("SELECT * FROM policy")
             results = cursor.fetchall()
-        # 连接和游标自动关闭
+        # 事务自动提交，连接归还连接池
     
     Yields:
         sqlite3.Cursor: 数据库游标对象
@@ -96,11 +440,6 @@ def get_db_cursor():
         DatabaseConnectionError: 连接失败时抛出
     """
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            yield cursor
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+        # 提交和回滚由 get_db_connection 按嵌套层次处理
+        yield conn.cursor()
 
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文检索模块
+提供中文友好的FTS5分词、查询构建和索引结构管理
+
+FTS5 自带的 unicode61 分词器会把连续的中文整段当作一个词，导致中文关键词几乎无法命中。
+cjk 模式下把每个中日韩字符切成独立的词（以不可见分隔符隔开），查询时把关键词转换为
+相邻字符的短语查询，从而得到与子串匹配一致的结果，并可使用 bm25() 排序和 snippet() 摘要。
+
+内容视图和同步触发器调用应用注册的SQL函数（policy_content、fts_segment），
+写入 policy 表的连接必须先调用 register_functions()（连接池的连接已自动注册）；
+sqlite3 命令行等未注册函数的连接只能读取 policy 表，写入会报 "no such function"。
+"""
+
+import re
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+from . import compression
+
+logger = logging.getLogger(__name__)
+
+# 分词模式
+FTS_TOKENIZER_CJK = 'cjk'              # 中日韩单字切分 + unicode61（默认）
+FTS_TOKENIZER_UNICODE61 = 'unicode61'  # 旧版默认分词（中文检索效果差）
+SUPPORTED_TOKENIZERS = (FTS_TOKENIZER_CJK, FTS_TOKENIZER_UNICODE61)
+
+# 供FTS读取的内容视图（解压正文，cjk 模式下同时切分中文）
+FTS_SOURCE_VIEW = 'policy_fts_source'
+
+# 索引结构版本（视图/触发器定义变化时递增）
+# 1: cjk 模式分词视图；2: 两种模式都通过视图读取并解压正文；3: 触发器注明依赖的SQL函数
+FTS_SCHEMA_VERSION = 3
+
+# 切分中文时使用的分隔符（unicode61视为分隔符，显示前会被去除）
+SEGMENT_SEPARATOR = '\x1f'
+
+# 前缀索引长度（加速 xxx* 前缀查询）
+FTS_PREFIX = '2 3'
+
+# bm25 列权重：标题、正文、机构
+BM25_WEIGHTS = (10.0, 1.0, 0.0)
+
+# 摘要参数
+SNIPPET_OPEN = '【'
+SNIPPET_CLOSE = '】'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 32
+
+# 同步FTS索引的触发器（policy 表增删改时自动维护索引）
+FTS_TRIGGER_INSERT = 'policy_fts_ai'
+FTS_TRIGGER_DELETE = 'policy_fts_ad'
+FTS_TRIGGER_UPDATE = 'policy_fts_au'
+FTS_TRIGGERS = (FTS_TRIGGER_INSERT, FTS_TRIGGER_DELETE, FTS_TRIGGER_UPDATE)
+
+# 每次 merge 命令最多处理的页数（限制单次维护的耗时）
+FTS_MERGE_PAGES = 500
+
+# 内容视图和触发器依赖的SQL函数（由 register_functions 注册）
+FTS_FUNCTIONS = ('policy_content', 'fts_segment', 'fts_desegment')
+MISSING_FUNCTIONS_HINT = (
+    "policy 表的全文索引触发器依赖应用注册的SQL函数（policy_content、fts_segment），"
+    "请使用 db_connection.configure_connection() 或 fts.register_functions() 配置连接后再写入；"
+    "sqlite3 命令行等外部工具只能只读访问"
+)
+
+_CJK_RE = re.compile(r'([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af])')
+_FTS_OPERATORS = {'AND', 'OR', 'NOT', 'NEAR'}
+
+_fts_tokenizer_cache = {}
+
+
+def segment_text(text):
+    """把中日韩字符切分为独立的词（其它文本保持不变）"""
+    if not text:
+        return text
+    return _CJK_RE.sub(SEGMENT_SEPARATOR + r'\1' + SEGMENT_SEPARATOR, str(text))
+
+
+def desegment_text(text):
+    """去除 segment_text 插入的分隔符"""
+    if not text:
+        return text
+    return str(text).replace(SEGMENT_SEPARATOR, '')
+
+
+def register_functions(conn):
+    """在连接上注册FTS所需的SQL函数（内容视图、触发器和摘要依赖这些函数）"""
+    conn.create_function('fts_segment', 1, segment_text, deterministic=True)
+    conn.create_function('fts_desegment', 1, desegment_text, deterministic=True)
+    compression.register_functions(conn)
+    return conn
+
+
+def is_missing_function_error(error):
+    """是否为连接未注册FTS所需SQL函数导致的错误"""
+    message = str(error)
+    return 'no such function' in message and any(name in message for name in FTS_FUNCTIONS)
+
+
+def _keyword_to_match(keyword):
+    """把单个关键词（可含空格分隔的多个词）转换为FTS5查询片段"""
+    phrases = []
+    for word in keyword.split():
+        if word.upper() in _FTS_OPERATORS:
+            continue
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        tokens = segment_text(word).replace(SEGMENT_SEPARATOR, ' ').split()
+        # 引号内只需去除双引号（已由输入验证移除），其余字符按短语处理
+        tokens = [t.replace('"', '') for t in tokens if t.replace('"', '')]
+        if not tokens:
+            continue
+        phrase = '"' + ' '.join(tokens) + '"'
+        if prefix:
+            phrase += '*'
+        phrases.append(phrase)
+    if not phrases:
+        return ''
+    return phrases[0] if len(phrases) == 1 else '(' + ' '.join(phrases) + ')'
+
+
+def build_match_expression(keywords):
+    """
+    由已清理的关键词列表构建FTS5 MATCH表达式
+
+    每个关键词内的多个词为“且”关系，关键词之间为“或”关系；
+    中文按相邻字符短语匹配。
+
+    Returns:
+        str: MATCH表达式，没有有效关键词时返回空字符串
+    """
+    parts = [p for p in (_keyword_to_match(kw) for kw in keywords or []) if p]
+    return ' OR '.join(parts)
+
+
+def snippet_expression(column=1):
+    """正文摘要表达式（已去除分词分隔符）"""
+    return (f"fts_desegment(snippet(policy_fts, {column}, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', "
+            f"'{SNIPPET_ELLIPSIS}', {SNIPPET_TOKENS}))")
+
+
+def highlight_expression(column=0):
+    """标题高亮表达式（已去除分词分隔符）"""
+    return f"fts_desegment(highlight(policy_fts, {column}, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}'))"
+
+
+def _get_stored_tokenizer(c):
+    """读取当前FTS表使用的分词模式（旧数据库没有记录时视为 unicode61）"""
+    c.execute("SELECT name FROM sqlite_master WHERE name='policy_fts'")
+    if not c.fetchone():
+        return None
+    c.execute("SELECT value FROM system_info WHERE key='fts_tokenizer'")
+    row = c.fetchone()
+    return row[0] if row else FTS_TOKENIZER_UNICODE61
+
+
+def _get_stored_schema_version(c):
+    """读取索引结构版本（没有记录时为1）"""
+    c.execute("SELECT value FROM system_info WHERE key='fts_schema_version'")
+    row = c.fetchone()
+    return int(row[0]) if row else 1
+
+
+def _set_system_info(c, key, value):
+    c.execute('''
+        INSERT OR REPLACE INTO system_info (key, value, update_time)
+        VALUES (?, ?, ?)
+    ''', (key, str(value), datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+
+def _column_expressions(tokenizer, prefix):
+    """返回写入FTS的 (title, content) 表达式（prefix 为 new/old 等行引用，视图中为空）"""
+    title = f'{prefix}title'
+    content = f'policy_content({prefix}content)'
+    if tokenizer == FTS_TOKENIZER_CJK:
+        return f'fts_segment({title})', f'fts_segment({content})'
+    return title, content
+
+
+def _create_source_view(c, tokenizer):
+    """创建FTS内容视图"""
+    title, content = _column_expressions(tokenizer, '')
+    c.execute(f'''
+        CREATE VIEW IF NOT EXISTS {FTS_SOURCE_VIEW} AS
+        SELECT id, {title} AS title, {content} AS content, level
+        FROM policy
+    ''')
+
+
+def _create_fts_table(c, tokenizer):
+    """按分词模式创建FTS表"""
+    if tokenizer == FTS_TOKENIZER_CJK:
+        c.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS policy_fts USING fts5(
+                title, content, level, content='{FTS_SOURCE_VIEW}', content_rowid='id',
+                tokenize='unicode61', prefix='{FTS_PREFIX}'
+            )
+        ''')
+    else:
+        c.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS policy_fts USING fts5(
+                title, content, level, content='{FTS_SOURCE_VIEW}', content_rowid='id'
+            )
+        ''')
+
+
+def _create_triggers(c, tokenizer):
+    """
+    创建同步FTS索引的触发器
+
+    触发器调用 policy_content()（cjk 模式下还有 fts_segment()），
+    写入 policy 表的连接必须先调用 register_functions()。
+    更新触发器只关注被索引的列，回填去重键等更新不会触及索引。
+    """
+    new_title, new_content = _column_expressions(tokenizer, 'new.')
+    old_title, old_content = _column_expressions(tokenizer, 'old.')
+    # 说明写入 sqlite_master，外部工具查看表结构（.schema）时可以看到
+    note = f"-- {MISSING_FUNCTIONS_HINT}"
+
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGER_INSERT} AFTER INSERT ON policy BEGIN
+            {note}
+            INSERT INTO policy_fts(rowid, title, content, level)
+            VALUES (new.id, {new_title}, {new_content}, new.level);
+        END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGER_DELETE} AFTER DELETE ON policy BEGIN
+            {note}
+            INSERT INTO policy_fts(policy_fts, rowid, title, content, level)
+            VALUES ('delete', old.id, {old_title}, {old_content}, old.level);
+        END
+    ''')
+    c.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGER_UPDATE} AFTER UPDATE OF title, content, level ON policy BEGIN
+            {note}
+            INSERT INTO policy_fts(policy_fts, rowid, title, content, level)
+            VALUES ('delete', old.id, {old_title}, {old_content}, old.level);
+            INSERT INTO policy_fts(rowid, title, content, level)
+            VALUES (new.id, {new_title}, {new_content}, new.level);
+        END
+    ''')
+
+
+def _drop_triggers(c):
+    """删除FTS同步触发器"""
+    for name in FTS_TRIGGERS:
+        c.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+@contextmanager
+def triggers_suspended(c):
+    """
+    暂停FTS同步触发器（用于整表删除、正文格式转换等批量操作，调用方负责自行维护索引）
+
+    应在同一事务内使用，退出时按当前分词模式重新创建触发器。
+    """
+    tokenizer = _get_stored_tokenizer(c) or FTS_TOKENIZER_UNICODE61
+    _drop_triggers(c)
+    try:
+        yield
+    finally:
+        _create_triggers(c, tokenizer)
+
+
+def ensure_fts_schema(c, tokenizer=FTS_TOKENIZER_CJK):
+    """
+    确保FTS表与配置的分词模式和索引结构版本一致（init_db 调用）
+
+    分词模式变化时删除并重建FTS表，然后从 policy 表重建索引；
+    cjk 模式只有视图/触发器定义变化时仅重建视图和触发器，索引内容保持不变。
+    要求 system_info 表已存在，且连接已调用 register_functions()。
+    """
+    if tokenizer not in SUPPORTED_TOKENIZERS:
+        logger.warning(f"不支持的FTS分词模式 {tokenizer}，使用 {FTS_TOKENIZER_CJK}")
+        tokenizer = FTS_TOKENIZER_CJK
+
+    current = _get_stored_tokenizer(c)
+    version = _get_stored_schema_version(c)
+    _fts_tokenizer_cache.clear()
+    if current == tokenizer and version == FTS_SCHEMA_VERSION:
+        # 早期版本由应用代码手动同步索引，补建触发器
+        _create_triggers(c, tokenizer)
+        return False
+
+    _drop_triggers(c)
+    c.execute(f'DROP VIEW IF EXISTS {FTS_SOURCE_VIEW}')
+    _create_source_view(c, tokenizer)
+
+    if current == tokenizer and (tokenizer == FTS_TOKENIZER_CJK or version >= 2):
+        # 表定义未变（仍读取同名视图），索引内容不受影响
+        _create_triggers(c, tokenizer)
+        _set_system_info(c, 'fts_schema_version', FTS_SCHEMA_VERSION)
+        logger.info("全文索引视图和触发器已更新")
+        return True
+
+    if current is not None:
+        logger.info(f"FTS结构变更: {current} -> {tokenizer}，正在重建全文索引...")
+        c.execute('DROP TABLE IF EXISTS policy_fts')
+
+    _create_fts_table(c, tokenizer)
+    _create_triggers(c, tokenizer)
+    c.execute("INSERT INTO policy_fts(policy_fts) VALUES('rebuild')")
+    # 持久化默认排序函数，ORDER BY rank 由FTS5内部优化
+    c.execute("INSERT INTO policy_fts(policy_fts, rank) VALUES('rank', ?)",
+              ('bm25({})'.format(', '.join(str(w) for w in BM25_WEIGHTS)),))
+    _set_system_info(c, 'fts_tokenizer', tokenizer)
+    _set_system_info(c, 'fts_schema_version', FTS_SCHEMA_VERSION)
+    logger.info(f"全文索引已就绪（分词模式: {tokenizer}）")
+    return True
+
+
+def get_tokenizer(c):
+    """获取当前FTS表的分词模式（按进程缓存，检索构建查询时使用）"""
+    cached = _fts_tokenizer_cache.get('tokenizer')
+    if cached:
+        return cached
+    try:
+        tokenizer = _get_stored_tokenizer(c)
+    except Exception:
+        tokenizer = None
+    tokenizer = tokenizer or FTS_TOKENIZER_UNICODE61
+    _fts_tokenizer_cache['tokenizer'] = tokenizer
+    return tokenizer
+
+
+def reset_fts_cache():
+    """数据库文件被替换后清除缓存的FTS结构信息"""
+    _fts_tokenizer_cache.clear()
+
+
+def merge(c, pages=FTS_MERGE_PAGES):
+    """
+    执行一次增量合并（FTS5 'merge' 命令），单次最多写入约 pages 页
+
+    Returns:
+        bool: 本次是否做了合并工作（False 表示索引段已合并充分）
+    """
+    before = c.connection.total_changes
+    c.execute("INSERT INTO policy_fts(policy_fts, rank) VALUES('merge', ?)", (int(pages),))
+    # FTS5 文档：total_changes 增量不小于2表示执行了合并
+    return c.connection.total_changes - before >= 2
+
+
+def optimize(c):
+    """把所有索引段合并为一个（FTS5 'optimize' 命令，数据量大时耗时较长）"""
+    c.execute("INSERT INTO policy_fts(policy_fts) VALUES('optimize')")
+
+
+def integrity_check(c):
+    """
+    检查全文索引与 policy 表是否一致
+
+    Returns:
+        tuple: (是否一致, 错误信息)
+    """
+    try:
+        c.execute("INSERT INTO policy_fts(policy_fts, rank) VALUES('integrity-check', 1)")
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def rebuild(c):
+    """从 policy 表完整重建全文索引"""
+    c.execute("INSERT INTO policy_fts(policy_fts) VALUES('rebuild')")
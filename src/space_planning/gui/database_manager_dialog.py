@@ -26,14 +26,19 @@ class BackupThread(QThread):
     
     def __init__(self, operation, backup_file=None):
         super().__init__()
-        self.operation = operation  # 'backup' or 'restore'
+        self.operation = operation  # 'backup', 'restore' or 'fts_check'
         self.backup_file = backup_file
     
     def run(self):
         try:
             if self.operation == 'backup':
                 self.progress_signal.emit("正在备份数据库...")
-                success = db.backup_database()
+                
+                def on_progress(copied, total):
+                    if total:
+                        self.progress_signal.emit(f"正在备份数据库... {copied * 100 // total}%")
+                
+                success = db.backup_database(progress_callback=on_progress)
                 if success:
                     self.finished_signal.emit(True, "数据库备份完成")
                 else:
@@ -45,6 +50,19 @@ class BackupThread(QThread):
                     self.finished_signal.emit(True, "数据库恢复完成")
                 else:
                     self.finished_signal.emit(False, "数据库恢复失败")
+            elif self.operation == 'fts_check':
+                self.progress_signal.emit("正在检查全文索引...")
+                ok, error = db.check_fts_index()
+                if not ok:
+                    self.progress_signal.emit("全文索引不一致，正在重建...")
+                    if db.rebuild_fts_index():
+                        self.finished_signal.emit(True, f"全文索引已重建（检查发现问题: {error}）")
+                    else:
+                        self.finished_signal.emit(False, "全文索引重建失败")
+                else:
+                    self.progress_signal.emit("正在合并全文索引...")
+                    db.run_fts_maintenance()
+                    self.finished_signal.emit(True, "全文索引检查通过")
         except Exception as e:
             self.finished_signal.emit(False, f"操作失败: {str(e)}")
 
@@ -113,6 +131,10 @@ class DatabaseManagerDialog(QDialog):
         self.cleanup_btn.clicked.connect(self.cleanup_backups)
         backup_btn_layout.addWidget(self.cleanup_btn)
         
+        self.fts_check_btn = QPushButton("检查全文索引")
+        self.fts_check_btn.clicked.connect(self.check_fts_index)
+        backup_btn_layout.addWidget(self.fts_check_btn)
+        
         # 添加分隔线
         backup_btn_layout.addStretch()
         
@@ -256,6 +278,10 @@ class DatabaseManagerDialog(QDialog):
         if reply == QMessageBox.Yes:
             self.start_backup_operation('restore', filename)
     
+    def check_fts_index(self):
+        """检查全文索引，不一致时自动重建"""
+        self.start_backup_operation('fts_check')
+    
     def cleanup_backups(self):
         """清理旧备份"""
         reply = QMessageBox.question(self, "确认清理", 
@@ -365,6 +391,7 @@ class DatabaseManagerDialog(QDialog):
         self.backup_btn.setEnabled(False)
         self.restore_btn.setEnabled(False)
         self.cleanup_btn.setEnabled(False)
+        self.fts_check_btn.setEnabled(False)
         
         # 显示进度条
         self.progress_bar.setVisible(True)
@@ -393,6 +420,7 @@ class DatabaseManagerDialog(QDialog):
         self.backup_btn.setEnabled(True)
         self.restore_btn.setEnabled(True)
         self.cleanup_btn.setEnabled(True)
+        self.fts_check_btn.setEnabled(True)
         
         # 更新状态
         if success:
@@ -453,6 +453,7 @@ class MainWindow(QMainWindow):
         
         # 存储当前数据
         self.current_data = []
+        self._crawled_rows = {}
         
         # 初始化 TableManager
         self.table_manager = TableManager(
@@ -592,8 +593,9 @@ class MainWindow(QMainWindow):
                 start_date = None
                 end_date = None
             
-            # 检查是否需要爬取新数据
-            db_results = db.search_policies(level, keywords, start_date, end_date)
+            # 检查是否需要爬取新数据（只需知道是否有足够结果及最新发布日期，按日期取前几条即可）
+            db_results, _ = db.search_policy_list(level, keywords, start_date, end_date,
+                                                  limit=5, order_by=db.ORDER_BY_DATE)
             need_crawl = self._need_crawl_new_data(db_results, keywords)
             
             # 优先级处理：查询速度设置 > 爬虫设置
@@ -627,12 +629,15 @@ class MainWindow(QMainWindow):
             
             # 创建并启动搜索线程
             self.current_data = [] # 清空当前数据
+            self._crawled_rows = {} # 爬取行在current_data中的位置（标题+日期 -> 下标）
             self.refresh_table([]) # 清空表格
             # 传递None给SearchThread，让它根据level动态创建爬虫
             self.search_thread = SearchThread(level, keywords, need_crawl, start_date, end_date, enable_anti_crawler, speed_mode, None, self, use_multithread, thread_count)
             self.search_thread.progress_signal.connect(self.update_progress)
             self.search_thread.result_signal.connect(self.update_results)
+            self.search_thread.result_page_signal.connect(self.append_results) # 数据库结果后续页
             self.search_thread.single_policy_signal.connect(self.on_new_policy) # 新增信号连接
+            self.search_thread.policies_saved_signal.connect(self.on_policies_saved) # 批量入库结果
             self.search_thread.finished_signal.connect(self.search_finished)
             self.search_thread.error_signal.connect(self.search_error)
             self.search_thread.data_count_signal.connect(self.on_data_count_update) # 连接数据量信号
@@ -684,6 +689,13 @@ class MainWindow(QMainWindow):
         self.refresh_table(self.current_data) # 刷新表格
         QApplication.processEvents()
     
+    def append_results(self, rows):
+        """追加数据库查询结果的后续页（只渲染新增的行）"""
+        self.current_data.extend(rows)
+        self.table_manager.current_data = self.current_data
+        self.table_manager.append_rows(rows)
+        QApplication.processEvents()
+    
     def on_new_policy(self, policy):
         """新增政策信号处理"""
         try:
@@ -705,20 +717,7 @@ class MainWindow(QMainWindow):
                 policy['content'] = ""
                 logger.debug(f"政策缺少 content 字段，已添加空字符串: {policy.get('title', 'N/A')[:50]}")
             
-            # 立即保存到数据库
-            try:
-                db.insert_policy(
-                    policy.get('level', ''), 
-                    policy.get('title', ''), 
-                    policy.get('pub_date', ''), 
-                    policy.get('source', ''), 
-                    policy.get('content', ''), 
-                    policy.get('crawl_time', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
-                    policy.get('category')  # 添加分类信息
-                )
-                logger.debug(f"政策已保存到数据库: {policy.get('title', 'N/A')[:50]}")
-            except Exception as db_error:
-                logger.error(f"保存政策到数据库失败: {db_error}", exc_info=True)
+            # 入库由搜索线程批量完成（insert_policies_bulk），结果通过 on_policies_saved 回传
             
             # policy为dict，需转为tuple与表格结构一致
             # 注意：数据库返回的字段顺序是 (id, level, title, pub_date, source, content, category)
@@ -732,6 +731,7 @@ class MainWindow(QMainWindow):
                 policy.get('category', '')
             )
             self.current_data.append(row)
+            self._crawled_rows[(row[2], row[3])] = len(self.current_data) - 1
             logger.debug(f"政策已添加到current_data，当前总数: {len(self.current_data)}")
             
             # 实时显示：每一条都立即显示
@@ -779,6 +779,22 @@ class MainWindow(QMainWindow):
             except Exception as e2:
                 logger.error(f"显示新政策失败: {e2}", exc_info=True)
 
+    def on_policies_saved(self, results):
+        """批量入库结果处理：为新增的行补上数据库ID，并显示新增/重复数量"""
+        inserted = 0
+        for policy, outcome in results:
+            if outcome.get('status') != db.INSERT_STATUS_INSERTED:
+                continue
+            inserted += 1
+            index = self._crawled_rows.pop((policy.get('title', ''), policy.get('pub_date', '')), None)
+            if index is not None and index < len(self.current_data):
+                row = self.current_data[index]
+                if isinstance(row, tuple) and row[0] is None and row[2] == policy.get('title', ''):
+                    self.current_data[index] = (outcome.get('id'),) + row[1:]
+        skipped = len(results) - inserted
+        self.progress_label.setText(f"已保存 {inserted} 条新政策" + (f"，跳过重复 {skipped} 条" if skipped else ""))
+        logger.debug(f"批量入库完成: 新增 {inserted} 条，跳过 {skipped} 条")
+    
     def on_data_count_update(self, count):
         """接收数据量更新信号"""
         logger.debug(f"收到数据量更新信号: {count}")
@@ -962,7 +978,7 @@ class MainWindow(QMainWindow):
                 return
             
             # 获取选中的政策数据
-            selected_policies = [self.current_data[i] for i in selected_indices]
+            selected_policies = self._ensure_contents([self.current_data[i] for i in selected_indices])
             
             # 根据选择的格式设置文件过滤器
             if "分条导出" in selected_format:
@@ -1092,12 +1108,14 @@ class MainWindow(QMainWindow):
             
             # 创建并启动批量爬取线程
             self.current_data = [] # 清空当前数据
+            self._crawled_rows = {}
             self.refresh_table([]) # 清空表格
             # 使用第一个可用的机构进行批量爬取
             self.batch_thread = SearchThread("住房和城乡建设部", None, True, start_date, end_date, True, "正常速度", None, self)
             self.batch_thread.progress_signal.connect(self.update_progress)
             self.batch_thread.result_signal.connect(self.update_results)
             self.batch_thread.single_policy_signal.connect(self.on_new_policy) # 新增信号连接
+            self.batch_thread.policies_saved_signal.connect(self.on_policies_saved) # 批量入库结果
             self.batch_thread.finished_signal.connect(self.batch_finished)
             self.batch_thread.error_signal.connect(self.batch_error)
             self.batch_thread.start()
@@ -1190,6 +1208,7 @@ class MainWindow(QMainWindow):
                 
                 # 进行对比分析
                 if selected_policies:
+                    selected_policies = self._ensure_contents(selected_policies)
                     analysis_result = self.analyze_policies(selected_policies)
                     result_text.setText(analysis_result)
         
@@ -1298,7 +1317,7 @@ class MainWindow(QMainWindow):
         risks = []
         suggestions = []
         
-        for i, policy in enumerate(self.current_data):
+        for i, policy in enumerate(self._ensure_contents(self.current_data)):
             # 解析政策数据格式
             if isinstance(policy, (list, tuple)):
                 content = str(policy[5]) if len(policy) > 5 else ""
@@ -1401,7 +1420,7 @@ class MainWindow(QMainWindow):
             menu = QMenu(self)
             
             # 获取当前行数据
-            item = self.current_data[row]
+            item = self._ensure_contents([self.current_data[row]])[0]
             if isinstance(item, (list, tuple)):
                 title = str(item[2]) if len(item) > 2 else ""
                 source = str(item[4]) if len(item) > 4 else ""
@@ -1453,7 +1472,7 @@ class MainWindow(QMainWindow):
             return
             
         # 获取当前行的数据
-        item = self.current_data[row]
+        item = self._ensure_contents([self.current_data[row]])[0]
         
         # 解析数据格式
         if isinstance(item, (list, tuple)):
@@ -1511,6 +1530,31 @@ class MainWindow(QMainWindow):
                     QTimer.singleShot(0, update)
                 threading.Thread(target=fetch_content, daemon=True).start()
 
+    def _ensure_contents(self, policies):
+        """
+        为按需加载的数据库行补齐正文
+        
+        数据库查询结果只包含列表字段（content为None），需要正文时按ID批量读取，
+        并写回 current_data 避免重复读取。
+        """
+        missing_ids = [
+            p[0] for p in policies
+            if isinstance(p, (list, tuple)) and len(p) > 5 and p[5] is None and p[0] is not None
+        ]
+        if not missing_ids:
+            return list(policies)
+        
+        contents = db.get_policy_contents(missing_ids)
+        
+        def fill(p):
+            if (isinstance(p, (list, tuple)) and len(p) > 5 and p[5] is None
+                    and p[0] in contents):
+                return tuple(p[:5]) + (contents[p[0]] or "",) + tuple(p[6:])
+            return p
+        
+        self.current_data[:] = [fill(p) for p in self.current_data]
+        return [fill(p) for p in policies]
+
     def _show_full_text(self, title, content):
         """显示政策全文到右侧全文区"""
         if self.full_text is not None:
@@ -56,7 +56,6 @@ class TableManager:
     
     def _show_paginated_data(self, data):
         """分页显示数据"""
-        total_pages = (len(data) + self.page_size - 1) // self.page_size
         start_idx = self.current_page * self.page_size
         end_idx = min(start_idx + self.page_size, len(data))
         
@@ -66,6 +65,14 @@ class TableManager:
         for row, item in enumerate(page_data):
             self._set_table_row(row, item)
         
+        self._update_page_info(data)
+    
+    def _update_page_info(self, data):
+        """更新分页信息和导航按钮"""
+        total_pages = (len(data) + self.page_size - 1) // self.page_size
+        start_idx = self.current_page * self.page_size
+        end_idx = min(start_idx + self.page_size, len(data))
+        
         # 更新分页信息
         self.page_info_label.setText(
             f"第 {self.current_page + 1}/{total_pages} 页 "
@@ -77,6 +84,38 @@ class TableManager:
         self.prev_page_btn.setVisible(self.current_page > 0)
         self.next_page_btn.setVisible(self.current_page < total_pages - 1)
     
+    def append_rows(self, rows):
+        """
+        追加已加入 current_data 末尾的行，只渲染新增的行
+        
+        数据库结果按页流式追加时使用，避免每页都重绘整个表格。
+        """
+        data = self.current_data
+        total = len(data)
+        start = total - len(rows)
+        
+        if self.stats_label is not None:
+            self.stats_label.setText(f"共找到 {total} 条政策")
+        
+        if total > self.max_display_rows:
+            if start <= self.max_display_rows:
+                # 刚超过直接显示的上限，切换为分页显示
+                self._show_paginated_data(data)
+                return
+            # 只有落在当前页的新行需要渲染
+            page_start = self.current_page * self.page_size
+            page_end = page_start + self.page_size
+            for idx in range(max(start, page_start), min(total, page_end)):
+                row = idx - page_start
+                self.table.insertRow(row)
+                self._set_table_row(row, data[idx])
+            self._update_page_info(data)
+        else:
+            self.page_info_label.setVisible(False)
+            for idx in range(start, total):
+                self.table.insertRow(idx)
+                self._set_table_row(idx, data[idx])
+    
     def prev_page(self):
         """上一页"""
         if self.current_page > 0:
@@ -248,6 +287,8 @@ class TableManager:
             type_item = QTableWidgetItem(category)
         else:
             # 如果分类为空，使用智能分类作为备选
+            # 数据库列表行不含正文（content为None，按需加载），此时有意只按标题分类，
+            # 不为显示分类而读取正文
             if compliance_analyzer:
                 try:
                     policy_types = compliance_analyzer.classify_policy(title, content)
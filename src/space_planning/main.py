@@ -4,6 +4,7 @@
 空间规划政策爬虫系统 - 主程序入口
 """
 
+import multiprocessing
 import os
 import sys
 
@@ -52,6 +53,8 @@ from space_planning.core import database as db
 from space_planning.core import config
 
 if __name__ == "__main__":
+    # 打包后的程序中，解析进程池（spawn）的子进程从这里进入，须在启动界面之前处理
+    multiprocessing.freeze_support()
     try:
         logger.info("正在初始化应用配置...")
         # 确保配置系统初始化
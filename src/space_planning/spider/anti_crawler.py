@@ -16,6 +16,7 @@ import threading
 
 from .advanced_anti_detection import advanced_anti_detection, cookie_manager
 from .config import crawler_config
+from .http_cache import get_http_cache
 
 
 logger = logging.getLogger(__name__)
@@ -298,6 +299,26 @@ class AntiCrawlerManager:
         request_kwargs.setdefault('allow_redirects', True)
         request_kwargs.setdefault('stream', False)
 
+        # 命中HTTP缓存时不发送请求，也不占用频率限制和延时（流式请求不缓存）
+        http_cache = None if request_kwargs['stream'] else get_http_cache()
+        if http_cache is None:
+            return self._send_request(url, method, request_kwargs)
+
+        def send(headers: Dict) -> requests.Response:
+            return self._send_request(url, method, dict(request_kwargs, headers=headers))
+
+        body = request_kwargs.get('data')
+        if body is None:
+            body = request_kwargs.get('json')
+        return http_cache.request(
+            method, url, send,
+            headers=request_kwargs['headers'],
+            params=request_kwargs.get('params'),
+            data=body,
+        )
+
+    def _send_request(self, url: str, method: str, request_kwargs: Dict) -> requests.Response:
+        """应用频率限制、延时和会话轮换后发送请求（带重试）"""
         self._apply_rate_limit()
         self._sleep_between_requests()
         self._simulate_behavior()
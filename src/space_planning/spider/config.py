@@ -62,6 +62,53 @@ class CrawlerConfig:
             'rate_limit_settings': {
                 'enabled': False,
                 'max_requests_per_minute': 60
+            },
+            'detail_settings': {
+                'workers': 3,  # 详情抓取工作线程数
+                'queue_size': 60,  # 待抓取详情上限（超过时列表抓取等待）
+                'cache_size': 2000  # 详情URL缓存条数
+            },
+            'unit_settings': {
+                'workers': 3  # 并行爬取的"分类 × 发布机关"单元数（共用每分钟请求数限制）
+            },
+            'incremental_settings': {
+                'enabled': False  # 增量模式：翻页到上次爬取的位置（高水位）即停止
+            },
+            'parse_settings': {
+                'processes': 0  # HTML解析进程数（0 表示在抓取线程中解析，>0 时使用进程池绕开GIL）
+            },
+            'http_cache_settings': {
+                'enabled': True,
+                'max_size_mb': 512,  # 缓存文件上限，超过时淘汰最久未访问的条目
+                'default_ttl': 30 * 86400,  # 详情页等未匹配规则的页面有效期（秒）
+                'ttl_rules': None  # [[URL正则, 秒数], ...]，-1 不缓存，0 每次重新验证；None 使用内置规则
+            },
+            'page_size_settings': {
+                'enabled': True,  # 试探列表接口支持的最大页大小（不触发翻页校验/验证码），按接口缓存
+                'candidates': [100, 50],  # 候选页大小（从大到小试探）
+                'ttl_days': 7  # 协商结果有效天数，过期后重新试探
+            },
+            'proxy_lease_settings': {
+                'batch_size': 5,  # 每次向代理商获取的代理数（也是保持可用的代理数）
+                'proxy_ttl': 180,  # 代理有效期（秒）
+                'max_concurrency': 4,  # 单个代理同时租用的线程数上限
+                'refill_ahead': 30,  # 到期前提前补充的秒数
+                'max_failures': 3  # 连续失败该次数后下线代理
+            },
+            'proxy_health_settings': {
+                'enabled': False,  # 代理入池前及代理池定期并发检查代理，移除慢代理和不可用代理
+                'target_url': 'http://httpbin.org/get',  # 检查请求的目标地址，启用时建议改为爬取目标站点
+                'timeout': 5,  # 单次检查超时（秒）
+                'workers': 8,  # 并发检查线程数
+                'interval': 300,  # 代理池定期检查间隔（秒）
+                'window': 20,  # 成功率窗口（最近检查次数）
+                'min_samples': 1,  # 有该次数检查记录后才判定是否健康
+                'min_success_rate': 0.5,  # 窗口内最低成功率
+                'max_p90': 5.0  # p90 延迟上限（秒）
+            },
+            'proxy_session_settings': {
+                'pool_maxsize': 8,  # 每个代理会话连接池的最大连接数
+                'max_sessions': 32  # 最多保留的代理会话数（超过时丢弃最久未使用的）
             }
         }
         
@@ -104,6 +151,53 @@ class CrawlerConfig:
             'rate_limit_settings': {
                 'enabled': True,
                 'max_requests_per_minute': 40
+            },
+            'detail_settings': {
+                'workers': 2,  # 详情抓取工作线程数
+                'queue_size': 60,  # 待抓取详情上限（超过时列表抓取等待）
+                'cache_size': 2000  # 详情URL缓存条数
+            },
+            'unit_settings': {
+                'workers': 2  # 并行爬取的"分类 × 发布机关"单元数（共用每分钟请求数限制）
+            },
+            'incremental_settings': {
+                'enabled': False  # 增量模式：翻页到上次爬取的位置（高水位）即停止
+            },
+            'parse_settings': {
+                'processes': 0  # HTML解析进程数（0 表示在抓取线程中解析，>0 时使用进程池绕开GIL）
+            },
+            'http_cache_settings': {
+                'enabled': True,
+                'max_size_mb': 512,  # 缓存文件上限，超过时淘汰最久未访问的条目
+                'default_ttl': 30 * 86400,  # 详情页等未匹配规则的页面有效期（秒）
+                'ttl_rules': None  # [[URL正则, 秒数], ...]，-1 不缓存，0 每次重新验证；None 使用内置规则
+            },
+            'page_size_settings': {
+                'enabled': True,  # 试探列表接口支持的最大页大小（不触发翻页校验/验证码），按接口缓存
+                'candidates': [100, 50],  # 候选页大小（从大到小试探）
+                'ttl_days': 7  # 协商结果有效天数，过期后重新试探
+            },
+            'proxy_lease_settings': {
+                'batch_size': 5,  # 每次向代理商获取的代理数（也是保持可用的代理数）
+                'proxy_ttl': 180,  # 代理有效期（秒）
+                'max_concurrency': 4,  # 单个代理同时租用的线程数上限
+                'refill_ahead': 30,  # 到期前提前补充的秒数
+                'max_failures': 3  # 连续失败该次数后下线代理
+            },
+            'proxy_health_settings': {
+                'enabled': False,  # 代理入池前及代理池定期并发检查代理，移除慢代理和不可用代理
+                'target_url': 'http://httpbin.org/get',  # 检查请求的目标地址，启用时建议改为爬取目标站点
+                'timeout': 5,  # 单次检查超时（秒）
+                'workers': 8,  # 并发检查线程数
+                'interval': 300,  # 代理池定期检查间隔（秒）
+                'window': 20,  # 成功率窗口（最近检查次数）
+                'min_samples': 1,  # 有该次数检查记录后才判定是否健康
+                'min_success_rate': 0.5,  # 窗口内最低成功率
+                'max_p90': 5.0  # p90 延迟上限（秒）
+            },
+            'proxy_session_settings': {
+                'pool_maxsize': 8,  # 每个代理会话连接池的最大连接数
+                'max_sessions': 32  # 最多保留的代理会话数（超过时丢弃最久未使用的）
             }
         }
         
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+详情抓取流水线
+列表页解析出的条目提交后立即由后台工作线程抓取详情，列表抓取与详情抓取并行进行
+
+- 背压：待处理条目达到上限时 submit() 阻塞，列表抓取不会无限领先
+- 重试队列：失败的条目按指数退避延迟后重新入队，不占用工作线程等待
+- URL缓存：同一URL只抓取一次，重复提交的条目复用缓存或等待进行中的请求
+
+具体站点通过子类实现 fetch() / on_result()，按需覆盖 is_success() / on_failure()。
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _DetailItem:
+    """流水线中的一个待抓取条目"""
+
+    __slots__ = ('item', 'url', 'expected_title', 'attempt')
+
+    def __init__(self, item, url, expected_title=None):
+        self.item = item
+        self.url = url
+        self.expected_title = expected_title
+        self.attempt = 1
+
+
+class DetailFetchPipeline:
+    """详情抓取流水线基类（工作线程池 + 有界待处理队列 + 延迟重试队列 + URL缓存）"""
+
+    def __init__(self, workers: int = 3, queue_size: int = 60, max_attempts: int = 3,
+                 retry_delay: float = 5.0, cache_size: int = 2000,
+                 stop_callback: Optional[Callable] = None, name: str = 'detail-fetch'):
+        self.workers = max(1, int(workers))
+        self.queue_size = max(self.workers, int(queue_size))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.cache_size = max(0, int(cache_size))
+        self.stop_callback = stop_callback
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._ready = deque()
+        self._delayed = []           # (可重试时间, 序号, 条目)
+        self._seq = 0
+        self._pending = 0            # 已提交未完成的URL数（含进行中和等待重试）
+        self._waiting = {}           # URL -> 等待同一请求结果的其他条目
+        self._cache = OrderedDict()  # URL -> 详情
+        self._closed = False
+        self._cancelled = False
+        self._threads = []
+
+        self.stats = {
+            'submitted': 0,
+            'fetched': 0,
+            'cache_hits': 0,
+            'retries': 0,
+            'failed': 0,
+        }
+
+    # ---- 子类实现 ----
+
+    def fetch(self, url: str, expected_title: Optional[str] = None) -> Any:
+        """抓取并解析一个详情页（单次尝试，重试由流水线负责）"""
+        raise NotImplementedError
+
+    def is_success(self, detail: Any) -> bool:
+        """抓取结果是否有效（无效时进入重试队列）"""
+        return bool(detail)
+
+    def on_failure(self, url: str, detail: Any, attempt: int) -> None:
+        """单次抓取失败后的处理（如轮换会话），在工作线程中调用"""
+
+    def on_result(self, item: Any, detail: Any) -> None:
+        """条目处理完成（detail 为最终结果，重试用尽时为最后一次的结果或None），在工作线程中调用"""
+        raise NotImplementedError
+
+    # ---- 流水线控制 ----
+
+    def start(self) -> 'DetailFetchPipeline':
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"详情抓取流水线已启动: {self.workers} 个工作线程, 待处理上限 {self.queue_size}")
+        return self
+
+    def _is_stopped(self) -> bool:
+        if self._cancelled:
+            return True
+        if self.stop_callback is not None:
+            try:
+                if self.stop_callback():
+                    self._cancelled = True
+            except Exception as e:
+                logger.debug(f"停止回调异常（忽略）: {e}")
+        return self._cancelled
+
+    def submit(self, item: Any, url: str, expected_title: Optional[str] = None) -> bool:
+        """
+        提交一个需要抓取详情的条目，待处理条目已满时阻塞等待
+
+        Returns:
+            bool: 是否已接收（流水线已停止时返回False）
+        """
+        cached = self._cache_get(url)
+        if cached is not None:
+            self._count('cache_hits')
+            self.on_result(item, cached)
+            return True
+
+        with self._cond:
+            if url in self._waiting:
+                # 同一URL正在抓取，等待其结果
+                self._waiting[url].append(item)
+                self.stats['cache_hits'] += 1
+                return True
+            while self._pending >= self.queue_size:
+                if self._is_stopped():
+                    return False
+                self._cond.wait(0.5)
+            if self._is_stopped() or self._closed:
+                return False
+            self._waiting[url] = []
+            self._ready.append(_DetailItem(item, url, expected_title))
+            self._pending += 1
+            self.stats['submitted'] += 1
+            self._cond.notify_all()
+        return True
+
+    def _next_item(self) -> Optional[_DetailItem]:
+        """取下一个可执行的条目；流水线结束时返回None"""
+        with self._cond:
+            while True:
+                if self._is_stopped():
+                    return None
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    return self._ready.popleft()
+                if self._closed and self._pending == 0:
+                    return None
+                timeout = 0.5
+                if self._delayed:
+                    timeout = min(timeout, self._delayed[0][0] - now)
+                self._cond.wait(max(timeout, 0.01))
+
+    def _worker(self) -> None:
+        while True:
+            entry = self._next_item()
+            if entry is None:
+                return
+
+            try:
+                detail = self.fetch(entry.url, entry.expected_title)
+            except Exception as e:
+                logger.warning(f"详情抓取异常: {entry.url}, 错误: {e}", exc_info=True)
+                detail = None
+            self._count('fetched')
+
+            if not self.is_success(detail) and entry.attempt < self.max_attempts:
+                try:
+                    self.on_failure(entry.url, detail, entry.attempt)
+                except Exception as e:
+                    logger.debug(f"详情失败处理异常（忽略）: {e}")
+                delay = self.retry_delay * (2 ** (entry.attempt - 1))
+                entry.attempt += 1
+                self._count('retries')
+                logger.debug(f"详情抓取失败，{delay:.1f} 秒后第 {entry.attempt} 次尝试: {entry.url}")
+                with self._cond:
+                    self._seq += 1
+                    heapq.heappush(self._delayed, (time.monotonic() + delay, self._seq, entry))
+                    self._cond.notify_all()
+                continue
+
+            if self.is_success(detail):
+                self._cache_put(entry.url, detail)
+            else:
+                self._count('failed')
+
+            with self._cond:
+                waiters = self._waiting.pop(entry.url, [])
+            for item in [entry.item] + waiters:
+                try:
+                    self.on_result(item, detail)
+                except Exception as e:
+                    logger.warning(f"详情结果处理失败: {entry.url}, 错误: {e}", exc_info=True)
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify_all()
+
+    def _count(self, key: str) -> None:
+        with self._cond:
+            self.stats[key] += 1
+
+    def _cache_get(self, url: str) -> Any:
+        with self._cond:
+            detail = self._cache.get(url)
+            if detail is not None:
+                self._cache.move_to_end(url)
+            return detail
+
+    def _cache_put(self, url: str, detail: Any) -> None:
+        if not self.cache_size:
+            return
+        with self._cond:
+            self._cache[url] = detail
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def close(self, wait: bool = True) -> None:
+        """停止接收新条目；wait 时等待已提交条目（含重试）全部完成"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        logger.info(f"详情抓取流水线结束: {self.get_stats()}")
+
+    def cancel(self) -> None:
+        """立即停止，丢弃未开始的条目"""
+        self._cancelled = True
+        with self._cond:
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = self._pending
+            stats['cached'] = len(self._cache)
+        return stats
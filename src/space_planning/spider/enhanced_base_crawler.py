@@ -9,6 +9,8 @@ import time
 import json
 import logging
 import os
+import sqlite3
+import threading
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import requests
@@ -17,92 +19,285 @@ from urllib.parse import urljoin, urlparse
 from .smart_request_manager import smart_request_manager
 from .config import crawler_config, AntiDetectionMode
 from .persistent_proxy_manager import persistent_proxy_manager
+from .http_cache import get_http_cache
+
+# 已完成/失败URL攒够该数量或距上次写入超过该秒数时批量写入
+URL_FLUSH_BATCH = 200
+URL_FLUSH_INTERVAL = 5.0
+
+_UNIT_DEFAULT = {'status': 'pending', 'last_page': 0}
+
+
+def get_progress_path() -> str:
+    """进度数据库路径（与数据库在同一目录）"""
+    from ..core import config
+    return os.path.join(os.path.dirname(config.app_config.get_database_path()), 'crawl_progress.db')
+
 
 class CrawlProgress:
-    """爬取进度管理类"""
+    """
+    爬取进度管理类
+
+    进度保存在SQLite（WAL模式），各爬虫按名称区分：
+    - 页码、搜索参数等标量保存在 progress_meta，单元状态保存在 progress_units，每次更新是一个独立事务
+    - 已完成/失败URL保存在 progress_urls（主键索引），内存中另有集合用于O(1)判断；
+      新增URL先进入缓冲区，批量在一个事务中写入（异常退出时最多重新处理最后一批URL）
+    旧版 crawl_progress_<名称>.json 在首次打开时导入一次。
+    """
     
-    def __init__(self, crawler_name: str):
+    def __init__(self, crawler_name: str, path: Optional[str] = None):
         self.crawler_name = crawler_name
-        self.progress_file = os.path.join(
+        self.path = path or get_progress_path()
+        self.legacy_file = os.path.join(
             os.path.dirname(__file__), 
             f'crawl_progress_{crawler_name}.json'
         )
-        self.progress_data = self._load_progress()
-    
-    def _load_progress(self) -> Dict:
-        """加载进度数据"""
-        if os.path.exists(self.progress_file):
+        # 分单元并行爬取时多个线程同时更新进度
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS progress_meta (
+                    crawler TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (crawler, key)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS progress_units (
+                    crawler TEXT NOT NULL,
+                    unit TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (crawler, unit)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS progress_urls (
+                    crawler TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (crawler, failed, url)
+                ) WITHOUT ROWID
+            ''')
+        # URL集合在首次使用时加载（多数爬虫实例只使用页码和单元进度）
+        self._completed_urls = None
+        self._failed_urls = None
+        self._pending_urls: List[Tuple[str, int]] = []
+        self._last_flush = time.monotonic()
+        self._import_legacy_file()
+
+    # ---- 存储 ----
+
+    def _get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM progress_meta WHERE crawler=? AND key=?',
+                                     (self.crawler_name, key)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else default
+
+    def _write_meta(self, values: Dict):
+        """写入标量进度（由调用方提交事务）"""
+        values = dict(values, last_update=datetime.now().isoformat())
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO progress_meta (crawler, key, value) VALUES (?, ?, ?)',
+            [(self.crawler_name, key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()]
+        )
+
+    def _set_meta(self, **values):
+        """在一个事务中更新标量进度"""
+        with self._lock, self._conn:
+            self._write_meta(values)
+
+    def _load_urls(self):
+        if self._completed_urls is not None:
+            return
+        completed, failed = set(), set()
+        rows = self._conn.execute('SELECT url, failed FROM progress_urls WHERE crawler=?', (self.crawler_name,))
+        for url, is_failed in rows:
+            (failed if is_failed else completed).add(url)
+        self._completed_urls, self._failed_urls = completed, failed
+
+    def _add_url(self, url: str, failed: bool):
+        with self._lock:
+            self._load_urls()
+            urls = self._failed_urls if failed else self._completed_urls
+            if url in urls:
+                return
+            urls.add(url)
+            self._pending_urls.append((url, int(failed)))
+            if (len(self._pending_urls) >= URL_FLUSH_BATCH
+                    or time.monotonic() - self._last_flush >= URL_FLUSH_INTERVAL):
+                self._flush_urls()
+
+    def _flush_urls(self):
+        """把缓冲的URL在一个事务中写入"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_urls:
+                return
             try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logging.error(f"加载进度文件失败: {e}")
-        
-        return {
-            'last_page': 0,
-            'total_pages': 0,
-            'completed_urls': [],
-            'failed_urls': [],
-            'last_update': None,
-            'search_params': {}
-        }
-    
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT OR IGNORE INTO progress_urls (crawler, url, failed) VALUES (?, ?, ?)',
+                        [(self.crawler_name, url, failed) for url, failed in self._pending_urls]
+                    )
+                self._pending_urls.clear()
+            except sqlite3.Error as e:
+                logging.error(f"保存URL进度失败: {e}")
+
+    def _import_legacy_file(self):
+        """导入旧版JSON进度文件（只导入一次，文件保留不动）"""
+        if not os.path.exists(self.legacy_file) or self._get_meta('legacy_imported'):
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO progress_meta (crawler, key, value) VALUES (?, ?, ?)',
+                    [(self.crawler_name, key, json.dumps(data.get(key), ensure_ascii=False))
+                     for key in ('last_page', 'total_pages', 'search_params', 'units_signature', 'last_update')
+                     if key in data]
+                )
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO progress_units (crawler, unit, state) VALUES (?, ?, ?)',
+                    [(self.crawler_name, key, json.dumps(state, ensure_ascii=False))
+                     for key, state in (data.get('units') or {}).items()]
+                )
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO progress_urls (crawler, url, failed) VALUES (?, ?, ?)',
+                    [(self.crawler_name, url, 0) for url in data.get('completed_urls') or []]
+                    + [(self.crawler_name, url, 1) for url in data.get('failed_urls') or []]
+                )
+                self._write_meta({'legacy_imported': True})
+            logging.info(f"已导入旧版进度文件: {self.legacy_file}")
+        except Exception as e:
+            logging.error(f"导入旧版进度文件失败: {e}")
+
+    # ---- 进度接口 ----
+
     def save_progress(self):
-        """保存进度数据"""
+        """写入缓冲的URL并记录检查点时间"""
         try:
-            self.progress_data['last_update'] = datetime.now().isoformat()
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(self.progress_data, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                self._flush_urls()
+                self._set_meta()
         except Exception as e:
-            logging.error(f"保存进度文件失败: {e}")
+            logging.error(f"保存进度失败: {e}")
     
     def update_page_progress(self, current_page: int, total_pages: Optional[int] = None):
         """更新页面进度"""
-        self.progress_data['last_page'] = current_page
+        values = {'last_page': current_page}
         if total_pages is not None:
-            self.progress_data['total_pages'] = total_pages
-        self.save_progress()
+            values['total_pages'] = total_pages
+        with self._lock:
+            # 页码之前的URL先落盘，保证续爬时不会跳过未记录的URL
+            self._flush_urls()
+            self._set_meta(**values)
     
     def add_completed_url(self, url: str):
         """添加已完成的URL"""
-        if url not in self.progress_data['completed_urls']:
-            self.progress_data['completed_urls'].append(url)
-            self.save_progress()
+        self._add_url(url, failed=False)
     
     def add_failed_url(self, url: str):
         """添加失败的URL"""
-        if url not in self.progress_data['failed_urls']:
-            self.progress_data['failed_urls'].append(url)
-            self.save_progress()
+        self._add_url(url, failed=True)
     
     def is_url_completed(self, url: str) -> bool:
         """检查URL是否已完成"""
-        return url in self.progress_data['completed_urls']
+        with self._lock:
+            self._load_urls()
+            return url in self._completed_urls
     
     def get_resume_page(self) -> int:
         """获取恢复爬取的页面"""
-        return self.progress_data.get('last_page', 0)
+        return self._get_meta('last_page', 0) or 0
+    
+    def get_total_pages(self) -> int:
+        return self._get_meta('total_pages', 0) or 0
+    
+    def get_url_counts(self) -> Tuple[int, int]:
+        """已完成和失败的URL数量"""
+        with self._lock:
+            self._load_urls()
+            return len(self._completed_urls), len(self._failed_urls)
     
     def set_search_params(self, params: Dict):
         """设置搜索参数"""
-        self.progress_data['search_params'] = params
-        self.save_progress()
+        self._set_meta(search_params=params)
     
     def get_search_params(self) -> Dict:
         """获取搜索参数"""
-        return self.progress_data.get('search_params', {})
+        return self._get_meta('search_params', {}) or {}
+    
+    def begin_units(self, signature: str, unit_keys: List[str]) -> Dict[str, Dict]:
+        """
+        开始分单元爬取
+        
+        上次爬取参数相同且有未完成单元时保留各单元进度（断点续爬），否则重新开始。
+        
+        Args:
+            signature: 爬取参数标识（关键词、日期范围等）
+            unit_keys: 本次爬取的全部单元
+        
+        Returns:
+            Dict[str, Dict]: 各单元状态 {'status': pending/running/done, 'last_page': 已完成页}
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT unit, state FROM progress_units WHERE crawler=?',
+                                      (self.crawler_name,)).fetchall()
+            units = {key: json.loads(state) for key, state in rows}
+            resumable = (
+                self._get_meta('units_signature') == signature
+                and any(units.get(key, {}).get('status') != 'done' for key in unit_keys)
+            )
+            if not resumable:
+                units = {}
+            units = {key: units.get(key) or dict(_UNIT_DEFAULT) for key in unit_keys}
+            with self._conn:
+                self._conn.execute('DELETE FROM progress_units WHERE crawler=?', (self.crawler_name,))
+                self._conn.executemany(
+                    'INSERT INTO progress_units (crawler, unit, state) VALUES (?, ?, ?)',
+                    [(self.crawler_name, key, json.dumps(state, ensure_ascii=False)) for key, state in units.items()]
+                )
+                self._write_meta({'units_signature': signature})
+            return {key: dict(state) for key, state in units.items()}
+    
+    def get_unit(self, key: str) -> Dict:
+        """获取单元状态"""
+        with self._lock:
+            row = self._conn.execute('SELECT state FROM progress_units WHERE crawler=? AND unit=?',
+                                     (self.crawler_name, key)).fetchone()
+        return json.loads(row[0]) if row else dict(_UNIT_DEFAULT)
+    
+    def update_unit(self, key: str, **fields):
+        """更新单元状态并保存"""
+        with self._lock:
+            state = self.get_unit(key)
+            state.update(fields)
+            state['updated'] = datetime.now().isoformat()
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO progress_units (crawler, unit, state) VALUES (?, ?, ?)',
+                    (self.crawler_name, key, json.dumps(state, ensure_ascii=False))
+                )
     
     def clear_progress(self):
         """清除进度数据"""
-        self.progress_data = {
-            'last_page': 0,
-            'total_pages': 0,
-            'completed_urls': [],
-            'failed_urls': [],
-            'last_update': None,
-            'search_params': {}
-        }
-        self.save_progress()
+        with self._lock, self._conn:
+            for table in ('progress_meta', 'progress_units', 'progress_urls'):
+                self._conn.execute(f'DELETE FROM {table} WHERE crawler=?', (self.crawler_name,))
+            self._completed_urls, self._failed_urls = set(), set()
+            self._pending_urls.clear()
+
+    def close(self):
+        """写入缓冲的URL并关闭连接"""
+        with self._lock:
+            self._flush_urls()
+            self._conn.close()
 
 class EnhancedBaseCrawler:
     """增强的基础爬虫类"""
@@ -207,7 +402,38 @@ class EnhancedBaseCrawler:
     
     def _make_request(self, url: str, method: str = 'GET', headers: Optional[Dict] = None, 
                      data: Optional[Dict] = None, timeout: int = 30) -> Tuple[Optional[requests.Response], Dict]:
-        """发送HTTP请求"""
+        """发送HTTP请求（经过HTTP缓存，命中时 request_info['from_cache'] 为True）"""
+        http_cache = get_http_cache()
+        if http_cache is None:
+            return self._send_request(url, method, headers, data, timeout)
+        
+        sent = {}
+        
+        def send(request_headers: Dict) -> Optional[requests.Response]:
+            response, sent['info'] = self._send_request(url, method, request_headers, data, timeout)
+            return response
+        
+        response = http_cache.request(method, url, send, headers=headers, data=data,
+                                      cacheable=self._is_cacheable_response)
+        request_info = sent.get('info') or {
+            'url': url,
+            'method': method,
+            'proxy_used': False,
+            'proxy_ip': None,
+            'response_time': 0,
+            'retry_count': 0,
+            'success': response is not None
+        }
+        request_info['from_cache'] = bool(getattr(response, 'from_cache', False))
+        return response, request_info
+    
+    def _is_cacheable_response(self, response: requests.Response) -> bool:
+        """响应是否可以写入HTTP缓存（子类可排除验证码、访问受限等页面）"""
+        return True
+    
+    def _send_request(self, url: str, method: str = 'GET', headers: Optional[Dict] = None, 
+                      data: Optional[Dict] = None, timeout: int = 30) -> Tuple[Optional[requests.Response], Dict]:
+        """发送网络请求（带代理和重试）"""
         request_info = {
             'url': url,
             'method': method,
@@ -406,6 +632,7 @@ class EnhancedBaseCrawler:
             duration = (end_time - self.start_time).total_seconds()
         
         proxy_status = self.proxy_manager.get_status()
+        completed_count, failed_count = self.progress.get_url_counts()
         
         return {
             'crawler_name': self.name,
@@ -421,8 +648,8 @@ class EnhancedBaseCrawler:
             'proxy_status': proxy_status,
             'progress': {
                 'last_page': self.progress.get_resume_page(),
-                'total_pages': self.progress.progress_data.get('total_pages', 0),
-                'completed_urls_count': len(self.progress.progress_data.get('completed_urls', [])),
-                'failed_urls_count': len(self.progress.progress_data.get('failed_urls', []))
+                'total_pages': self.progress.get_total_pages(),
+                'completed_urls_count': completed_count,
+                'failed_urls_count': failed_count
             }
         } 
\ No newline at end of file
@@ -4,7 +4,9 @@
 广东省政策爬虫
 """
 
+import copy
 import hashlib
+import json
 import logging
 import random
 import re
@@ -12,6 +14,7 @@ import threading
 import time
 import uuid
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple, Any
@@ -20,8 +23,14 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 import requests
 
+from .detail_pipeline import DetailFetchPipeline
 from .enhanced_base_crawler import EnhancedBaseCrawler
+from .http_cache import get_http_cache
+from .incremental import HighWaterMark
 from .multithread_base_crawler import MultiThreadBaseCrawler
+from .page_size import cached_page_size, get_negotiator
+from .proxy_sessions import ProxySessionRegistry
+from .parse_pool import extract_checkbox_items, parse_policy_detail, policy_checksum, run_parser
 from .monitor import CrawlerMonitor
 from .spider_config import SpiderConfig
 from .config import crawler_config
@@ -56,6 +65,33 @@ CATEGORY_API_MAP = {
 DUAL_REQUEST_MENUS = {'dfxfg', 'dfzfgz', 'fljs', 'sfjs'}
 
 MAX_RECORDS_PER_BATCH = 10000  # 单次筛选的最大记录数（20条/页 * 500页）
+DEFAULT_PAGE_SIZE = 20  # 列表接口默认页大小（协商失败或未启用协商时使用）
+
+# 访问限制提示
+ACCESS_LIMIT_TOKENS = (
+    "您已超过全文最大访问数",
+    "访问限制",
+    "最大访问数",
+    "抱歉，您已超过全文最大访问数",
+)
+
+# 详情页的全文访问限制提示
+DETAIL_BLOCK_TOKENS = (
+    '抱歉，您已超过全文最大访问数',
+    '为了保证服务质量',
+    '错误提示',
+    '请登录后再访问全文',
+)
+
+# 详情页库路径对应的来源页（Referer）
+DETAIL_REFERERS = (
+    ('/gddigui/', 'https://gd.pkulaw.com/dfzfgz/adv'),
+    ('/gddifang/', 'https://gd.pkulaw.com/dfxfg/adv'),
+    ('/regularation/', 'https://gd.pkulaw.com/sfjs/adv'),
+    ('/gdnormativedoc/', 'https://gd.pkulaw.com/fljs/adv'),
+    ('/gdchinalaw/', 'https://gd.pkulaw.com/china/adv'),
+    ('/gdfgwj/', 'https://gd.pkulaw.com/china/adv'),
+)
 
 class GuangdongSpider(EnhancedBaseCrawler):
     """广东省政策爬虫 - 使用真实API接口"""
@@ -127,10 +163,33 @@ class GuangdongSpider(EnhancedBaseCrawler):
         if self.rotate_after_success_count == 0:
             self._policy_success_counter = 0
         
+        # 详情抓取流水线配置
+        detail_cfg = cfg.get_config('detail_settings') or {}
+        try:
+            self.detail_workers = max(1, int(detail_cfg.get('workers', 3)))
+        except (TypeError, ValueError):
+            self.detail_workers = 3
+        try:
+            self.detail_queue_size = max(1, int(detail_cfg.get('queue_size', 60)))
+        except (TypeError, ValueError):
+            self.detail_queue_size = 60
+        try:
+            self.detail_cache_size = max(0, int(detail_cfg.get('cache_size', 2000)))
+        except (TypeError, ValueError):
+            self.detail_cache_size = 2000
+        
+        # 单元并行配置
+        unit_cfg = cfg.get_config('unit_settings') or {}
+        try:
+            self.unit_workers = max(1, int(unit_cfg.get('workers', 3)))
+        except (TypeError, ValueError):
+            self.unit_workers = 3
+        
         # 会话状态
         self._session_started_at = time.time()
         self._requests_since_rotation = 0
         self._request_timestamps = deque()
+        self._rate_limit_lock = threading.Lock()
         
         # 针对广东站点调慢节奏
         self.min_delay = max(self.min_delay, 3.0)
@@ -284,7 +343,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
         if not need_rotate:
             return False
         
-        rotated = self._rotate_session()
+        # 强制轮换（被限制访问等）时丢弃当前会话，定期轮换时保留
+        rotated = self._rotate_session(retire=force)
         if rotated:
             self._reset_session_counters()
             self._apply_dynamic_headers()
@@ -295,18 +355,24 @@ class GuangdongSpider(EnhancedBaseCrawler):
         if not self.rate_limit_enabled or self.requests_per_minute <= 0:
             return
         
-        now = time.time()
+        # 列表抓取、单元和详情工作线程共用同一个窗口：在锁内预约请求时间，锁外等待。
+        # 窗口内已预约满时，本次请求排在最早一次预约之后一个窗口，等待时间不设上限
         window = 60.0
-        while self._request_timestamps and now - self._request_timestamps[0] > window:
-            self._request_timestamps.popleft()
-        
-        if len(self._request_timestamps) >= self.requests_per_minute:
-            earliest = self._request_timestamps[0]
-            sleep_time = window - (now - earliest) + 0.01
-            if sleep_time > 0:
-                time.sleep(min(sleep_time, self.max_delay))
+        with self._rate_limit_lock:
+            now = time.time()
+            while self._request_timestamps and (
+                len(self._request_timestamps) > self.requests_per_minute
+                or now - self._request_timestamps[0] > window
+            ):
+                self._request_timestamps.popleft()
+            
+            slot = now
+            if len(self._request_timestamps) >= self.requests_per_minute:
+                slot = max(now, self._request_timestamps[0] + window)
+            self._request_timestamps.append(slot)
         
-        self._request_timestamps.append(time.time())
+        if slot > now:
+            time.sleep(slot - now)
     
     def _get_delay_range_for_speed(self, speed_mode: Optional[str] = None) -> Tuple[float, float]:
         """根据速度模式返回延迟区间"""
@@ -463,12 +529,14 @@ class GuangdongSpider(EnhancedBaseCrawler):
         # 载入运行时配置
         self._load_runtime_settings()
         
+        # 单元工作线程复用的工作爬虫（每个线程一个，见 _get_unit_worker）
+        self._unit_local = threading.local()
+        
         self._init_session()
     
     def _init_session(self):
-        """初始化会话"""
-        self.session = requests.Session()
-        self._reset_session_counters()
+        """初始化会话（每个代理一个会话，由会话注册表管理连接池和Cookie）"""
+        self.proxy_sessions = ProxySessionRegistry(setup=self._setup_session)
         
         # 更新headers，移除AJAX相关标识并应用动态配置
         self.headers.update({
@@ -479,17 +547,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
             'sec-ch-ua-platform': '"Windows"',
         })
         
-        self._apply_dynamic_headers()
-        
-        # 设置Cookie（使用随机值降低指纹风险）
-        if self.enable_cookie_management:
-            self.session.cookies.set(
-                'JSESSIONID',
-                uuid.uuid4().hex.upper(),
-                domain='gd.pkulaw.com'
-            )
-        
         # ✅ 添加代理支持 - 使用共享代理系统
+        proxy_dict = None
         if self.enable_proxy:
             try:
                 # 确保代理池已初始化
@@ -506,17 +565,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
                 proxy_dict = get_shared_proxy()
                 
                 if proxy_dict:
-                    # 更新会话代理设置
-                    self.session.proxies.update(proxy_dict)
                     logger.info(f"[代理验证] GuangdongSpider: 会话已设置代理: {proxy_dict}")
                     
-                    # 验证代理设置是否成功
-                    session_proxies = getattr(self.session, 'proxies', {})
-                    if session_proxies:
-                        logger.info(f"[代理验证] 会话代理已更新，当前代理: {session_proxies}")
-                    else:
-                        logger.warning("[代理验证] 警告: 代理字典更新后，会话中未检测到代理设置")
-                    
                     # 记录当前代理信息
                     proxy_info_str = ""
                     if isinstance(proxy_dict, dict) and 'http' in proxy_dict:
@@ -549,9 +599,19 @@ class GuangdongSpider(EnhancedBaseCrawler):
                     logger.warning("GuangdongSpider: 警告: 启用代理但无法获取有效代理，将使用直接连接")
             except (requests.exceptions.RequestException, ValueError, KeyError) as e:
                 logger.warning(f"GuangdongSpider: 代理设置失败: {e}，将使用直接连接", exc_info=True)
+                proxy_dict = None
         else:
             logger.info("GuangdongSpider: 代理已禁用，使用直接连接")
         
+        self._bind_proxy_session(proxy_dict)
+    
+    def _bind_proxy_session(self, proxy_dict: Optional[Dict[str, str]]) -> None:
+        """切换到代理对应的会话（注册表中已有时沿用其连接和Cookie）并预热入口页"""
+        # 取得该代理的会话（新会话已设置请求头和随机Cookie）
+        self.session, _ = self.proxy_sessions.get(proxy_dict)
+        self._reset_session_counters()
+        self._apply_dynamic_headers()
+        
         if self.enable_proxy:
             current_proxies = getattr(self.session, 'proxies', {})
             if not current_proxies:
@@ -562,40 +622,50 @@ class GuangdongSpider(EnhancedBaseCrawler):
         if not self._preheat_session():
             logger.warning("初始化会话时预热入口页失败，后续请求可能需要额外重试")
     
-    def _rotate_session(self):
-        """轮换会话，避免访问限制 (借鉴 old)"""
+    def _setup_session(self, session: requests.Session) -> None:
+        """配置代理会话注册表新建的会话：请求头和随机JSESSIONID（降低指纹风险）"""
+        session.headers.update(self.headers)
+        if self.enable_cookie_management:
+            session.cookies.set('JSESSIONID', uuid.uuid4().hex.upper(), domain='gd.pkulaw.com')
+    
+    def _rotate_session(self, retire: bool = True):
+        """
+        轮换会话，避免访问限制 (借鉴 old)
+        
+        换用另一个代理并切换到该代理的会话：已建立过的会话沿用其连接和Cookie，
+        否则新建会话，切换后预热入口页。
+        
+        Args:
+            retire: 是否丢弃当前会话（被限制访问时丢弃，该代理再次使用时重新建立会话；
+                    定期轮换时保留，换回该代理时继续使用）
+        """
         if not self.enable_session_rotation:
             return False
         logger.info("轮换会话，避免访问限制...")
         
-        # 创建新的会话
-        new_session = requests.Session()
-        new_session.headers.update(self.headers)
-        
-        # 生成新的JSESSIONID (随机)
-        if self.enable_cookie_management:
-            import random
-            import string
-            new_jsessionid = ''.join(random.choices(string.ascii_uppercase + string.digits, k=16))
-            new_session.cookies.set('JSESSIONID', new_jsessionid, domain='gd.pkulaw.com')
-        
-        # 如果启用代理，设置到新会话
+        proxy_dict = None
         if self.enable_proxy:
             try:
                 from .proxy_pool import get_shared_proxy
-                proxy_dict = get_shared_proxy()
+                proxy_dict = get_shared_proxy(rotate=True)
                 if proxy_dict:
-                    new_session.proxies.update(proxy_dict)
                     logger.info(f"新会话设置代理: {proxy_dict}")
             except Exception as e:
                 logger.warning(f"新会话代理设置失败: {e}")
         
-        # 访问入口页获取新的Cookie
+        previous_session = self.session
+        if retire:
+            self.proxy_sessions.retire(previous_session)
+        new_session, created = self.proxy_sessions.get(proxy_dict)
+        
+        # 访问入口页获取（或刷新）当前分类的Cookie
         if not self._preheat_session(new_session, self.current_api_config):
             logger.warning("轮换会话时预热入口页失败")
+            if created:
+                self.proxy_sessions.retire(new_session)
             return False
 
-        logger.info("成功轮换会话")
+        logger.info("成功轮换会话" if created else "已切换到该代理已有的会话")
         self.session = new_session
         self._reset_session_counters()
         self._apply_dynamic_headers()
@@ -603,15 +673,48 @@ class GuangdongSpider(EnhancedBaseCrawler):
             self.monitor.record_request(self.base_url, success=True)
         return True
     
+    @staticmethod
+    def _is_access_limited(response_text: str) -> bool:
+        """响应内容是否为访问限制提示"""
+        return any(token in response_text for token in ACCESS_LIMIT_TOKENS)
+
+    @staticmethod
+    def _is_verifycode_page(response_text: str) -> bool:
+        """响应是否明确为验证码页面（同时包含验证码提示和验证码输入框，避免误判）"""
+        verifycode_strong_indicators = [
+            "请输入验证码",
+            "验证码错误",
+            "验证码已过期",
+            "需要输入验证码",
+            "验证码输入框"
+        ]
+        # 检查是否包含验证码输入框的常见HTML元素
+        lowered = response_text.lower()
+        has_verifycode_input = (
+            'id="verifycode"' in lowered or
+            'name="verifycode"' in lowered or
+            'class="verifycode"' in lowered or
+            '验证码输入框' in response_text
+        )
+        return has_verifycode_input and any(indicator in response_text for indicator in verifycode_strong_indicators)
+
+    def _is_cacheable_response(self, response: requests.Response) -> bool:
+        """访问限制和全文受限页面不写入HTTP缓存"""
+        try:
+            text = response.text
+        except Exception:  # noqa: BLE001
+            return False
+        return not self._is_access_limited(text) and not any(token in text for token in DETAIL_BLOCK_TOKENS)
+
+    @staticmethod
+    def _is_detail_cached(url: str) -> bool:
+        """详情页是否有未过期的HTTP缓存（命中时无需占用请求频率额度）"""
+        http_cache = get_http_cache()
+        return bool(http_cache and http_cache.is_fresh('GET', url))
+
     def _handle_access_limit(self, response_text: str) -> bool:
         """检测并处理访问限制"""
-        limit_tokens = [
-            "您已超过全文最大访问数",
-            "访问限制",
-            "最大访问数",
-            "抱歉，您已超过全文最大访问数",
-        ]
-        if not any(token in response_text for token in limit_tokens):
+        if not self._is_access_limited(response_text):
             self._access_limit_strikes = 0
             return False
 
@@ -646,6 +749,56 @@ class GuangdongSpider(EnhancedBaseCrawler):
         """
         return self._handle_access_limit(response_text)
     
+    def _list_search_url(self, api_config=None) -> str:
+        """分类的列表数据接口（RecordSearch）地址"""
+        if api_config:
+            default_search_url = f"{self.base_url}/{api_config.get('menu', 'dfxfg')}/search/RecordSearch"
+            return api_config.get('search_url', default_search_url)
+        return f"{self.base_url}/dfxfg/search/RecordSearch"
+
+    def _negotiate_page_size(self, api_config, category_code, issue_department_lvalue=None,
+                             keywords=None, start_date=None, end_date=None) -> int:
+        """
+        协商列表接口的页大小（按接口缓存，见 page_size.PageSizeNegotiator）
+
+        试探时按候选页大小请求第1页；返回整页时再请求第2页，
+        确认大页翻页不会触发翻页校验/验证码，且第2页不是第1页的重复。
+        """
+        negotiator = get_negotiator(self._list_search_url(api_config), DEFAULT_PAGE_SIZE)
+
+        def fetch(page_index, page_size):
+            search_params = self._get_search_parameters(
+                keywords=keywords,
+                category_code=category_code,
+                page_index=page_index,
+                page_size=page_size,
+                start_date=start_date,
+                end_date=end_date,
+                filter_year=None,
+                api_config=api_config,
+                issue_department_lvalue=issue_department_lvalue or None
+            )
+            resp = self._request_page_with_check(
+                page_index, search_params, page_index - 1 if page_index > 1 else None, api_config=api_config
+            )
+            if not resp or resp.status_code != 200 or not resp.text:
+                return None
+            if self._is_access_limited(resp.text) or self._is_verifycode_page(resp.text):
+                return None
+            return self._extract_policy_list_items(resp.text, api_config=api_config)
+
+        def probe(page_size):
+            first_page = fetch(1, page_size)
+            if first_page is None:
+                return None
+            if len(first_page) >= page_size:
+                second_page = fetch(2, page_size)
+                if second_page is None or (second_page and self._are_pages_identical(first_page, second_page)):
+                    return None
+            return len(first_page)
+
+        return negotiator.negotiate(probe)
+
     def _request_page_with_check(self, page_index, search_params, old_page_index=None, api_config=None):
         """带翻页校验的页面请求 (借鉴 old，重试 3 次)"""
         max_retries = 3
@@ -678,11 +831,7 @@ class GuangdongSpider(EnhancedBaseCrawler):
                         logger.debug(f"翻页校验成功: 第{page_index}页")
                 
                 # 2. 再请求数据接口
-                if api_config:
-                    default_search_url = f"{self.base_url}/{api_config.get('menu', 'dfxfg')}/search/RecordSearch"
-                    search_url = api_config.get('search_url', default_search_url)
-                else:
-                    search_url = f"{self.base_url}/dfxfg/search/RecordSearch"
+                search_url = self._list_search_url(api_config)
                 search_headers = self.headers.copy()
                 search_headers['Content-Type'] = 'application/x-www-form-urlencoded; charset=UTF-8'
                 
@@ -787,83 +936,146 @@ class GuangdongSpider(EnhancedBaseCrawler):
             logger.error(f"提取政策数量失败（未知错误）: {e}", exc_info=True)
             return 0
     
-    def _parse_policy_list_html(self, html_content, callback=None, stop_callback=None, category_name=None, policy_callback=None):
-        """解析HTML响应中的政策列表 - 优先使用 checkbox 方法，失败时使用备用方法"""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            policies = []
+    def _extract_policy_list_items(self, html_content, category_name=None, api_config=None,
+                                   callback=None, stop_callback=None):
+        """从列表页HTML提取政策条目（不获取详情）- 优先使用 checkbox 方法，失败时使用备用方法
 
-            # 方法1：优先使用 checkbox 方法提取政策 ID
-            checkboxes = soup.select('input.checkbox[name="recordList"]')
-            checkbox_policies = []
-            if checkboxes:
-                logger.debug(f"从 checkbox 提取到 {len(checkboxes)} 个政策 ID")
-                for checkbox in checkboxes:
-                    policy_id = checkbox.get('value', '').strip()
-                    if policy_id and len(policy_id) > 10:  # 有效 ID
-                        # 根据当前 API 配置确定链接路径
-                        current_config = getattr(self, 'current_api_config', None)
-                        if current_config and isinstance(current_config, dict):
-                            link_path = current_config.get('library', 'gddigui')
-                        else:
-                            link_path = 'gddigui'  # 默认
-                        url = f"{self.base_url}/{link_path}/{policy_id}.html"
-
-                        policy_data = {
-                            'level': '广东省人民政府',
-                            'title': f'政策ID: {policy_id}',  # 临时标题，后续详情提取
-                            'pub_date': '',  
-                            'source': url,
-                            'url': url,
-                            'content': '',  
-                            'category': category_name or '',
-                            'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            'policy_id': policy_id,
-                            '_need_detail_fetch': True  # 标记需要详情
-                        }
-                        # 计算 checksum (基于临时数据)
-                        policy_data['checksum'] = self._generate_policy_hash(policy_data)
-                        logger.debug(f"生成 checkbox 政策 checksum: {policy_data['checksum'][:8]}...")
-
-                        checkbox_policies.append(policy_data)
-
-            # 方法2：如果 checkbox 方法失败，使用备用解析方法（list-title等）
-            if not checkbox_policies:
-                logger.debug("checkbox 方法未找到政策，尝试使用备用解析方法...")
-                try:
-                    # 使用 _parse_policy_list_record_search 作为备用方法
-                    backup_policies = self._parse_policy_list_record_search(
-                        soup, callback=callback, stop_callback=stop_callback, category_name=category_name
-                    )
-                    if backup_policies:
-                        logger.info(f"备用解析方法成功，找到 {len(backup_policies)} 条政策")
-                        # 将备用方法解析的政策转换为标准格式
-                        for policy in backup_policies:
-                            # 如果政策没有 policy_id，尝试从 URL 中提取
-                            if not policy.get('policy_id') and policy.get('url'):
-                                url = policy.get('url', '')
-                                # 尝试从 URL 中提取 policy_id（格式：/library/policy_id.html）
-                                import re
-                                match = re.search(r'/([^/]+)\.html$', url)
-                                if match:
-                                    policy['policy_id'] = match.group(1)
-                                    policy['_need_detail_fetch'] = True
-                            
-                            # 如果没有 checksum，生成一个
-                            if not policy.get('checksum'):
-                                policy['checksum'] = self._generate_policy_hash(policy)
+        Args:
+            html_content: 列表页HTML
+            category_name: 分类名称
+            api_config: 当前分类的API配置（决定详情链接的库路径），默认使用 current_api_config
+
+        Returns:
+            List[Dict]: 政策条目，需要获取详情的条目带 _need_detail_fetch 标记
+        """
+        # 方法1：优先使用 checkbox 方法提取政策 ID（解析交给解析进程池，未启用时在当前线程执行）
+        current_config = api_config or getattr(self, 'current_api_config', None)
+        if current_config and isinstance(current_config, dict):
+            link_path = current_config.get('library', 'gddigui')
+        else:
+            link_path = 'gddigui'  # 默认
+        checkbox_policies = run_parser(extract_checkbox_items, html_content, self.base_url, link_path, category_name)
+        if checkbox_policies:
+            logger.debug(f"从 checkbox 提取到 {len(checkbox_policies)} 个政策 ID")
+
+        # 方法2：如果 checkbox 方法失败，使用备用解析方法（list-title等）
+        if not checkbox_policies:
+            logger.debug("checkbox 方法未找到政策，尝试使用备用解析方法...")
+            try:
+                # 使用 _parse_policy_list_record_search 作为备用方法
+                soup = BeautifulSoup(html_content, 'html.parser')
+                backup_policies = self._parse_policy_list_record_search(
+                    soup, callback=callback, stop_callback=stop_callback, category_name=category_name
+                )
+                if backup_policies:
+                    logger.info(f"备用解析方法成功，找到 {len(backup_policies)} 条政策")
+                    # 将备用方法解析的政策转换为标准格式
+                    for policy in backup_policies:
+                        # 如果政策没有 policy_id，尝试从 URL 中提取
+                        if not policy.get('policy_id') and policy.get('url'):
+                            url = policy.get('url', '')
+                            # 尝试从 URL 中提取 policy_id（格式：/library/policy_id.html）
+                            match = re.search(r'/([^/]+)\.html$', url)
+                            if match:
+                                policy['policy_id'] = match.group(1)
+                                policy['_need_detail_fetch'] = True
                         
-                        checkbox_policies = backup_policies
-                    else:
-                        logger.warning("备用解析方法也未找到政策，返回空列表")
-                except Exception as e:
-                    logger.warning(f"备用解析方法失败: {e}", exc_info=True)
-            
-            if not checkbox_policies:
+                        # 如果没有 checksum，生成一个
+                        if not policy.get('checksum'):
+                            policy['checksum'] = self._generate_policy_hash(policy)
+                    
+                    checkbox_policies = backup_policies
+                else:
+                    logger.warning("备用解析方法也未找到政策，返回空列表")
+            except Exception as e:
+                logger.warning(f"备用解析方法失败: {e}", exc_info=True)
+
+        return checkbox_policies
+
+    def _get_category_code_by_name(self, category_name):
+        """由分类名称查找分类代码（用于地区筛选时辅助判断）"""
+        if not category_name:
+            return None
+        for cat_name, cat_code in self._get_flat_categories():
+            if cat_name == category_name:
+                return cat_code
+        return None
+
+    def _apply_policy_detail(self, policy, detail_data):
+        """把详情页提取的标题、文号、日期、正文等合并到政策条目
+
+        Returns:
+            bool: 是否获取到有效正文
+        """
+        if isinstance(detail_data, dict):
+            content = detail_data.get('content', '')
+            for key in ('title', 'doc_number', 'pub_date', 'validity', 'issue_department'):
+                value = detail_data.get(key)
+                if value:
+                    policy[key] = value
+        else:
+            content = detail_data
+
+        policy.pop('_need_detail_fetch', None)
+        if content and len(content) > 50:
+            policy['content'] = content
+            policy['checksum'] = self._generate_policy_hash(policy)
+            return True
+        return False
+
+    def _finish_policy_detail(self, policy, detail_data, category_code=None):
+        """合并详情并做地区筛选
+
+        Returns:
+            bool: 是否保留该政策（详情获取失败时默认保留，避免误删）
+        """
+        if self._apply_policy_detail(policy, detail_data):
+            logger.info(
+                "✓ 详情更新: 标题=%s, checksum=%s...",
+                policy.get('title', '')[:50],
+                policy.get('checksum', '')[:8]
+            )
+        else:
+            content = policy.get('content')
+            logger.warning(f"详情内容为空或过短: {len(content) if content else 0} ({policy.get('url', '')})")
+
+        if not detail_data:
+            return True
+        kept = self._should_keep_policy(policy, category_code)
+        self._log_filter_result(policy, kept)
+        return kept
+
+    def _log_filter_result(self, policy, kept):
+        """记录地区筛选结果"""
+        region = self._identify_policy_region(policy)
+        scope = self._identify_scope(policy)
+        if kept:
+            level = self._identify_level(policy)
+            logger.debug(
+                f"保留政策: {policy.get('title', '')[:50]} | "
+                f"地区: {region} | 作用范围: {scope} | 层级: {level}"
+            )
+        else:
+            logger.info(
+                f"已过滤政策: {policy.get('title', '')[:50]} | "
+                f"地区: {region} | 作用范围: {scope} | 时效性: {policy.get('validity', '')}"
+            )
+
+    def _parse_policy_list_html(self, html_content, callback=None, stop_callback=None, category_name=None,
+                                policy_callback=None, detail_pipeline=None):
+        """解析HTML响应中的政策列表，逐条获取详情并筛选地区
+
+        传入 detail_pipeline 时，条目提交给详情流水线后立即返回（未筛选的列表条目），
+        详情获取、筛选和 policy_callback 由流水线在后台完成。
+        """
+        try:
+            policies = self._extract_policy_list_items(
+                html_content, category_name=category_name, callback=callback, stop_callback=stop_callback
+            )
+            if not policies:
                 logger.warning("所有解析方法都失败，返回空列表")
                 return []
 
-            policies = checkbox_policies
             logger.info(f"使用 checkbox 方法解析 {len(policies)} 条政策")
 
             # 检查停止
@@ -871,6 +1083,12 @@ class GuangdongSpider(EnhancedBaseCrawler):
                 logger.info("用户已停止解析")
                 return policies
 
+            if detail_pipeline is not None:
+                for policy in policies:
+                    if not detail_pipeline.add(policy):
+                        break
+                return policies
+
             # 批量获取详情并筛选地区
             policies_needing_detail = [p for p in policies if p.get('_need_detail_fetch')]
             if policies_needing_detail:
@@ -878,14 +1096,7 @@ class GuangdongSpider(EnhancedBaseCrawler):
                 filtered_policies = []
                 
                 # 获取分类代码（用于辅助判断）
-                category_code = None
-                if category_name:
-                    # 从分类名称获取分类代码
-                    flat_categories = self._get_flat_categories()
-                    for cat_name, cat_code in flat_categories:
-                        if cat_name == category_name:
-                            category_code = cat_code
-                            break
+                category_code = self._get_category_code_by_name(category_name)
                 
                 for policy in policies_needing_detail:
                     if stop_callback and stop_callback():
@@ -897,66 +1108,9 @@ class GuangdongSpider(EnhancedBaseCrawler):
                             logger.debug(f"获取政策详情: {url}")
                             detail_data = self.get_policy_detail(url, expected_title=policy.get('title'))
 
-                            content = ''
-                            real_title = None
-                            doc_number = None
-                            pub_date = None
-                            validity = None
-
-                            if isinstance(detail_data, dict):
-                                content = detail_data.get('content', '')
-                                real_title = detail_data.get('title')
-                                doc_number = detail_data.get('doc_number')
-                                pub_date = detail_data.get('pub_date')
-                                validity = detail_data.get('validity')
-                                issue_department = detail_data.get('issue_department', '')  # 发布机关
-                            else:
-                                content = detail_data
-                                issue_department = ''
-
-                            if real_title:
-                                policy['title'] = real_title
-                            if doc_number:
-                                policy['doc_number'] = doc_number
-                            if pub_date:
-                                policy['pub_date'] = pub_date
-                            if validity:
-                                policy['validity'] = validity
-                            if issue_department:
-                                policy['issue_department'] = issue_department
-
-                            if content and len(content) > 50:
-                                policy['content'] = content
-                                policy['checksum'] = self._generate_policy_hash(policy)
-                                logger.info(
-                                    "✓ 详情更新: 标题=%s, checksum=%s...",
-                                    policy.get('title', '')[:50],
-                                    policy.get('checksum', '')[:8]
-                                )
-                            else:
-                                logger.warning(f"详情内容为空或过短: {len(content) if content else 0}")
-
-                            policy.pop('_need_detail_fetch', None)
-                            
                             # 地区筛选：只保留省级和中山市政策（作用于全省或全市）
-                            if self._should_keep_policy(policy, category_code):
+                            if self._finish_policy_detail(policy, detail_data, category_code):
                                 filtered_policies.append(policy)
-                                # 记录详细信息
-                                region = self._identify_policy_region(policy)
-                                scope = self._identify_scope(policy)
-                                level = self._identify_level(policy)
-                                logger.debug(
-                                    f"保留政策: {policy.get('title', '')[:50]} | "
-                                    f"地区: {region} | 作用范围: {scope} | 层级: {level}"
-                                )
-                            else:
-                                region = self._identify_policy_region(policy)
-                                scope = self._identify_scope(policy)
-                                validity = policy.get('validity', '')
-                                logger.info(
-                                    f"已过滤政策: {policy.get('title', '')[:50]} | "
-                                    f"地区: {region} | 作用范围: {scope} | 时效性: {validity}"
-                                )
 
                         except Exception as e:
                             logger.warning(f"获取政策详情失败: {url}, 错误: {e}")
@@ -986,8 +1140,6 @@ class GuangdongSpider(EnhancedBaseCrawler):
 
             return policies
 
-            # 移除所有传统解析代码 (no policy_items, no selectors loop, no all_policy_items merge, no traditional for loop)
-
         except Exception as e:
             logger.error(f"解析政策列表失败: {e}", exc_info=True)
             return []
@@ -1780,21 +1932,18 @@ class GuangdongSpider(EnhancedBaseCrawler):
         if len(page1_policies) == 0:
             return True
         
-        # 比较每条政策的唯一标识（使用title和doc_number的组合）
+        # 比较每条政策的唯一标识（有政策ID时使用ID，否则使用title和doc_number的组合；
+        # 详情由流水线在后台填充，比较时标题可能尚未更新）
         # 如果所有政策的标识都相同，则认为两页完全一致
-        page1_identifiers = set()
-        for policy in page1_policies:
+        def identifier(policy):
+            if policy.get('policy_id'):
+                return policy['policy_id']
             title = policy.get('title', '').strip()
             doc_number = policy.get('doc_number', '').strip()
-            identifier = f"{title}|{doc_number}"
-            page1_identifiers.add(identifier)
-        
-        page2_identifiers = set()
-        for policy in page2_policies:
-            title = policy.get('title', '').strip()
-            doc_number = policy.get('doc_number', '').strip()
-            identifier = f"{title}|{doc_number}"
-            page2_identifiers.add(identifier)
+            return f"{title}|{doc_number}"
+
+        page1_identifiers = {identifier(policy) for policy in page1_policies}
+        page2_identifiers = {identifier(policy) for policy in page2_policies}
         
         # 如果两个集合完全相同，则认为两页完全一致
         return page1_identifiers == page2_identifiers
@@ -1802,16 +1951,7 @@ class GuangdongSpider(EnhancedBaseCrawler):
     def _generate_policy_hash(self, policy):
         """生成政策 checksum (优先 content MD5，用于唯一标识)"""
         if isinstance(policy, dict):
-            content = policy.get('content', '').strip()
-            if content and len(content) > 50:  # 有效内容
-                return hashlib.md5(content.encode('utf-8')).hexdigest()
-            else:
-                # Fallback: title + pub_date + doc_number
-                title = policy.get('title', '')
-                pub_date = policy.get('pub_date', '')
-                doc_number = policy.get('doc_number', '')
-                hash_string = f"{title}|{pub_date}|{doc_number}"
-                return hashlib.md5(hash_string.encode('utf-8')).hexdigest()
+            return policy_checksum(policy)
         else:
             return hashlib.md5(str(policy).encode('utf-8')).hexdigest()
     
@@ -1868,7 +2008,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
         return unique_policies
 
     def crawl_policies(self, keywords=None, callback=None, start_date=None, end_date=None,
-                      speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, policy_callback=None):
+                      speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, policy_callback=None,
+                      incremental=None):
         """爬取广东省政策
 
         Args:
@@ -1880,6 +2021,7 @@ class GuangdongSpider(EnhancedBaseCrawler):
             disable_speed_limit: 是否禁用速度限制
             stop_callback: 停止回调函数
             policy_callback: 政策数据回调函数，每解析到一条政策时调用
+            incremental: 增量模式，各单元翻页到上次爬取的高水位即停止；None 时读取配置
         """
         logger.info(f"开始爬取广东省政策，关键词: {keywords}")
 
@@ -1895,150 +2037,197 @@ class GuangdongSpider(EnhancedBaseCrawler):
 
         # 设置速度模式（延迟控制已在循环中实现）
 
-        # 获取所有分类
-        categories = self._get_flat_categories()
-        logger.info(f"找到 {len(categories)} 个分类")
+        # 每个"分类 × 发布机关"是一个独立单元，各自使用独立会话并行爬取，进度按单元保存
+        units = self._get_crawl_units()
+        signature = json.dumps(
+            {'keywords': keywords, 'start_date': start_date, 'end_date': end_date},
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        unit_states = self.progress.begin_units(signature, [self._unit_key(code, lvalue) for _, code, lvalue in units])
+        pending_units = [
+            unit for unit in units
+            if unit_states[self._unit_key(unit[1], unit[2])].get('status') != 'done'
+        ]
+        logger.info(f"找到 {len(units)} 个分类/发布机关单元，待爬取 {len(pending_units)} 个")
+        if len(pending_units) < len(units) and callback:
+            callback(f"断点续爬：跳过已完成的 {len(units) - len(pending_units)} 个单元")
 
         all_policies = []
-        total_crawled = 0
+        watermarks = {
+            self._unit_key(code, lvalue): HighWaterMark(
+                self._watermark_source(code, lvalue), incremental, keywords, start_date, end_date
+            )
+            for _, code, lvalue in pending_units
+        }
+
+        # 详情抓取流水线：列表条目解析后立即在后台抓取详情、筛选并通过 policy_callback 输出
+        detail_pipeline = GuangdongDetailPipeline(
+            self, stop_callback=stop_callback, policy_callback=policy_callback
+        ).start()
 
-        # 遍历所有分类，直接按分类代码和发布机关获取（取消年份分割策略）
-        logger.info("开始按分类代码和发布机关直接获取...")
+        logger.info("开始按分类代码和发布机关并行获取...")
         if callback:
-            callback("开始按分类代码和发布机关直接获取...")
+            callback("开始按分类代码和发布机关并行获取...")
 
-        for category_name, category_code in categories:
-            if stop_callback and stop_callback():
-                logger.info("用户已停止爬取")
-                break
+        try:
+            if pending_units:
+                workers = min(self.unit_workers, len(pending_units))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gd-unit') as executor:
+                    futures = {
+                        executor.submit(
+                            self._crawl_unit, category_name, category_code, lvalue, detail_pipeline,
+                            callback, stop_callback, policy_callback,
+                            keywords, start_date, end_date, disable_speed_limit,
+                            watermarks[self._unit_key(category_code, lvalue)]
+                        ): (category_name, lvalue)
+                        for category_name, category_code, lvalue in pending_units
+                    }
+                    for future in as_completed(futures):
+                        category_name, lvalue = futures[future]
+                        try:
+                            unit_policies = future.result()
+                        except Exception as e:
+                            logger.error(f"分类[{category_name}] (lvalue={lvalue}) 爬取失败: {e}", exc_info=True)
+                            continue
+                        all_policies.extend(unit_policies)
+        except BaseException:
+            # 列表抓取异常时丢弃未完成的详情
+            detail_pipeline.cancel()
+            detail_pipeline.close()
+            raise
+
+        # 等待详情抓取完成（已停止时流水线直接退出）
+        detail_pipeline.close()
+        policies = detail_pipeline.results
+
+        # 列表和详情都已完成的单元更新高水位
+        if not (stop_callback and stop_callback()):
+            for key, watermark in watermarks.items():
+                if self.progress.get_unit(key).get('status') == 'done':
+                    watermark.commit()
+
+        logger.info(
+            f"爬取完成，列表获取 {len(all_policies)} 条，筛选后保留 {len(policies)} 条政策"
+        )
+        return policies
 
-            logger.info(f"正在爬取分类: {category_name} (代码: {category_code})")
-            if callback:
-                callback(f"正在爬取分类: {category_name}")
+    def _get_crawl_units(self) -> List[Tuple[str, str, str]]:
+        """
+        获取全部爬取单元
 
-            # 获取该分类需要的发布机关列表
-            issue_department_lvalues = self._get_issue_department_lvalues(category_code)
-            
-            if not issue_department_lvalues:
-                # 对于不使用发布机关筛选的分类（如XM0702），使用空lvalue获取所有数据，后续筛选
-                logger.info(f"分类 {category_name} 不使用发布机关筛选，获取所有数据后筛选")
-                dept_policies = self._crawl_category_by_department(
-                    category_name,
-                    category_code,
-                    '',  # 空字符串表示不使用发布机关筛选
-                    callback,
-                    stop_callback,
-                    policy_callback,
-                    keywords=keywords,
-                    start_date=start_date,
-                    end_date=end_date,
-                    disable_speed_limit=disable_speed_limit
-                )
-                
-                if dept_policies:
-                    category_policies = dept_policies
-                    total_crawled += len(category_policies)
-                    all_policies.extend(category_policies)
-                    logger.info(f"分类[{category_name}] 完成，获取 {len(category_policies)} 条政策")
-                else:
-                    logger.warning(f"分类[{category_name}] 未获取到政策数据")
-                continue
-            
-            # 对于需要多个发布机关的分类（如规范性文件），分别获取
-            category_policies = []
-            for lvalue in issue_department_lvalues:
-                # 获取发布机关名称（用于日志）
-                dept_name = self._get_department_name_by_lvalue(lvalue)
-                logger.info(f"  获取发布机关: {dept_name} (lvalue={lvalue})")
-                if callback:
-                    callback(f"  获取发布机关: {dept_name}")
-                
-                # 直接按分类和发布机关获取（不使用年份分割）
-                dept_policies = self._crawl_category_by_department(
-                    category_name,
-                    category_code,
-                    lvalue,
-                    callback,
-                    stop_callback,
-                    policy_callback,
-                    keywords=keywords,
-                    start_date=start_date,
-                    end_date=end_date,
-                    disable_speed_limit=disable_speed_limit
-                )
-                
-                if dept_policies:
-                    category_policies.extend(dept_policies)
-                    logger.info(f"  发布机关 {dept_name} 获取到 {len(dept_policies)} 条政策")
-                else:
-                    logger.warning(f"  发布机关 {dept_name} 未获取到政策数据")
+        Returns:
+            List[Tuple[str, str, str]]: (分类名称, 分类代码, 发布机关lvalue)，
+            不使用发布机关筛选的分类（如XM0702）lvalue 为空字符串
+        """
+        units = []
+        for category_name, category_code in self._get_flat_categories():
+            for lvalue in self._get_issue_department_lvalues(category_code) or ['']:
+                units.append((category_name, category_code, lvalue))
+        return units
 
-            if category_policies:
-                total_crawled += len(category_policies)
-                all_policies.extend(category_policies)
-                logger.info(f"分类[{category_name}] 完成，获取 {len(category_policies)} 条政策")
-            else:
-                logger.warning(f"分类[{category_name}] 未获取到政策数据")
+    @staticmethod
+    def _unit_key(category_code: str, lvalue: str) -> str:
+        return f"{category_code}:{lvalue or '*'}"
 
-        # 处理需要详情获取的政策（china接口的结果）
-        if all_policies:
-            policies_needing_detail = [p for p in all_policies if p.get('_need_detail_fetch')]
-            if policies_needing_detail:
-                logger.info(f"china接口策略：批量获取 {len(policies_needing_detail)} 条政策的详情内容...")
-                for policy in policies_needing_detail:
-                    if stop_callback and stop_callback():
-                        logger.info("用户已停止爬取")
-                        break
+    @classmethod
+    def _watermark_source(cls, category_code: str, lvalue: str) -> str:
+        """单元的增量爬取高水位标识"""
+        return f"guangdong:{cls._unit_key(category_code, lvalue)}"
 
-                    url = policy.get('url')
-                    if url:
-                        try:
-                            logger.debug(f"china接口：获取政策详情: {url}")
-                            detail_data = self.get_policy_detail(url, expected_title=policy.get('title'))
+    def _fork_for_unit(self, api_config: Dict[str, str]) -> 'GuangdongSpider':
+        """
+        为单元创建工作爬虫
 
-                            if isinstance(detail_data, dict):
-                                content = detail_data.get('content', '')
-                                real_title = detail_data.get('title')
-                                doc_number = detail_data.get('doc_number')
-                                pub_date = detail_data.get('pub_date')
-                                validity = detail_data.get('validity')
-                            else:
-                                content = detail_data
-                                real_title = None
-                                doc_number = None
-                                pub_date = None
-                                validity = None
-
-                            if real_title:
-                                policy['title'] = real_title
-                            if doc_number:
-                                policy['doc_number'] = doc_number
-                            if pub_date:
-                                policy['pub_date'] = pub_date
-                            if validity:
-                                policy['validity'] = validity
-
-                            if content and len(content) > 50:
-                                policy['content'] = content
-                                policy['checksum'] = self._generate_policy_hash(policy)
-                                logger.info(
-                                    "✓ china接口：详情更新 标题=%s, checksum=%s...",
-                                    policy.get('title', '')[:50],
-                                    policy.get('checksum', '')[:8]
-                                )
-                            else:
-                                logger.warning(f"✗ 详情内容为空或过短: {len(content) if content else 0}")
+        工作爬虫与本爬虫共用代理会话注册表（每个代理一个会话，连接和Cookie跨单元复用）、
+        请求时间窗口（全局每分钟请求数限制）、监控、进度和去重缓存；
+        只租用自己的代理、切换到该代理的会话并按单元分类预热。
+        代理池初始化和代理验证由本爬虫在初始化时完成一次。
+        """
+        worker = copy.copy(self)
+        worker.headers = self.headers.copy()
+        worker.current_api_config = api_config
+        worker._access_limit_strikes = 0
+        worker._bind_proxy_session(worker._lease_proxy())
+        return worker
+
+    def _get_unit_worker(self, api_config: Dict[str, str]) -> 'GuangdongSpider':
+        """
+        获取当前单元线程的工作爬虫
 
-                            policy.pop('_need_detail_fetch', None)
+        线程处理第一个单元时创建，之后的单元复用同一工作爬虫（会话、Cookie和代理），
+        只做轻量重置：上个单元未取得代理时重新租用，分类入口页变化时重新预热。
+        """
+        worker = getattr(self._unit_local, 'worker', None)
+        if worker is None:
+            worker = self._unit_local.worker = self._fork_for_unit(api_config)
+            return worker
+        
+        logger.debug(f"线程 {threading.current_thread().name} 复用单元工作爬虫")
+        worker._access_limit_strikes = 0
+        category_changed = worker.current_api_config != api_config
+        worker.current_api_config = api_config
+        if worker.enable_proxy and not getattr(worker.session, 'proxies', None):
+            worker._bind_proxy_session(worker._lease_proxy())
+        elif category_changed and not worker._preheat_session():
+            logger.warning("切换单元分类时预热入口页失败，后续请求可能需要额外重试")
+        return worker
+
+    def _lease_proxy(self) -> Optional[Dict[str, str]]:
+        """从共享代理池租用一个代理，未启用代理或无可用代理时返回None"""
+        if not self.enable_proxy:
+            return None
+        try:
+            from .proxy_pool import get_shared_proxy
+            return get_shared_proxy()
+        except (ImportError, ValueError, KeyError) as e:
+            logger.warning(f"租用代理失败: {e}，将使用直接连接")
+            return None
 
-                        except Exception as e:
-                            logger.warning(f"✗ china接口：获取政策详情失败: {url}, 错误: {e}")
-                            policy.pop('_need_detail_fetch', None)
+    def _crawl_unit(self, category_name, category_code, lvalue, detail_pipeline, callback=None,
+                    stop_callback=None, policy_callback=None, keywords=None, start_date=None,
+                    end_date=None, disable_speed_limit=False, watermark=None) -> List[Dict]:
+        """在单元工作线程中爬取一个"分类 × 发布机关"单元"""
+        key = self._unit_key(category_code, lvalue)
+        state = self.progress.get_unit(key)
+        last_page = int(state.get('last_page') or 0)
+        dept_name = self._get_department_name_by_lvalue(lvalue) if lvalue else '全部发布机关'
+        if last_page:
+            logger.info(f"单元 {category_name} - {dept_name} 从第 {last_page + 1} 页继续")
+        else:
+            logger.info(f"开始单元 {category_name} - {dept_name}")
+        if callback:
+            callback(f"正在爬取分类: {category_name} - {dept_name}")
 
-        # 注意：china接口的政策已经在前面通过policy_callback发送过了
-        # 这里批量详情获取是为了更新已发送的数据
-        logger.info(f"china接口策略完成，共获取 {len(all_policies)} 条政策")
-        return all_policies
+        api_config = self._get_category_api_config(category_code)
+        worker = self._get_unit_worker(api_config)
+        # 页码与页大小绑定：续爬时沿用中断前的页大小，新单元与接口协商后记入进度
+        page_size = int(state.get('page_size') or 0) if last_page else 0
+        if not page_size:
+            page_size = worker._negotiate_page_size(api_config, category_code, lvalue, keywords, start_date, end_date)
+        self.progress.update_unit(key, status='running', page_size=page_size)
+        tracker = GuangdongUnitTracker(self.progress, key, last_page)
+        unit_policies = worker._crawl_category_by_department(
+            category_name,
+            category_code,
+            lvalue,
+            callback,
+            stop_callback,
+            policy_callback,
+            keywords=keywords,
+            start_date=start_date,
+            end_date=end_date,
+            disable_speed_limit=disable_speed_limit,
+            detail_pipeline=tracker.bind(detail_pipeline, watermark),
+            start_page=last_page + 1,
+            page_callback=tracker.page_listed,
+            init_session=False,
+            watermark=watermark,
+            page_size=page_size
+        )
+        if not (stop_callback and stop_callback()):
+            tracker.finish_listing()
+        logger.info(f"单元 {category_name} - {dept_name} 列表获取完成，{len(unit_policies)} 条")
+        return unit_policies
 
     def _parse_policy_list_record_search(self, soup, callback=None, stop_callback=None, category_name=None):
         """解析RecordSearch接口返回的政策列表 - 基于最新HTML结构分析"""
@@ -2707,27 +2896,59 @@ class GuangdongSpider(EnhancedBaseCrawler):
             logger.error(f"解析政策项目失败（未知错误）: {e}", exc_info=True)
             return None
     
-    def get_policy_detail(self, url, expected_title=None):
-        """获取政策详情内容并提取标题、文号等元数据"""
-        max_detail_attempts = 3
+    def _get_detail_headers(self, url):
+        """详情页请求头（按库路径设置来源页）"""
+        headers = self.headers.copy()
+        if url:
+            for path, referer in DETAIL_REFERERS:
+                if path in url:
+                    headers['Referer'] = referer
+                    break
+        return headers
+
+    def _parse_policy_detail_html(self, content, text, url, expected_title=None, access_blocked=False):
+        """解析详情页，提取标题、文号、日期、发布机关和正文
+
+        Args:
+            content: 响应原始内容（交给BeautifulSoup按页面声明的编码解析）
+            text: 响应文本（用于检测访问限制提示）
+            url: 详情页地址
+            expected_title: 列表页标题，详情页标题无效时回退使用
+            access_blocked: 请求阶段是否已检测到访问限制
+
+        Returns:
+            Dict: 详情数据，命中全文访问限制时 access_blocked 为 True 且正文为空
+        """
+        # 解析交给解析进程池（未启用时在当前线程执行）
+        detail_data = run_parser(parse_policy_detail, content, expected_title)
+
+        # 判定是否命中全文访问限制提示
+        if not access_blocked and any(token in text for token in DETAIL_BLOCK_TOKENS):
+            access_blocked = True
+            logger.warning("检测到全文访问限制提示: %s", url)
+            snapshot_path = self._capture_blocked_snapshot(url, text)
+            if snapshot_path:
+                logger.info("限制页面快照已保存: %s", snapshot_path)
+            # 避免把限制页的内容当成正文
+            detail_data['content'] = ''
+            if expected_title:
+                detail_data['title'] = expected_title.strip()
+
+        detail_data['raw_html'] = text
+        detail_data['access_blocked'] = access_blocked
+        return detail_data
+
+    def get_policy_detail(self, url, expected_title=None, max_attempts=3):
+        """获取政策详情内容并提取标题、文号等元数据
+
+        max_attempts 为1时只请求一次，失败后不轮换会话也不等待（由调用方安排重试）
+        """
+        max_detail_attempts = max(1, max_attempts)
         last_detail_data: Dict[str, Any] = {}
     
         for attempt in range(1, max_detail_attempts + 1):
             try:
-                headers = self.headers.copy()
-    
-                if url:
-                    if '/gddigui/' in url:
-                        headers['Referer'] = 'https://gd.pkulaw.com/dfzfgz/adv'
-                    elif '/gddifang/' in url:
-                        headers['Referer'] = 'https://gd.pkulaw.com/dfxfg/adv'
-                    elif '/regularation/' in url:
-                        headers['Referer'] = 'https://gd.pkulaw.com/sfjs/adv'
-                    elif '/gdnormativedoc/' in url:
-                        headers['Referer'] = 'https://gd.pkulaw.com/fljs/adv'
-                    elif '/gdchinalaw/' in url or '/gdfgwj/' in url:
-                        headers['Referer'] = 'https://gd.pkulaw.com/china/adv'
-    
+                headers = self._get_detail_headers(url)
                 resp, request_info = self.get_page(url, headers=headers)
     
                 if not resp:
@@ -2740,146 +2961,15 @@ class GuangdongSpider(EnhancedBaseCrawler):
                         continue
                     return {}
     
-                soup = BeautifulSoup(resp.content, 'html.parser')
-                access_blocked = bool(request_info.get('access_blocked'))
-                snapshot_path = ""
-    
-                # 标题提取
-                real_title = ''
-                title_h2 = soup.select_one('h2.title')
-                if title_h2 and title_h2.get_text(strip=True):
-                    real_title = title_h2.get_text(strip=True)
-    
-                if not real_title:
-                    title_tag = soup.find('title')
-                    if title_tag and title_tag.get_text(strip=True):
-                        title_text = re.sub(r' - .*$', '', title_tag.get_text(strip=True)).strip()
-                        if title_text and not title_text.startswith('政策ID:'):
-                            real_title = title_text
-    
-                if not real_title:
-                    for tag_name in ['h1', 'h2', 'h3']:
-                        headings = soup.find_all(tag_name)
-                        for heading in headings:
-                            heading_text = heading.get_text(strip=True)
-                            if heading_text and len(heading_text) > 5 and '政策ID:' not in heading_text:
-                                real_title = heading_text
-                                break
-                        if real_title:
-                            break
-    
-                # 元数据提取
-                doc_number = ''
-                pub_date = ''
-                validity = ''
-                issue_department = ''  # 发布机关（用于地区识别）
-                
-                for li in soup.select('li'):
-                    strong = li.find('strong')
-                    if not strong:
-                        continue
-                    label = strong.get_text(strip=True)
-                    value = li.get_text(strip=True).replace(label, '').replace('：', '').strip()
-                    if '发文字号' in label and value:
-                        doc_number = value
-                    elif '公布日期' in label and value:
-                        pub_date = value.replace('.', '-')
-                    elif '施行日期' in label and value and not pub_date:
-                        pub_date = value.replace('.', '-')
-                    elif ('发布机关' in label or '制定机关' in label) and value:
-                        issue_department = value
-    
-                validity_elem = soup.select_one('.timelinessDic')
-                if validity_elem:
-                    validity = validity_elem.get_text(strip=True)
-    
-                # 内容提取
-                content_text = ''
-                content_div = soup.select_one('div.content')
-                if content_div:
-                    for tag in content_div.find_all(['script', 'style', 'section', 'aside']):
-                        tag.decompose()
-                    content_text = content_div.get_text('\n', strip=True)
-    
-                if not content_text or len(content_text) < 100:
-                    for div in soup.find_all('div'):
-                        text = div.get_text('\n', strip=True)
-                        if text and len(text) > 200 and ('第一条' in text or '条例' in text):
-                            content_text = text
-                            break
-    
-                if not content_text:
-                    stripped_soup = soup
-                    for tag in stripped_soup.find_all(['nav', 'header', 'footer', 'script', 'style']):
-                        tag.decompose()
-                    content_text = re.sub(r'\s+', ' ', stripped_soup.get_text(strip=True))
-    
-                # 如果提取到的标题疑似为通用站点名称或拦截页内容，则回退到列表标题
-                if real_title:
-                    normalized_title = real_title.strip()
-                    if normalized_title:
-                        generic_titles = {
-                            '广东省法规规章数据库',
-                            '广东省法规规章数据库检索结果',
-                            '广东省法规规章数据库-检索结果',
-                            '广东省法规规章数据库（移动版）'
-                        }
-                        generic_tokens = [
-                            '登录注册首页',
-                            '抱歉，您已超过全文最大访问数',
-                            '北大法宝',
-                            '返回广东省人大',
-                            '错误提示'
-                        ]
-                        fallback_required = (
-                            normalized_title in generic_titles
-                            or (normalized_title.endswith('数据库') and len(normalized_title) <= 12)
-                            or any(token in normalized_title for token in generic_tokens)
-                            or len(normalized_title) >= 100
-                        )
-                        if fallback_required:
-                            expected_clean = (expected_title or '').strip()
-                            if expected_clean:
-                                logger.debug(
-                                    "详情页返回泛化/拦截标题[%s]，改用列表标题[%s]",
-                                    normalized_title[:120],
-                                    expected_clean
-                                )
-                                real_title = expected_clean
-                            else:
-                                real_title = ''
-    
-                # 判定是否命中全文访问限制提示
-                block_tokens = [
-                    '抱歉，您已超过全文最大访问数',
-                    '为了保证服务质量',
-                    '错误提示',
-                    '请登录后再访问全文'
-                ]
-                if not access_blocked and any(token in resp.text for token in block_tokens):
-                    access_blocked = True
-                    logger.warning("检测到全文访问限制提示: %s", url)
-                    snapshot_path = self._capture_blocked_snapshot(url, resp.text)
-                    if snapshot_path:
-                        logger.info("限制页面快照已保存: %s", snapshot_path)
-                    # 避免把限制页的内容当成正文
-                    content_text = ''
-                    if expected_title:
-                        real_title = expected_title.strip()
-    
-                detail_data = {
-                    'title': real_title.strip() if real_title else '',
-                    'doc_number': doc_number.strip() if doc_number else '',
-                    'pub_date': pub_date.strip() if pub_date else '',
-                    'validity': validity.strip() if validity else '',
-                    'issue_department': issue_department.strip() if issue_department else '',  # 发布机关（用于地区识别）
-                    'content': content_text.strip(),
-                    'raw_html': resp.text,
-                    'access_blocked': access_blocked
-                }
+                detail_data = self._parse_policy_detail_html(
+                    resp.content, resp.text, url,
+                    expected_title=expected_title,
+                    access_blocked=bool(request_info.get('access_blocked'))
+                )
+                content_text = detail_data['content']
                 last_detail_data = detail_data
     
-                if access_blocked:
+                if detail_data['access_blocked']:
                     self.monitor.record_request(url, success=False, error_type="access_limited")
                     if attempt < max_detail_attempts:
                         if not request_info.get('access_blocked'):
@@ -2975,33 +3065,11 @@ class GuangdongSpider(EnhancedBaseCrawler):
             }
     
     def save_to_db(self, policies):
-        """保存政策到数据库"""
-        for policy in policies:
-            checksum = policy.get('checksum', '')
-            if isinstance(policy, dict) and checksum:
-                db.insert_policy(  # Assume DB supports checksum param
-                    policy['level'],
-                    policy['title'],
-                    policy['pub_date'],
-                    policy['source'],
-                    policy['content'],
-                    policy['crawl_time'],
-                    policy.get('category'),
-                    checksum=checksum  # Add checksum arg
-                )
-                logger.info(f"保存政策到 DB, checksum: {checksum[:8]}...")
-            elif isinstance(policy, (list, tuple)) and len(policy) >= 6:
-                db.insert_policy(
-                    policy[1],  # level
-                    policy[2],  # title
-                    policy[3],  # pub_date
-                    policy[4],  # source
-                    policy[5],  # content
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),  # crawl_time
-                    policy[6] if len(policy) > 6 else None,  # category
-                    checksum=policy.get('checksum')  # Add checksum arg
-                )
-                logger.info(f"保存政策到 DB, checksum: {policy.get('checksum', '')[:8]}...")
+        """保存政策到数据库（批量插入，单事务去重）"""
+        outcomes = db.insert_policies_bulk(policies)
+        inserted = sum(1 for o in outcomes if o['status'] == db.INSERT_STATUS_INSERTED)
+        logger.info(f"保存政策到 DB: 新增 {inserted} 条，跳过 {len(outcomes) - inserted} 条")
+        return outcomes
     
     def _is_policy_in_date_range(self, policy, dt_start, dt_end):
         """检查政策是否在指定的时间范围内"""
@@ -3920,7 +3988,9 @@ class GuangdongSpider(EnhancedBaseCrawler):
     
     def _crawl_category_by_department(self, category_name: str, category_code: str, issue_department_lvalue: str,
                                      callback=None, stop_callback=None, policy_callback=None, keywords=None,
-                                     start_date=None, end_date=None, disable_speed_limit=False):
+                                     start_date=None, end_date=None, disable_speed_limit=False, detail_pipeline=None,
+                                     start_page=1, page_callback=None, init_session=True, watermark=None,
+                                     page_size=None):
         """
         直接按分类代码和发布机关获取政策（不使用年份分割）
         
@@ -3935,6 +4005,12 @@ class GuangdongSpider(EnhancedBaseCrawler):
             start_date: 起始日期
             end_date: 结束日期
             disable_speed_limit: 是否禁用速度限制
+            detail_pipeline: 详情抓取流水线，传入时详情在后台获取，返回未筛选的列表条目
+            start_page: 起始页码（断点续爬）
+            page_callback: 页完成回调，参数为已全部解析提交的最大页码
+            init_session: 是否先访问高级搜索页初始化会话（会话已按该分类预热时可跳过）
+            watermark: 增量爬取高水位，某页条目全部已入库时停止翻页
+            page_size: 列表页大小，None 时与接口协商（断点续爬时须沿用中断前的页大小）
         
         Returns:
             List[Dict]: 政策列表
@@ -3945,34 +4021,46 @@ class GuangdongSpider(EnhancedBaseCrawler):
         self.current_api_config = api_config
         
         # 初始化：先访问高级搜索页面来设置会话上下文
-        try:
-            init_url = api_config.get('init_page', f"{self.base_url}/{api_config['menu']}/adv")
-            logger.debug(f"初始化会话: 访问 {init_url}")
-            init_resp, _ = self._session_get(init_url, timeout=10)
-            if init_resp and init_resp.status_code == 200:
-                logger.debug("会话初始化成功")
-            time.sleep(0.5)  # 短暂延迟
-        except Exception as e:
-            logger.warning(f"会话初始化失败（继续尝试）: {e}")
+        if init_session:
+            try:
+                init_url = api_config.get('init_page', f"{self.base_url}/{api_config['menu']}/adv")
+                logger.debug(f"初始化会话: 访问 {init_url}")
+                init_resp, _ = self._session_get(init_url, timeout=10)
+                if init_resp and init_resp.status_code == 200:
+                    logger.debug("会话初始化成功")
+                time.sleep(0.5)  # 短暂延迟
+            except Exception as e:
+                logger.warning(f"会话初始化失败（继续尝试）: {e}")
         
         # 注意：测试脚本显示，使用发布机关筛选时不需要ClassSearch初始化
         # 直接使用RecordSearch即可，ClassSearch可能导致冲突
         # 因此这里不发送ClassSearch，直接使用RecordSearch
         
+        if page_size is None:
+            page_size = self._negotiate_page_size(
+                api_config, category_code, issue_department_lvalue, keywords, start_date, end_date
+            )
+
         policies = []
-        page_index = 1
-        max_pages = MAX_RECORDS_PER_BATCH // 20  # 接口页数上限
+        page_index = max(1, start_page)
+        max_pages = MAX_RECORDS_PER_BATCH // page_size  # 接口页数上限
         empty_page_count = 0
         max_empty_pages = 5  # 连续空页数限制
         prev_page_policies = None  # 保存上一页的政策数据，用于检测重复
         consecutive_duplicate_count = 0  # 连续重复页面计数
         max_consecutive_duplicates = 3  # 最大连续重复页面数（超过此数才停止）
         
+        stopped = False
         while page_index <= max_pages and empty_page_count < max_empty_pages:
             if stop_callback and stop_callback():
                 logger.info("用户已停止爬取")
+                stopped = True
                 break
             
+            # 之前的页已全部解析并提交（停止时当前页可能只提交了一部分，不上报）
+            if page_callback:
+                page_callback(page_index - 1)
+            
             if callback:
                 callback(f"正在获取 {category_name} - 第 {page_index} 页")
             
@@ -3983,7 +4071,7 @@ class GuangdongSpider(EnhancedBaseCrawler):
                 keywords=keywords,
                 category_code=category_code,
                 page_index=page_index,
-                page_size=20,
+                page_size=page_size,
                 start_date=start_date,
                 end_date=end_date,
                 filter_year=None,  # 不使用年份筛选
@@ -4038,7 +4126,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
                         callback=callback,
                         stop_callback=stop_callback,
                         category_name=category_name,
-                        policy_callback=policy_callback
+                        policy_callback=policy_callback,
+                        detail_pipeline=detail_pipeline
                     )
                     
                     # 如果能解析出政策数据，说明响应正常，不需要检查验证码
@@ -4056,26 +4145,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
                             continue
                         
                         # 检查是否真的遇到验证码限制（更严格的检测）
-                        # 只有当响应明显是验证码页面时才处理
-                        # 检查是否是验证码页面：包含验证码输入框或验证码图片
-                        verifycode_strong_indicators = [
-                            "请输入验证码",
-                            "验证码错误",
-                            "验证码已过期",
-                            "需要输入验证码",
-                            "验证码输入框"
-                        ]
-                        # 检查是否包含验证码输入框的常见HTML元素
-                        has_verifycode_input = (
-                            'id="verifycode"' in resp.text.lower() or
-                            'name="verifycode"' in resp.text.lower() or
-                            'class="verifycode"' in resp.text.lower() or
-                            '验证码输入框' in resp.text
-                        )
-                        is_verifycode_page = any(indicator in resp.text for indicator in verifycode_strong_indicators)
-                        
                         # 只有当明确是验证码页面时才处理（避免误判）
-                        if is_verifycode_page and has_verifycode_input:
+                        if self._is_verifycode_page(resp.text):
                             logger.warning(f"第 {page_index} 页明确检测到验证码限制，尝试轮换会话")
                             if self._rotate_session():
                                 logger.info("会话轮换成功，继续尝试")
@@ -4097,12 +4168,19 @@ class GuangdongSpider(EnhancedBaseCrawler):
                                 callback=callback,
                                 stop_callback=stop_callback,
                                 category_name=category_name,
-                                policy_callback=policy_callback
+                                policy_callback=policy_callback,
+                                detail_pipeline=detail_pipeline
                             )
                 else:
                     # 响应为空，无法解析
                     page_policies = []
                 
+                if page_policies and watermark is not None and watermark.page_known(page_policies):
+                    logger.info(f"第 {page_index} 页已全部入库，到达上次爬取位置，停止翻页")
+                    if callback:
+                        callback(f"增量模式：{category_name} 第 {page_index} 页已全部入库，停止翻页")
+                    break
+                
                 if page_policies:
                     # 检查当前页与上一页是否完全一致
                     if prev_page_policies is not None and page_index > 1:
@@ -4146,7 +4224,8 @@ class GuangdongSpider(EnhancedBaseCrawler):
                                             callback=callback,
                                             stop_callback=stop_callback,
                                             category_name=category_name,
-                                            policy_callback=policy_callback
+                                            policy_callback=policy_callback,
+                                            detail_pipeline=detail_pipeline
                                         )
                                         
                                         # 检查重试后的页面是否仍然与上一页相同
@@ -4235,6 +4314,9 @@ class GuangdongSpider(EnhancedBaseCrawler):
                 page_index += 1
                 continue
         
+        if page_callback and not stopped and not (stop_callback and stop_callback()):
+            page_callback(page_index - 1)
+        
         logger.info(f"分类 {category_name} (发布机关lvalue={issue_department_lvalue}) 获取完成，共获取 {len(policies)} 条政策")
         return policies
 
@@ -5122,8 +5204,171 @@ class GuangdongSpider(EnhancedBaseCrawler):
             )
             self._maybe_rotate_session(force=True)
 
+class GuangdongDetailPipeline(DetailFetchPipeline):
+    """
+    广东省政策详情抓取流水线
+
+    工作线程获取详情后合并到列表条目、做地区筛选，保留的政策加入 results 并立即调用 policy_callback。
+    详情请求与列表请求共用爬虫的每分钟请求数限制。
+    """
+
+    def __init__(self, spider: 'GuangdongSpider', stop_callback=None, policy_callback=None):
+        super().__init__(
+            workers=spider.detail_workers,
+            queue_size=spider.detail_queue_size,
+            max_attempts=3,
+            retry_delay=spider.min_delay,
+            cache_size=spider.detail_cache_size,
+            stop_callback=stop_callback,
+            name='gd-detail'
+        )
+        self.spider = spider
+        self.policy_callback = policy_callback
+        self.results: List[Dict] = []
+        self._results_lock = threading.Lock()
+        self._rotate_lock = threading.Lock()
+
+    def add(self, policy: Dict, on_done: Optional[Callable] = None) -> bool:
+        """
+        加入一条列表条目：需要详情的提交抓取，其余直接输出
+
+        Args:
+            policy: 列表条目
+            on_done: 条目处理完成（无论是否保留）后的回调
+        """
+        url = policy.get('url')
+        if policy.get('_need_detail_fetch') and url:
+            return self.submit((policy, on_done), url, policy.get('title'))
+        policy.pop('_need_detail_fetch', None)
+        self._accept(policy)
+        if on_done:
+            on_done()
+        return True
+
+    def fetch(self, url, expected_title=None):
+        if not self.spider._is_detail_cached(url):
+            self.spider._apply_rate_limit()
+        return self.spider.get_policy_detail(url, expected_title=expected_title, max_attempts=1)
+
+    def is_success(self, detail):
+        return bool(detail) and not detail.get('access_blocked')
+
+    def on_failure(self, url, detail, attempt):
+        # 多个工作线程同时失败时只轮换一次
+        if not self._rotate_lock.acquire(blocking=False):
+            return
+        try:
+            self.spider._maybe_rotate_session(force=True)
+            self.spider.force_refresh_proxy()
+        finally:
+            self._rotate_lock.release()
+
+    def on_result(self, item, detail):
+        policy, on_done = item
+        try:
+            category_code = self.spider._get_category_code_by_name(policy.get('category'))
+            if self.spider._finish_policy_detail(policy, detail, category_code):
+                self._accept(policy)
+        finally:
+            if on_done:
+                on_done()
+
+    def _accept(self, policy):
+        with self._results_lock:
+            self.results.append(policy)
+        if self.policy_callback and not self._is_stopped():
+            try:
+                self.policy_callback(policy)
+            except Exception as cb_error:
+                logger.warning(f"发送政策数据失败: {cb_error}")
+
+class GuangdongUnitTracker:
+    """
+    单元进度跟踪
+
+    列表页的条目提交给详情流水线后，要等该页全部条目处理完（详情已获取并输出）才算完成；
+    已完成页码按顺序推进保存到 CrawlProgress，中断后从第一个未完成的页继续，不会漏掉条目。
+    """
+
+    def __init__(self, progress, key: str, last_page: int = 0):
+        self.progress = progress
+        self.key = key
+        self._lock = threading.Lock()
+        self._listed = last_page      # 条目已全部提交的最大页码
+        self._committed = last_page   # 条目已全部处理完的最大页码
+        self._outstanding = {}        # 页码 -> 未处理完的条目数
+        self._finished = False
+
+    def bind(self, pipeline: 'GuangdongDetailPipeline',
+             watermark: Optional[HighWaterMark] = None) -> '_UnitPipelineSink':
+        """返回交给列表解析使用的流水线入口（提交时登记条目所属页）"""
+        return _UnitPipelineSink(self, pipeline, watermark)
+
+    def add_item(self) -> int:
+        with self._lock:
+            page = self._listed + 1
+            self._outstanding[page] = self._outstanding.get(page, 0) + 1
+            return page
+
+    def item_done(self, page: int) -> None:
+        with self._lock:
+            self._outstanding[page] -= 1
+            if not self._outstanding[page]:
+                del self._outstanding[page]
+        self._advance()
+
+    def page_listed(self, page: int) -> None:
+        with self._lock:
+            self._listed = max(self._listed, page)
+        self._advance()
+
+    def finish_listing(self) -> None:
+        with self._lock:
+            self._finished = True
+        self._advance()
+
+    def _advance(self) -> None:
+        with self._lock:
+            committed = self._committed
+            while committed < self._listed and (committed + 1) not in self._outstanding:
+                committed += 1
+            changed = committed != self._committed
+            self._committed = committed
+            done = self._finished and not self._outstanding and committed >= self._listed
+            if done:
+                self._finished = False  # 只保存一次
+        if done:
+            self.progress.update_unit(self.key, status='done', last_page=committed)
+        elif changed:
+            self.progress.update_unit(self.key, last_page=committed)
+
+
+class _UnitPipelineSink:
+    """把列表条目转交给详情流水线，并在条目处理完后通知单元进度；增量模式下跳过已入库的条目"""
+
+    def __init__(self, tracker: GuangdongUnitTracker, pipeline: 'GuangdongDetailPipeline',
+                 watermark: Optional[HighWaterMark] = None):
+        self.tracker = tracker
+        self.pipeline = pipeline
+        self.watermark = watermark
+
+    def add(self, policy: Dict) -> bool:
+        if self.watermark is not None:
+            if self.watermark.is_known_policy(policy):
+                return True
+            self.watermark.observe_policy(policy)
+        page = self.tracker.add_item()
+        return self.pipeline.add(policy, on_done=lambda: self.tracker.item_done(page))
+
+
 class GuangdongMultiThreadSpider(MultiThreadBaseCrawler):
-    """广东省多线程爬虫"""
+    """
+    广东省多线程爬虫
+
+    列表页需要按顺序翻页（GetRecordListTurningLimit 校验上一页页码），不能按页码区间拆分，
+    因此并发只发生在"分类 × 发布机关"单元之间，所有入口都交给 GuangdongSpider 的单元调度
+    （断点续爬、页大小协商、响应缓存、按代理的会话复用和按线程复用的工作爬虫）。
+    """
     
     def __init__(self, max_workers=4):
         super().__init__(max_workers, enable_proxy=True)
@@ -5144,55 +5389,50 @@ class GuangdongMultiThreadSpider(MultiThreadBaseCrawler):
         import string
         self.string = string
         
+        # 按单元并行爬取使用的爬虫实例（首次并发爬取时创建）
+        self._unit_spider = None
+        
         logger.info(f"初始化多线程爬虫，最大线程数: {max_workers}")
     
-    def _prepare_tasks(self):
-        """准备多线程任务 - 只使用成功的搜索策略"""
-        tasks = []
-        
-        # 只使用成功的搜索策略，不按分类遍历
-        task_data = {
-            'task_id': 'guangdong_search',
-            'category_name': '广东省政策',
-            'category_code': None,  # 不使用分类代码
-            'description': '使用成功的高级搜索策略'
-        }
-        tasks.append(task_data)
-
-        logger.info(f"准备完成，共 {len(tasks)} 个任务，使用 {self.max_workers} 个线程")
-        return tasks
-
-    def _get_flat_categories(self):
-        """获取扁平化的分类列表"""
-        # 这里需要从GuangdongSpider继承的方法
-        # 为了简化，我们直接定义分类
-        categories = [
-            ('综合政务', '579/580'),
-            ('土地管理', '579/581'),
-            ('自然资源确权登记', '579/582'),
-            ('地质', '579/583'),
-            ('地质环境管理', '579/584'),
-            ('矿产资源管理', '579/585'),
-            ('海洋管理', '579/586'),
-            ('测绘地理信息管理', '579/587'),
-            ('法律', '569/570'),
-            ('司法解释', '569/577')
-        ]
-        return categories
+    def _get_unit_spider(self) -> 'GuangdongSpider':
+        """按单元调度使用的爬虫实例（首次使用时创建）"""
+        if self._unit_spider is None:
+            self._unit_spider = GuangdongSpider(disable_proxy=not self.enable_proxy)
+        return self._unit_spider
 
     def crawl_policies_multithread(self, keywords=None, callback=None, start_date=None, end_date=None, 
                                   speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, max_workers=None):
         """多线程爬取政策（兼容原有接口）"""
-        # 统一刷新年份统计
-        self._refresh_category_year_counts()
-        # 使用基类的crawl_multithread方法
-        return self.crawl_multithread(
+        return self.crawl_policies(
+            keywords=keywords,
             callback=callback,
+            start_date=start_date,
+            end_date=end_date,
+            speed_mode=speed_mode,
+            disable_speed_limit=disable_speed_limit,
             stop_callback=stop_callback,
-            max_workers=max_workers,
+            max_workers=max_workers
+        )
+    
+    def crawl_policies(self, keywords=None, callback=None, start_date=None, end_date=None,
+                       speed_mode="正常速度", disable_speed_limit=False, stop_callback=None,
+                       policy_callback=None, max_workers=None):
+        """并发爬取政策：按"分类 × 发布机关"单元并行，max_workers 作为单元并行数"""
+        unit_spider = self._get_unit_spider()
+        unit_spider.unit_workers = max(1, int(max_workers or self.max_workers))
+        self._update_stats(start_time=datetime.now())
+        policies = unit_spider.crawl_policies(
+            keywords=keywords,
+            callback=callback,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            speed_mode=speed_mode,
+            disable_speed_limit=disable_speed_limit,
+            stop_callback=stop_callback,
+            policy_callback=policy_callback
         )
+        self._update_stats(end_time=datetime.now(), total_crawled=len(policies))
+        return policies
     
     def get_multithread_stats(self):
         """获取多线程统计信息"""
@@ -5204,112 +5444,13 @@ class GuangdongMultiThreadSpider(MultiThreadBaseCrawler):
     
     def crawl_multithread(self, callback=None, stop_callback=None, max_workers=None, start_date=None, end_date=None):
         """多线程爬取（兼容原有接口）"""
-        return super().crawl_multithread(
+        return self.crawl_policies(
             callback=callback,
-            stop_callback=stop_callback,
-            max_workers=max_workers,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            stop_callback=stop_callback,
+            max_workers=max_workers
         )
-    
-    def _execute_task(self, task_data: Dict, session, lock, callback: Optional[Callable] = None) -> List[Dict]:
-        """执行具体任务 - 使用成功的搜索策略"""
-
-        category_name = task_data['category_name']
-        description = task_data['description']
-        
-        thread_name = threading.current_thread().name
-        
-        if callback:
-            callback(f"线程 {thread_name} 开始爬取 {description}")
-        
-        # 创建临时的爬虫实例来使用原有的爬取逻辑
-        temp_spider = GuangdongSpider()
-        temp_spider.headers = self.headers
-        temp_spider.enable_proxy = self.enable_proxy
-        temp_spider.category_year_counts = getattr(self, "category_year_counts", {}).copy()
-        
-        # 使用共享代理系统 - 只在启用代理时
-        if self.enable_proxy:
-            try:
-                from .proxy_pool import get_shared_proxy, report_shared_proxy_result
-                temp_spider.get_shared_proxy = get_shared_proxy
-                temp_spider.report_shared_proxy_result = report_shared_proxy_result
-                logger.info(f"线程 {thread_name} 启用代理支持")
-            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
-                logger.warning(f"线程 {thread_name} 代理初始化失败: {e}", exc_info=True)
-                temp_spider.enable_proxy = False
-            except Exception as e:
-                logger.error(f"线程 {thread_name} 代理初始化未知错误: {e}", exc_info=True)
-                temp_spider.enable_proxy = False
-        else:
-            logger.info(f"线程 {thread_name} 禁用代理，使用直接连接")
-        
-        # 使用配置中的URL（已在__init__中设置）
-        temp_spider.base_url = self.base_url
-        temp_spider.search_url = self.search_url
-        
-        # 确保有monitor对象
-        if hasattr(self, 'monitor') and self.monitor:
-            temp_spider.monitor = self.monitor
-        else:
-            # 创建一个简单的monitor对象
-            from .monitor import CrawlerMonitor
-            temp_spider.monitor = CrawlerMonitor()
-        
-        # 初始化会话
-        temp_spider._init_session()
-        
-        # 使用成功的搜索策略 - 直接调用单线程的成功方法
-        policies = []
-        
-        try:
-            if callback:
-                callback(f"线程 {thread_name} 使用年份分割策略爬取 {description}...")
-
-            task_keywords = task_data.get('keywords')
-            task_start_date = task_data.get('start_date')
-            task_end_date = task_data.get('end_date')
-            task_disable_speed = task_data.get('disable_speed_limit', False)
-
-            # 使用年份分割策略
-            category_policies = temp_spider._crawl_category_with_year_split(
-                category_name,
-                task_data.get('category_code', ''),
-                callback,
-                lambda: self.check_stop() if hasattr(self, 'check_stop') else False,
-                policy_callback=task_data.get('policy_callback'),
-                keywords=task_keywords,
-                start_date=task_start_date,
-                end_date=task_end_date,
-                disable_speed_limit=task_disable_speed
-            )
-
-            if category_policies:
-                policies.extend(category_policies)
-                if callback:
-                    callback(f"线程 {thread_name} 获取到 {len(category_policies)} 条政策")
-            else:
-                if callback:
-                    callback(f"线程 {thread_name} 未获取到政策")
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"线程 {thread_name} 执行任务时请求错误: {e}", exc_info=True)
-            if callback:
-                callback(f"线程 {thread_name} 执行失败: {e}")
-        except (ValueError, KeyError, AttributeError) as e:
-            logger.warning(f"线程 {thread_name} 执行任务时解析错误: {e}", exc_info=True)
-            if callback:
-                callback(f"线程 {thread_name} 执行失败: {e}")
-        except Exception as e:
-            logger.error(f"线程 {thread_name} 执行任务时未知错误: {e}", exc_info=True)
-            if callback:
-                callback(f"线程 {thread_name} 执行失败: {e}")
-        
-        if callback:
-            callback(f"线程 {thread_name} 爬取完成，共获取{len(policies)}条政策")
-        
-        return policies
 
 class GuangdongPolicyCrawler(GuangdongSpider):
     """广东省政策爬虫 - 兼容性包装类"""
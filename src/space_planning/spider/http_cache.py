@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP响应缓存
+基于SQLite的磁盘缓存，三个请求入口（EnhancedBaseCrawler._make_request、AntiCrawlerManager.make_request、
+SmartRequestManager.make_request）共用一个缓存文件。
+
+- 缓存键：请求方法 + 规范化URL（查询参数排序、去掉锚点）+ 规范化请求体
+- 有效期：按URL规则配置（详情页长期有效，列表接口每次重新验证，会话相关接口不缓存）
+- 重新验证：过期条目带 If-None-Match / If-Modified-Since 请求，服务器返回304时直接使用缓存内容
+- 容量：超过上限时按最近访问时间淘汰（LRU）
+
+命中未过期缓存的请求不发送网络请求，也不占用频率限制和代理额度。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .config import crawler_config
+
+logger = logging.getLogger(__name__)
+
+# 默认配置（可在爬虫配置 http_cache_settings 节中覆盖）
+DEFAULT_MAX_SIZE_MB = 512
+DEFAULT_TTL = 30 * 86400  # 未匹配规则的页面（主要是政策详情页）有效期
+DEFAULT_TTL_RULES = [
+    # [URL正则, 有效期秒数]：-1 不缓存，0 每次重新验证
+    [r'/RecordSearch|/VerificationCode/|/adv(\?|$)', -1],   # 广东列表检索和会话初始化（与会话绑定）
+    [r'/api-gateway/|/was5?/|/ajaxdata', 0],                 # 住建部、自然资源部列表接口
+]
+
+# 不保存的响应头（与缓存内容无关或每次不同）
+_SKIPPED_HEADERS = {'set-cookie', 'date', 'connection', 'keep-alive', 'transfer-encoding', 'content-encoding',
+                    'content-length'}
+
+# 短于该长度的响应体不压缩
+_COMPRESS_MIN_BYTES = 1024
+
+
+def normalize_url(url: str) -> str:
+    """规范化URL：协议和主机小写、去掉锚点和默认端口、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def _normalize_body(data) -> str:
+    if not data:
+        return ''
+    if isinstance(data, dict):
+        return urlencode(sorted((str(k), str(v)) for k, v in data.items()))
+    if isinstance(data, (list, tuple)):
+        return urlencode(sorted((str(k), str(v)) for k, v in data))
+    if isinstance(data, bytes):
+        return hashlib.sha256(data).hexdigest()
+    return str(data)
+
+
+def _full_url(url: str, params=None) -> str:
+    """把 params 合并到URL（与 requests 发送的URL一致）"""
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+class CacheEntry:
+    """一条缓存记录"""
+
+    __slots__ = ('key', 'url', 'status', 'headers', 'body', 'encoding', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, key, url, status, headers, body, encoding, etag, last_modified, expires_at):
+        self.key = key
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def validators(self) -> Dict[str, str]:
+        """重新验证用的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """还原为 requests.Response（from_cache=True）"""
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.body
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.url = self.url
+        response.encoding = self.encoding
+        response.reason = 'OK'
+        response.from_cache = True
+        return response
+
+
+class HttpCache:
+    """SQLite磁盘缓存（线程安全，单连接 + 锁）"""
+
+    def __init__(self, path: str, max_size_mb: float = DEFAULT_MAX_SIZE_MB, default_ttl: float = DEFAULT_TTL,
+                 ttl_rules: Optional[List] = None):
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.default_ttl = default_ttl
+        self.ttl_rules: List[Tuple[re.Pattern, float]] = [
+            (re.compile(pattern), float(ttl)) for pattern, ttl in (DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules)
+        ]
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT,
+                body BLOB,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                expires_at REAL,
+                last_access REAL,
+                size INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache(last_access)')
+        self._conn.commit()
+        self._total_size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+
+    # ---- 规则与缓存键 ----
+
+    def ttl_for(self, url: str) -> float:
+        """URL对应的有效期（秒）：-1 不缓存，0 每次重新验证"""
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def make_key(method: str, url: str, data=None) -> str:
+        raw = f"{method.upper()} {normalize_url(url)}\n{_normalize_body(data)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # ---- 读写 ----
+
+    def lookup(self, method: str, url: str, data=None) -> Optional[CacheEntry]:
+        """查找缓存（不判断是否过期）"""
+        key = self.make_key(method, url, data)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, body, compressed, encoding, etag, last_modified, expires_at '
+                'FROM http_cache WHERE key=?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        cached_url, status, headers, body, compressed, encoding, etag, last_modified, expires_at = row
+        try:
+            body = zlib.decompress(body) if compressed else bytes(body or b'')
+            headers = json.loads(headers or '{}')
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"缓存记录损坏，已删除: {url} - {e}")
+            self.invalidate(method, url, data)
+            return None
+        return CacheEntry(key, cached_url, status, headers, body, encoding, etag, last_modified, expires_at or 0)
+
+    def is_fresh(self, method: str, url: str, data=None) -> bool:
+        """是否有未过期的缓存（命中时不会发送网络请求）"""
+        key = self.make_key(method, url, data)
+        with self._lock:
+            row = self._conn.execute('SELECT expires_at FROM http_cache WHERE key=?', (key,)).fetchone()
+        return bool(row and (row[0] or 0) > time.time())
+
+    def store(self, method: str, url: str, response: requests.Response, data=None) -> bool:
+        """保存响应（仅200且允许缓存的响应）"""
+        ttl = self.ttl_for(url)
+        if ttl < 0 or response.status_code != 200:
+            return False
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control:
+            return False
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if ttl == 0 and not etag and not last_modified:
+            # 每次都要重新验证、又没有验证器的响应缓存了也用不上
+            return False
+
+        body = response.content or b''
+        compressed = len(body) >= _COMPRESS_MIN_BYTES
+        stored_body = zlib.compress(body, 6) if compressed else body
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        headers_json = json.dumps(headers, ensure_ascii=False)
+        size = len(stored_body) + len(headers_json) + len(url)
+        now = time.time()
+        key = self.make_key(method, url, data)
+
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM http_cache WHERE key=?', (key,)).fetchone()
+            self._conn.execute('''
+                INSERT OR REPLACE INTO http_cache
+                    (key, url, status, headers, body, compressed, encoding, etag, last_modified,
+                     stored_at, expires_at, last_access, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, url, response.status_code, headers_json, sqlite3.Binary(stored_body), int(compressed),
+                  response.encoding, etag, last_modified, now, now + ttl, now, size))
+            self._total_size += size - (old[0] if old else 0)
+            self.stats['stored'] += 1
+            if self._total_size > self.max_bytes:
+                self._evict_locked()
+            self._conn.commit()
+        return True
+
+    def refresh(self, entry: CacheEntry, response: requests.Response) -> None:
+        """服务器返回304：延长有效期并更新验证器"""
+        now = time.time()
+        etag = response.headers.get('ETag') or entry.etag
+        last_modified = response.headers.get('Last-Modified') or entry.last_modified
+        with self._lock:
+            self._conn.execute(
+                'UPDATE http_cache SET expires_at=?, last_access=?, etag=?, last_modified=? WHERE key=?',
+                (now + max(self.ttl_for(entry.url), 0), now, etag, last_modified, entry.key)
+            )
+            self._conn.commit()
+
+    def touch(self, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute('UPDATE http_cache SET last_access=? WHERE key=?', (time.time(), entry.key))
+            self._conn.commit()
+
+    def invalidate(self, method: str, url: str, data=None) -> None:
+        key = self.make_key(method, url, data)
+        with self._lock:
+            row = self._conn.execute('SELECT size FROM http_cache WHERE key=?', (key,)).fetchone()
+            if row:
+                self._conn.execute('DELETE FROM http_cache WHERE key=?', (key,))
+                self._total_size -= row[0]
+                self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        """按最近访问时间淘汰，直到容量降到上限的90%"""
+        target = int(self.max_bytes * 0.9)
+        while self._total_size > target:
+            rows = self._conn.execute(
+                'SELECT key, size FROM http_cache ORDER BY last_access LIMIT 200'
+            ).fetchall()
+            if not rows:
+                self._total_size = 0
+                break
+            evicted = []
+            for key, size in rows:
+                evicted.append((key,))
+                self._total_size -= size
+                if self._total_size <= target:
+                    break
+            self._conn.executemany('DELETE FROM http_cache WHERE key=?', evicted)
+            self.stats['evicted'] += len(evicted)
+
+    # ---- 请求封装 ----
+
+    def request(self, method: str, url: str, send: Callable[[Dict], Optional[requests.Response]],
+                headers: Optional[Dict] = None, params=None, data=None,
+                cacheable: Optional[Callable[[requests.Response], bool]] = None) -> Optional[requests.Response]:
+        """
+        通过缓存发送请求
+
+        Args:
+            method: 请求方法
+            url: 请求URL（不含 params）
+            send: 实际发送请求的函数，参数为请求头（已加入条件请求头），返回响应或None
+            headers: 原请求头
+            params: 查询参数（参与缓存键）
+            data: 请求体（参与缓存键）
+            cacheable: 响应是否可缓存的判断（如排除访问受限页面）
+
+        Returns:
+            响应对象；命中缓存或304时为还原的缓存响应（response.from_cache 为 True）
+        """
+        full_url = _full_url(url, params)
+        if self.ttl_for(full_url) < 0:
+            return send(headers)
+
+        entry = self.lookup(method, full_url, data)
+        if entry is not None and entry.fresh:
+            self.stats['hits'] += 1
+            self.touch(entry)
+            return entry.to_response()
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.validators())
+        response = send(request_headers)
+        if response is None:
+            return None
+
+        if response.status_code == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            self.refresh(entry, response)
+            return entry.to_response()
+
+        self.stats['misses'] += 1
+        if cacheable is None or cacheable(response):
+            try:
+                self.store(method, full_url, response, data)
+            except sqlite3.Error as e:
+                logger.warning(f"写入HTTP缓存失败: {full_url} - {e}")
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.commit()
+            self._total_size = 0
+        with self._lock:
+            self._conn.execute('VACUUM')
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM http_cache').fetchone()[0]
+            stats = dict(self.stats)
+        stats.update({'entries': count, 'size_mb': round(self._total_size / 1048576, 2)})
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache: Optional[HttpCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_cache_path() -> str:
+    """缓存文件路径（与数据库在同一目录）"""
+    from ..core import config
+    return os.path.join(os.path.dirname(config.app_config.get_database_path()), 'http_cache.db')
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    获取共享的HTTP缓存
+
+    Returns:
+        HttpCache: 配置 http_cache_settings.enabled 为False或缓存文件无法打开时返回None
+    """
+    global _shared_cache
+    settings = crawler_config.get_config('http_cache_settings') or {}
+    if not settings.get('enabled', True):
+        return None
+    if _shared_cache is not None:
+        return _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = HttpCache(
+                    get_cache_path(),
+                    max_size_mb=float(settings.get('max_size_mb', DEFAULT_MAX_SIZE_MB)),
+                    default_ttl=float(settings.get('default_ttl', DEFAULT_TTL)),
+                    ttl_rules=settings.get('ttl_rules'),
+                )
+                logger.info(f"HTTP缓存已启用: {_shared_cache.path}")
+            except (sqlite3.Error, OSError, re.error) as e:
+                logger.warning(f"HTTP缓存初始化失败，不使用缓存: {e}")
+                return None
+    return _shared_cache
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量爬取高水位
+每个来源（或来源下的分类）记录上次完整爬取到的最新发布日期，以及该日期下已入库条目的标识，
+保存在数据库 system_info 表中。增量模式下列表按发布日期从新到旧翻页，
+某一页的条目全部属于已入库范围时即停止，不再重复下载已知的页面和详情。
+
+高水位只在以下情况下更新，保证"高水位以前的数据已全部入库"：
+- 爬取正常结束（未被用户停止、未因错误中断）
+- 未使用关键词过滤（关键词过滤掉的条目并未入库）
+- 结束日期为空或不早于今天（覆盖到最新数据）
+- 本次爬取的数据已经入库：由入库方在 defer_watermark_commits() 作用域内爬取，
+  数据保存成功后再提交（否则爬到但未入库的数据会在下次增量爬取时被跳过）
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .config import crawler_config
+from ..core import database as db
+
+logger = logging.getLogger(__name__)
+
+_DATE_RE = re.compile(r'(\d{4})\s*[-./年]\s*(\d{1,2})\s*[-./月]\s*(\d{1,2})')
+
+
+def normalize_pub_date(value) -> Optional[str]:
+    """把各种格式的发布日期规范为 YYYY-MM-DD，无法识别时返回None"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    match = _DATE_RE.search(str(value or ''))
+    if not match:
+        return None
+    year, month, day = (int(part) for part in match.groups())
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def is_incremental_enabled() -> bool:
+    """配置中是否启用增量模式"""
+    return bool(crawler_config.get_config('incremental_settings.enabled'))
+
+
+_deferred = threading.local()
+
+
+class DeferredWatermarks:
+    """爬取结束时登记的高水位，由入库方在数据保存后提交"""
+
+    def __init__(self):
+        self.watermarks: List['HighWaterMark'] = []
+
+    def commit(self) -> int:
+        """保存登记的高水位，返回保存成功的个数"""
+        watermarks, self.watermarks = self.watermarks, []
+        return sum(1 for watermark in watermarks if watermark.save())
+
+    def discard(self) -> None:
+        """数据未能全部入库时放弃登记的高水位"""
+        if self.watermarks:
+            logger.info(f"数据未全部入库，放弃 {len(self.watermarks)} 个增量爬取高水位")
+        self.watermarks = []
+
+
+@contextmanager
+def defer_watermark_commits():
+    """
+    在当前线程中推迟保存高水位
+
+    作用域内 HighWaterMark.commit() 只登记，返回的 DeferredWatermarks 在数据入库成功后
+    调用 commit() 保存，入库失败时调用 discard()（或不调用）。
+    """
+    pending = DeferredWatermarks()
+    previous = getattr(_deferred, 'pending', None)
+    _deferred.pending = pending
+    try:
+        yield pending
+    finally:
+        _deferred.pending = previous
+
+
+class HighWaterMark:
+    """
+    单个来源/分类的增量爬取高水位
+
+    用法：列表页每个条目先调用 is_known() 判断是否已入库，新条目入库后调用 observe()；
+    整页都已入库时 page_known() 返回True，调用方停止翻页；爬取正常结束后调用 commit()。
+    """
+
+    def __init__(self, source: str, incremental: Optional[bool] = None, keywords=None,
+                 start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """
+        Args:
+            source: 来源标识，如 'national'、'guangdong:XP08:123'
+            incremental: 是否按高水位提前停止，None 时读取配置 incremental_settings.enabled
+            keywords: 本次爬取的关键词
+            start_date: 本次爬取的起始日期
+            end_date: 本次爬取的结束日期
+        """
+        self.source = source
+        self.start_date = normalize_pub_date(start_date)
+        self.saved = db.get_crawl_watermark(source) or {}
+        if incremental is None:
+            incremental = is_incremental_enabled()
+
+        # 保存的高水位覆盖本次的起始日期时才能提前停止（否则更早的数据尚未入库）
+        covered_from = self.saved.get('covered_from')
+        self.active = bool(
+            incremental and self.saved.get('pub_date')
+            and (not covered_from or (self.start_date and self.start_date >= covered_from))
+        )
+        self._saved_keys = set(self.saved.get('boundary') or [])
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        keywords = [kw for kw in (keywords or []) if kw and kw.strip()]
+        normalized_end = normalize_pub_date(end_date)
+        self.recordable = not keywords and (not normalized_end or normalized_end >= today)
+
+        self._newest_date = None
+        self._newest_keys = set()
+        self.reached = False  # 是否因到达高水位而停止
+
+        if self.active:
+            logger.info(f"增量模式 [{source}]: 翻页到 {self.saved['pub_date']} 已入库的数据即停止")
+
+    @property
+    def since(self) -> Optional[str]:
+        """增量模式下的起始日期（上次高水位的发布日期），未启用时为None"""
+        return self.saved['pub_date'] if self.active else None
+
+    @staticmethod
+    def policy_key(url: Optional[str] = None, title: Optional[str] = None,
+                   pub_date: Optional[str] = None) -> str:
+        """条目标识：优先使用链接，没有链接时使用标题+日期"""
+        raw = (url or '').strip() or f"{(title or '').strip()}|{pub_date or ''}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def key_of(cls, policy: Dict) -> str:
+        url = policy.get('url') or policy.get('source') or policy.get('link')
+        return cls.policy_key(url, policy.get('title'), policy.get('pub_date'))
+
+    def is_known(self, pub_date, key: str) -> bool:
+        """条目是否在上次高水位以内（已入库）"""
+        if not self.active:
+            return False
+        date = normalize_pub_date(pub_date)
+        if not date:
+            return False
+        saved_date = self.saved['pub_date']
+        return date < saved_date or (date == saved_date and key in self._saved_keys)
+
+    def is_known_policy(self, policy: Dict) -> bool:
+        return self.is_known(policy.get('pub_date'), self.key_of(policy))
+
+    def page_known(self, policies: Iterable[Dict]) -> bool:
+        """整页条目是否都已入库（无日期的条目视为未知）；返回True时调用方应停止翻页"""
+        policies = list(policies)
+        if not self.active or not policies:
+            return False
+        if all(self.is_known_policy(policy) for policy in policies):
+            self.reached = True
+            return True
+        return False
+
+    def observe(self, pub_date, key: str) -> None:
+        """记录一条新入库的条目（用于计算新的高水位）"""
+        date = normalize_pub_date(pub_date)
+        if not date:
+            return
+        if self._newest_date is None or date > self._newest_date:
+            self._newest_date = date
+            self._newest_keys = {key}
+        elif date == self._newest_date:
+            self._newest_keys.add(key)
+
+    def observe_policy(self, policy: Dict) -> None:
+        self.observe(policy.get('pub_date'), self.key_of(policy))
+
+    def commit(self) -> bool:
+        """爬取正常结束后保存新的高水位（在 defer_watermark_commits() 作用域内时只登记）"""
+        if not self.recordable:
+            return False
+        pending = getattr(_deferred, 'pending', None)
+        if pending is not None:
+            pending.watermarks.append(self)
+            return True
+        return self.save()
+
+    def save(self) -> bool:
+        """保存新的高水位"""
+        if not self.recordable:
+            return False
+
+        saved_date = self.saved.get('pub_date')
+        newest_date, newest_keys = self._newest_date, set(self._newest_keys)
+        if saved_date and (newest_date is None or saved_date > newest_date):
+            newest_date, newest_keys = saved_date, set(self._saved_keys)
+        elif saved_date and saved_date == newest_date:
+            newest_keys |= self._saved_keys
+        if newest_date is None:
+            return False
+
+        # 本次覆盖 [起始日期, 最新]；与上次覆盖范围相连时合并
+        covered_from = self.start_date
+        saved_from = self.saved.get('covered_from', '')
+        if self.active or (saved_date and (not self.start_date or self.start_date <= saved_date)):
+            if not saved_from or not covered_from:
+                covered_from = None
+            else:
+                covered_from = min(saved_from, covered_from)
+
+        watermark = {
+            'pub_date': newest_date,
+            'boundary': sorted(newest_keys),
+            'covered_from': covered_from,
+        }
+        if db.save_crawl_watermark(self.source, watermark):
+            logger.info(f"增量爬取高水位已更新 [{self.source}]: {newest_date}（{len(newest_keys)} 条）")
+            return True
+        return False
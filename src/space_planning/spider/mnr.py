@@ -8,6 +8,8 @@ import logging
 # 导入监控和防反爬虫模块
 from .monitor import CrawlerMonitor
 from .anti_crawler import AntiCrawlerManager
+from .incremental import HighWaterMark
+from .page_size import get_negotiator
 from .spider_config import SpiderConfig
 
 # 模块级别的常量，用于动态加载
@@ -83,7 +85,7 @@ class MNRSpider:
 
     def crawl_policies(self, keywords=None, callback=None, start_date=None, end_date=None, 
                       speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, 
-                      category=None, policy_callback=None):
+                      category=None, policy_callback=None, incremental=None):
         """
         爬取自然资源部法律法规库
         :param keywords: 关键词列表
@@ -92,6 +94,7 @@ class MNRSpider:
         :param end_date: 结束日期 yyyy-MM-dd
         :param category: 分类名称，None表示搜索全部分类
         :param policy_callback: 政策数据回调函数，每解析到一条政策时调用
+        :param incremental: 增量模式，只获取上次高水位以后的政策；None 时读取配置
         :return: list[dict]
         """
         if keywords is None:
@@ -144,6 +147,23 @@ class MNRSpider:
         new_policies_count = 0  # 新增政策计数
         consecutive_filtered_pages = 0  # 连续过滤页计数（有数据但都被过滤）
         
+        # 增量爬取高水位：搜索结果按相关度排序，无法按页判断是否到达已入库范围，
+        # 因此增量模式下让服务端只返回高水位当天及以后的数据，再跳过当天已入库的条目
+        watermark = HighWaterMark('mnr', incremental, keywords, start_date, end_date)
+        query_start = max(filter(None, [start_date, watermark.since]), default=None)
+        if watermark.since and callback:
+            callback(f"增量模式：只获取 {query_start} 以后的政策")
+        failed = False
+
+        # 与搜索接口协商每页条数（按接口缓存，首次爬取时试探）
+        query_params = {'channelid': self.channel_id, 'searchword': search_word,
+                        'searchtype': 'title', 'orderby': 'RELEVANCE'}
+        if query_start:
+            query_params['starttime'] = query_start
+        if end_date:
+            query_params['endtime'] = end_date
+        per_page = self._negotiate_page_size(query_params)
+        
         while page <= self.max_pages:
             if stop_callback and stop_callback():
                 break
@@ -163,7 +183,7 @@ class MNRSpider:
                     'channelid': self.channel_id,
                     'searchword': search_query,
                     'page': page,
-                    'perpage': 20,  # 每页20条
+                    'perpage': per_page,  # 每页条数（默认20条）
                     'searchtype': 'title',  # 搜索标题
                     'orderby': 'RELEVANCE'  # 按相关性排序
                 }
@@ -173,8 +193,8 @@ class MNRSpider:
                     callback(f"搜索参数: {search_query or '(搜索全部)'}")
                 
                 # 添加时间过滤
-                if start_date:
-                    params['starttime'] = start_date
+                if query_start:
+                    params['starttime'] = query_start
                 if end_date:
                     params['endtime'] = end_date
                 
@@ -197,11 +217,13 @@ class MNRSpider:
                         self.monitor.record_request(self.search_api, success=False, error_type=f"HTTP {resp.status_code}")
                         if callback:
                             callback(f"第{page}页搜索失败: {resp.status_code}")
+                        failed = True
                         break
                 except Exception as e:
                     self.monitor.record_request(self.search_api, success=False, error_type=str(e))
                     if callback:
                         callback(f"第{page}页搜索异常: {str(e)}")
+                    failed = True
                     break
                 
                 # 解析搜索结果
@@ -262,6 +284,10 @@ class MNRSpider:
                     if keywords and not any(kw in title for kw in keywords):
                         continue
                     
+                    # 增量模式：跳过已入库的条目
+                    if watermark.is_known_policy(policy):
+                        continue
+                    
                     # 保存原始分类信息（如果存在），用于检测分类不匹配
                     original_category = policy.get('category', '')
                     
@@ -282,6 +308,7 @@ class MNRSpider:
                     seen_links.add(link)
                     
                     filtered_policies.append(policy)
+                    watermark.observe_policy(policy)
                     new_policies_count += 1
                     self.anti_crawler.register_policy_success()
                     
@@ -333,8 +360,12 @@ class MNRSpider:
             except Exception as e:
                 if callback:
                     callback(f"第{page}页抓取失败: {e}")
+                failed = True
                 break
         
+        if not failed and not (stop_callback and stop_callback()):
+            watermark.commit()
+        
         # 将结果添加到总结果中
         results.extend(category_results)
         
@@ -346,6 +377,44 @@ class MNRSpider:
             
         return results
 
+    def _fetch_result_keys(self, params):
+        """请求一页搜索结果，返回各条目的链接/标题（不计入统计）；请求失败时返回None"""
+        try:
+            self._update_proxy()
+            resp = self.anti_crawler.make_request(self.search_api, method='GET', params=params,
+                                                  headers=self.headers.copy(), timeout=15)
+        except Exception as e:
+            logger.warning(f"搜索结果请求失败（每页 {params.get('perpage')} 条）: {e}")
+            return None
+        if resp.status_code != 200:
+            return None
+        try:
+            data = resp.json()
+        except json.JSONDecodeError:
+            table = BeautifulSoup(resp.text, 'html.parser').find('table', class_='table')
+            if not table:
+                return None
+            return [row.get_text(' ', strip=True) for row in table.find_all('tr')[1:]]
+        if isinstance(data, dict):
+            items = data.get('results', data.get('data', []))
+        else:
+            items = data if isinstance(data, list) else []
+        return [item.get('url') or item.get('title', '') for item in items if isinstance(item, dict)]
+
+    def _negotiate_page_size(self, query_params, default_page_size=20):
+        """协商搜索接口的每页条数：返回整页时再请求第2页，确认翻页正常且不是第1页的重复"""
+        def probe(page_size):
+            first_page = self._fetch_result_keys({**query_params, 'page': 1, 'perpage': page_size})
+            if first_page is None:
+                return None
+            if len(first_page) >= page_size:
+                second_page = self._fetch_result_keys({**query_params, 'page': 2, 'perpage': page_size})
+                if second_page is None or second_page == first_page:
+                    return None
+            return len(first_page)
+
+        return get_negotiator(self.search_api, default_page_size).negotiate(probe)
+
     def _parse_json_results(self, data, callback):
         """解析JSON格式的搜索结果"""
         policies = []
@@ -14,8 +14,10 @@ from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
 
-from .multithread_base_crawler import MultiThreadBaseCrawler
+from .multithread_base_crawler import MultiThreadBaseCrawler, PageRange, last_page_from_response
+from .incremental import HighWaterMark
 from .monitor import CrawlerMonitor
+from .page_size import cached_page_size
 from .anti_crawler import AntiCrawlerManager
 from .spider_config import SpiderConfig
 
@@ -93,6 +95,11 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
         else:
             self.proxy_manager = None
         
+        # 增量爬取高水位（每次爬取开始时创建，各任务共用）
+        self.watermark: Optional[HighWaterMark] = None
+        self.watermark_lock = threading.Lock()
+        self._interrupted_tasks = 0
+        
         logger.info(f"初始化自然资源部多线程爬虫，线程数: {max_workers}, 代理启用: {enable_proxy}")
     
     def _prepare_tasks(self) -> List[Dict]:
@@ -105,7 +112,9 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                 'task_id': f"mnr_{task_id:04d}",
                 'category_name': category_name,
                 'category_code': category_config['code'],
-                'description': f"分类: {category_name}"
+                'description': f"分类: {category_name}",
+                'page_end': getattr(self, 'max_pages', 100),  # 页码区间，空闲线程可接手剩余页码
+                'page_end_estimated': True  # 首页确定实际末页之前不允许窃取
             }
             
             tasks.append(task_data)
@@ -127,13 +136,19 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
             callback(f"线程 {thread_name} 开始爬取 {description}")
         
         policies = []
-        page = 1
         
         # 从通用配置获取参数
         common_config = SpiderConfig.get_common_config()
         max_pages = getattr(self, 'max_pages', 100)  # 限制每个分类的最大页数
+        # 页码区间（由调度器创建，剩余页码可能被空闲线程接手）
+        page_range = task_data.get('page_range') or PageRange(1, max_pages, bounded=False)
         max_consecutive_empty = common_config['max_empty_pages']
         consecutive_empty_pages = 0
+        # 增量模式：搜索结果按相关度排序，无法按页判断是否到达已入库范围，
+        # 因此让服务端只返回高水位当天及以后的数据，再跳过当天已入库的条目
+        watermark = self.watermark or HighWaterMark('mnr', False)
+        interrupted = False  # 是否因请求或解析错误提前结束
+        disable_speed_limit = getattr(self, 'disable_speed_limit', False)
         
         # 从任务数据或实例属性获取关键词
         keywords = getattr(self, 'keywords', None) or task_data.get('keywords', None)
@@ -169,7 +184,8 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
         else:
             logger.info(f"线程 {thread_name} 代理已禁用")
         
-        while page <= max_pages:
+        page = page_range.claim()
+        while page is not None:
             try:
                 # 检查是否需要停止
                 if hasattr(self, 'check_stop') and self.check_stop():
@@ -185,14 +201,17 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                 # 注意：根据实际情况，可能服务器不支持themecat语法，暂时不使用分类搜索
                 search_query = search_word
                 
+                per_page = cached_page_size(self.search_api, 20)  # 单线程爬取时协商得到的每页条数
                 params = {
                     'channelid': self.channel_id,
                     'searchword': search_query,
                     'page': page,
-                    'perpage': 20,  # 每页20条
+                    'perpage': per_page,
                     'searchtype': 'title',  # 搜索标题
                     'orderby': 'RELEVANCE'  # 按相关性排序
                 }
+                if watermark.since:
+                    params['starttime'] = watermark.since
                 
                 # 调试信息：显示搜索参数
                 if callback:
@@ -212,6 +231,7 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                 except Exception as e:
                     self.monitor.record_request(self.search_api, False)
                     logger.error(f"线程 {thread_name} 分类[{category_name}]请求失败: {e}")
+                    interrupted = True
                     break
                 
                 # 记录请求
@@ -228,9 +248,11 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                                 continue
                     
                     # 如果重试后仍然失败，跳过此页
+                    interrupted = True
                     break
                 
                 # 解析响应数据（与原始爬虫一致）
+                search_data = None
                 try:
                     search_data = response.json()
                     page_policies = self._parse_json_results(search_data, callback)
@@ -246,6 +268,7 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                             if self._rotate_thread_proxy():
                                 logger.info(f"线程 {thread_name} 解析错误后轮换代理重试")
                                 continue
+                    interrupted = True
                     break
                 
                 if not page_policies:
@@ -257,11 +280,18 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                         if callback:
                             callback(f"线程 {thread_name} 分类[{category_name}]连续{max_consecutive_empty}页无数据，停止爬取")
                         break
-                    page += 1
+                    page = page_range.claim()
                     continue
                 else:
                     consecutive_empty_pages = 0  # 重置连续空页计数
-                
+
+                if not page_range.bounded:
+                    # 不满一页或结果给出总数时确定实际末页，之后剩余页码才可被空闲线程接手
+                    page_range.bound(last_page_from_response(
+                        page, len(page_policies), per_page, search_data,
+                        response.text if search_data is None else ''
+                    ))
+
                 # 处理政策数据
                 for policy in page_policies:
                     try:
@@ -275,6 +305,10 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                         # 添加分类信息
                         policy['category'] = category_name
                         
+                        # 增量模式：跳过已入库的条目
+                        if watermark.is_known_policy(policy):
+                            continue
+                        
                         # 在发送实时回调之前进行去重检查
                         item_hash = self._generate_item_hash(policy)
                         if self._is_duplicate_item(item_hash):
@@ -284,6 +318,8 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                             continue
                         
                         policies.append(policy)
+                        with self.watermark_lock:
+                            watermark.observe_policy(policy)
                         self.anti_crawler.register_policy_success()
                         
                         # 发送实时数据回调（与单线程爬虫一致）
@@ -302,12 +338,21 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                 if callback:
                     callback(f"线程 {thread_name} 分类[{category_name}]第{page}页获取{len(page_policies)}条政策")
                 
-                page += 1
+                page = page_range.claim()
                 
             except Exception as e:
                 logger.error(f"线程 {thread_name} 分类[{category_name}]处理第{page}页时出错: {e}")
+                interrupted = True
                 break
         
+        if interrupted:
+            with self.watermark_lock:
+                self._interrupted_tasks += 1
+        
+        if page is not None:
+            # 提前结束（连续空页或出错）：同一分类的其他区间也不再继续往后翻页
+            page_range.stop_after(page)
+        
         logger.info(f"线程 {thread_name} 分类[{category_name}]完成，共获取 {len(policies)} 条政策")
         if callback:
             callback(f"线程 {thread_name} 分类[{category_name}]完成，共获取 {len(policies)} 条政策")
@@ -528,12 +573,12 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
             self._prepare_tasks = lambda: filtered_tasks
             
             try:
-                return self.crawl_multithread(callback, stop_callback)
+                return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
             finally:
                 # 恢复原始方法
                 self._prepare_tasks = original_prepare_tasks
         else:
-            return self.crawl_multithread(callback, stop_callback)
+            return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
     
     def crawl_policies_multithread(self, keywords=None, callback=None, start_date=None, end_date=None, 
                                   speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, max_workers=None,
@@ -560,11 +605,11 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                     original_max_workers = self.max_workers
                     self.max_workers = max_workers
                     try:
-                        return self.crawl_multithread(callback, stop_callback)
+                        return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
                     finally:
                         self.max_workers = original_max_workers
                 else:
-                    return self.crawl_multithread(callback, stop_callback)
+                    return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
             finally:
                 # 恢复原始方法
                 self._prepare_tasks = original_prepare_tasks
@@ -574,11 +619,24 @@ class MNRMultiThreadSpider(MultiThreadBaseCrawler):
                 original_max_workers = self.max_workers
                 self.max_workers = max_workers
                 try:
-                    return self.crawl_multithread(callback, stop_callback)
+                    return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
                 finally:
                     self.max_workers = original_max_workers
             else:
-                return self.crawl_multithread(callback, stop_callback)
+                return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
+    
+    def _crawl_incremental(self, keywords, start_date, end_date, callback, stop_callback) -> List[Dict]:
+        """多线程爬取，所有任务正常结束（未停止、未出错）后更新增量爬取高水位"""
+        self.watermark = HighWaterMark('mnr', None, keywords, start_date, end_date)
+        if self.watermark.since and callback:
+            callback(f"增量模式：只获取 {self.watermark.since} 以后的政策")
+        self._interrupted_tasks = 0
+        policies = self.crawl_multithread(callback, stop_callback)
+        with self.stats_lock:
+            failed_tasks = self.stats['failed_tasks']
+        if not failed_tasks and not self._interrupted_tasks and not self.check_stop():
+            self.watermark.commit()
+        return policies
     
     def get_crawler_status(self) -> Dict:
         """获取爬虫状态"""
@@ -6,19 +6,132 @@
 
 import threading
 import queue
+import heapq
+import itertools
 import time
 import random
+import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Tuple
 from datetime import datetime
 import logging
 import os
 
-from .proxy_pool import ProxyManager, initialize_proxy_pool, get_shared_proxy, report_shared_proxy_result, is_global_proxy_enabled
+from .proxy_pool import ProxyManager, initialize_proxy_pool, get_shared_proxy, report_shared_proxy_result, is_global_proxy_enabled, release_shared_proxy
+from .proxy_sessions import ProxySessionRegistry
 
 logger = logging.getLogger(__name__)
 
 
+# 区间剩余页数不少于该值的两倍时才允许被窃取后半段
+MIN_STEAL_PAGES = 2
+
+
+class PageRange:
+    """
+    任务的页码区间（线程安全）
+
+    执行任务的线程逐页 claim()；空闲线程可以 steal() 剩余页码的后半段作为新的子任务。
+    同一任务拆出的区间共享一个末页上限，任一区间 stop_after() 后其余区间不再领取更靠后的页。
+    末页只是估计值时（bounded=False），区间在执行线程根据已取得的页面 bound() 出实际末页之前不可窃取，
+    否则空闲线程会从估计区间的中点开始请求空页。
+    """
+
+    def __init__(self, start: int, end: int, _family: Optional[Dict] = None, bounded: bool = True):
+        self.start = start
+        self.end = end
+        self.next_page = start
+        self.claimed = 0
+        self._lock = threading.Lock()
+        self._family = _family if _family is not None else {
+            'limit': None, 'bounded': bounded, 'lock': threading.Lock()
+        }
+
+    def _limit(self) -> int:
+        limit = self._family['limit']
+        return self.end if limit is None else min(self.end, limit)
+
+    @property
+    def bounded(self) -> bool:
+        """实际末页是否已确定（确定后才允许窃取）"""
+        return self._family['bounded']
+
+    def claim(self) -> Optional[int]:
+        """领取下一页，区间已用完时返回None"""
+        with self._lock:
+            if self.next_page > self._limit():
+                return None
+            page = self.next_page
+            self.next_page += 1
+            self.claimed += 1
+            return page
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            return max(0, self._limit() - self.next_page + 1)
+
+    def steal(self, min_pages: int = MIN_STEAL_PAGES) -> Optional['PageRange']:
+        """拆出剩余页码的后半段，末页未确定或剩余页数不足时返回None"""
+        with self._lock:
+            if not self._family['bounded']:
+                return None
+            remaining = self._limit() - self.next_page + 1
+            if remaining < min_pages * 2:
+                return None
+            middle = self.next_page + (remaining + 1) // 2
+            stolen = PageRange(middle, self.end, self._family)
+            self.end = middle - 1
+            return stolen
+
+    def stop_after(self, page: int) -> None:
+        """已到达数据末尾或无需继续：同一任务的所有区间不再领取 page 之后的页"""
+        with self._family['lock']:
+            limit = self._family['limit']
+            self._family['limit'] = page if limit is None else min(limit, page)
+
+    def bound(self, last_page: Optional[int]) -> None:
+        """确定实际末页，之后区间才允许被窃取；last_page 为None（仍无法确定）时不做任何改变"""
+        if last_page is None:
+            return
+        self.stop_after(last_page)
+        with self._family['lock']:
+            self._family['bounded'] = True
+
+
+_PAGE_COUNT_KEYS = ('totalPage', 'totalPages', 'pageCount')
+_ITEM_COUNT_KEYS = ('total', 'totalCount', 'recordCount')
+_PAGE_COUNT_TEXT_RE = re.compile(r'共\s*(\d+)\s*页')
+_ITEM_COUNT_TEXT_RE = re.compile(r'共\s*(\d+)\s*条')
+
+
+def last_page_from_response(page_no: int, rows: int, page_size: int, data=None, text: str = '') -> Optional[int]:
+    """
+    根据已取得的一页推算实际末页，用于 PageRange.bound()
+
+    当前页不满一页时即为末页；否则读取响应中的总页数/总条数（JSON 字段或"共N页"、"共N条"），
+    都没有时返回None（末页仍未知）。
+    """
+    if rows < page_size:
+        return page_no
+    for source in (data, data.get('data') if isinstance(data, dict) else None):
+        if not isinstance(source, dict):
+            continue
+        for key in _PAGE_COUNT_KEYS:
+            if str(source.get(key, '')).isdigit():
+                return max(page_no, int(source[key]))
+        for key in _ITEM_COUNT_KEYS:
+            if str(source.get(key, '')).isdigit():
+                return max(page_no, -(-int(source[key]) // page_size))
+    match = _PAGE_COUNT_TEXT_RE.search(text or '')
+    if match:
+        return max(page_no, int(match.group(1)))
+    match = _ITEM_COUNT_TEXT_RE.search(text or '')
+    if match:
+        return max(page_no, -(-int(match.group(1)) // page_size))
+    return None
+
+
 class MultiThreadBaseCrawler:
     """多线程基础爬虫类"""
     
@@ -28,7 +141,8 @@ class MultiThreadBaseCrawler:
         
         # 线程管理（改进：使用RLock和更好的资源管理）
         self.thread_resources_lock = threading.RLock()  # 可重入锁，保护线程资源字典
-        self.thread_sessions = {}  # 线程专用会话
+        self.thread_sessions = {}  # 线程当前使用的会话（指向 proxy_sessions 中的会话）
+        self.proxy_sessions = ProxySessionRegistry()  # 每个代理一个会话（连接池和Cookie），各线程共用
         self.thread_locks = {}     # 线程锁
         self.thread_proxies = {}   # 线程专用代理
         
@@ -37,6 +151,14 @@ class MultiThreadBaseCrawler:
         self.result_queue = queue.Queue()
         self.error_queue = queue.Queue()
         
+        # 调度（共享优先级队列 + 页码区间窃取）
+        self._task_cond = threading.Condition()
+        self._task_heap: List[Tuple[float, int, Dict]] = []
+        self._task_seq = itertools.count()
+        self._running_tasks = 0
+        self._running_ranges: Dict[str, Tuple[Dict, PageRange]] = {}
+        self.task_timings: List[Dict] = []
+        
         # 统计管理（改进：使用RLock）
         self.stats_lock = threading.RLock()
         self.stats = {
@@ -102,18 +224,15 @@ class MultiThreadBaseCrawler:
         return self.thread_sessions[thread_id], self.thread_locks[thread_id]
     
     def _create_thread_session(self, thread_id):
-        """创建线程专用会话（内部方法）"""
-        import requests
-        session = requests.Session()
-        
-        # 设置共享代理
+        """为线程绑定会话（内部方法）：租用共享代理，使用该代理的会话"""
+        shared_proxy = None
         if self.enable_proxy:
             shared_proxy = get_shared_proxy()
             if shared_proxy:
-                session.proxies.update(shared_proxy)
                 logger.info(f"线程 {threading.current_thread().name} 使用共享代理")
             else:
                 logger.warning(f"线程 {threading.current_thread().name} 无法获取共享代理")
+        session, _ = self.proxy_sessions.get(shared_proxy)
         
         # 创建线程锁
         lock = threading.Lock()
@@ -148,13 +267,14 @@ class MultiThreadBaseCrawler:
             # 报告当前代理失败
             report_shared_proxy_result(False)
             
-            # 获取新的共享代理
-            new_proxy = get_shared_proxy()
+            # 获取新的共享代理（换用与当前不同的代理），切换到该代理的会话（原会话的连接和Cookie保留）
+            new_proxy = get_shared_proxy(rotate=True)
             if new_proxy:
                 thread_id = threading.current_thread().ident
+                session, _ = self.proxy_sessions.get(new_proxy)
                 with self.thread_resources_lock:
                     if thread_id in self.thread_sessions:
-                        self.thread_sessions[thread_id].proxies.update(new_proxy)
+                        self.thread_sessions[thread_id] = session
                         logger.info(f"线程 {threading.current_thread().name} 已轮换共享代理")
                         return True
             else:
@@ -238,6 +358,7 @@ class MultiThreadBaseCrawler:
             
             # 记录错误
             self.error_queue.put((task_id, str(e)))
+            task_data['_failed'] = True
             
             if callback:
                 callback(f"线程 {thread_name} 处理失败: {e}")
@@ -252,6 +373,173 @@ class MultiThreadBaseCrawler:
         """准备任务列表（由子类重写）"""
         raise NotImplementedError("子类必须实现 _prepare_tasks 方法")
     
+    def _split_task(self, task_data: Dict) -> Optional[List[Dict]]:
+        """
+        在工作线程领取任务时拆分任务（子类可重写）
+        
+        Returns:
+            子任务列表（放回队列，由各线程领取）；返回None或空列表时直接执行原任务
+        """
+        return None
+    
+    def _task_priority(self, task_data: Dict) -> float:
+        """任务优先级，数值大的先执行（默认使用任务的预计条数 estimated_size）"""
+        return float(task_data.get('estimated_size') or 0)
+    
+    def _task_page_bounds(self, task_data: Dict) -> Optional[Tuple[int, int]]:
+        """
+        任务的页码区间（默认读取 page_start / page_end）
+        
+        有页码区间的任务执行时会得到 task_data['page_range']（PageRange），
+        子类应逐页调用 claim()，以便空闲线程窃取剩余页码。
+        page_end 只是估计值时任务应带 page_end_estimated=True，并在取得页面后调用
+        page_range.bound() 确定实际末页，在此之前区间不可窃取
+        """
+        if 'page_end' not in task_data:
+            return None
+        return int(task_data.get('page_start') or 1), int(task_data['page_end'])
+    
+    # ------------------------------------------------------------------ #
+    # 任务调度
+    # ------------------------------------------------------------------ #
+    def _push_task(self, task_data: Dict) -> None:
+        task_data.setdefault('_queued_at', time.time())
+        with self._task_cond:
+            heapq.heappush(self._task_heap, (-self._task_priority(task_data), next(self._task_seq), task_data))
+            self._task_cond.notify()
+    
+    def submit_subtask(self, task_data: Dict) -> None:
+        """在任务执行过程中追加子任务（线程安全）"""
+        self._update_stats(total_tasks=1)
+        self._push_task(task_data)
+    
+    def _steal_task_locked(self) -> Optional[Dict]:
+        """从剩余页数最多的运行中任务窃取后半段页码（需持有 _task_cond）"""
+        candidates = sorted(self._running_ranges.values(), key=lambda item: item[1].remaining, reverse=True)
+        for task_data, page_range in candidates:
+            stolen = page_range.steal()
+            if stolen is None:
+                continue
+            parent_id = task_data.get('parent_task') or task_data.get('task_id', 'unknown')
+            subtask = {key: value for key, value in task_data.items() if not key.startswith('_')}
+            subtask.update({
+                'task_id': f"{parent_id}@p{stolen.start}",
+                'parent_task': parent_id,
+                'page_range': stolen,
+                '_queued_at': time.time(),
+            })
+            self._update_stats(total_tasks=1)
+            logger.debug(f"任务 {task_data.get('task_id')} 的第{stolen.start}-{stolen.end}页由空闲线程接手")
+            return subtask
+        return None
+    
+    def _next_task(self) -> Optional[Dict]:
+        """领取下一个任务：优先级队列为空时窃取运行中任务的页码；全部完成或停止时返回None"""
+        with self._task_cond:
+            while True:
+                if self.check_stop():
+                    self._task_cond.notify_all()
+                    return None
+                if self._task_heap:
+                    task_data = heapq.heappop(self._task_heap)[2]
+                else:
+                    task_data = self._steal_task_locked()
+                if task_data is not None:
+                    self._running_tasks += 1
+                    return task_data
+                if self._running_tasks == 0:
+                    self._task_cond.notify_all()
+                    return None
+                # 运行中的任务可能追加子任务或变得可窃取
+                self._task_cond.wait(timeout=0.5)
+    
+    def _run_task(self, task_data: Dict, callback: Optional[Callable] = None) -> List[Dict]:
+        """执行一个任务（先尝试拆分），并记录耗时"""
+        task_id = task_data.get('task_id', 'unknown')
+        started = time.time()
+        queued_wait = started - task_data.pop('_queued_at', started)
+        
+        subtasks = self._split_task(task_data)
+        if subtasks:
+            for subtask in subtasks:
+                subtask.setdefault('parent_task', task_id)
+                self._push_task(subtask)
+            self._update_stats(total_tasks=len(subtasks) - 1)
+            self._record_task_timing(task_id, task_data, 'split', queued_wait, time.time() - started, 0)
+            logger.info(f"任务 {task_id} 已拆分为 {len(subtasks)} 个子任务")
+            return []
+        
+        page_range = task_data.get('page_range')
+        if page_range is None:
+            bounds = self._task_page_bounds(task_data)
+            if bounds:
+                page_range = task_data['page_range'] = PageRange(
+                    *bounds, bounded=not task_data.get('page_end_estimated')
+                )
+        if page_range is not None:
+            with self._task_cond:
+                self._running_ranges[task_id] = (task_data, page_range)
+                self._task_cond.notify_all()
+        
+        try:
+            results = self._process_single_task(task_data, callback)
+        finally:
+            if page_range is not None:
+                with self._task_cond:
+                    self._running_ranges.pop(task_id, None)
+        status = 'failed' if task_data.pop('_failed', False) else 'done'
+        self._record_task_timing(task_id, task_data, status, queued_wait, time.time() - started, len(results),
+                                 page_range.claimed if page_range is not None else None)
+        return results
+    
+    def _record_task_timing(self, task_id: str, task_data: Dict, status: str, queued_wait: float,
+                            elapsed: float, results: int, pages: Optional[int] = None) -> None:
+        with self.stats_lock:
+            self.task_timings.append({
+                'task_id': task_id,
+                'parent_task': task_data.get('parent_task'),
+                'thread': threading.current_thread().name,
+                'status': status,
+                'queued_wait': round(queued_wait, 3),
+                'elapsed': round(elapsed, 3),
+                'results': results,
+                'pages': pages,
+            })
+    
+    def _worker_loop(self, callback: Optional[Callable], all_results: List[Dict], results_lock) -> None:
+        """工作线程：循环领取任务直到队列为空且没有可窃取的页码"""
+        try:
+            while True:
+                task_data = self._next_task()
+                if task_data is None:
+                    return
+                task_id = task_data.get('task_id', 'unknown')
+                try:
+                    task_results = self._run_task(task_data, callback)
+                    with results_lock:
+                        all_results.extend(task_results)
+                
+                    # 实时显示进度
+                    with self.stats_lock:
+                        completed = self.stats['completed_tasks']
+                        failed = self.stats['failed_tasks']
+                        total = self.stats['total_tasks']
+                        active = self.stats['active_threads']
+                
+                    if callback:
+                        callback(f"任务 {task_id} 完成，当前进度: {completed}/{total} 完成, {failed} 失败, {active} 活跃线程")
+                except Exception as e:
+                    logger.error(f"任务 {task_id} 执行异常: {e}")
+                    if callback:
+                        callback(f"任务 {task_id} 执行失败: {e}")
+                finally:
+                    with self._task_cond:
+                        self._running_tasks -= 1
+                        self._task_cond.notify_all()
+        finally:
+            # 线程结束时归还共享代理租约
+            release_shared_proxy()
+    
     def crawl_multithread(self, callback: Optional[Callable] = None, 
                          stop_callback: Optional[Callable] = None,
                          max_workers: Optional[int] = None,
@@ -306,50 +594,33 @@ class MultiThreadBaseCrawler:
         all_results = []
         start_time = time.time()
         
-        # 使用线程池执行任务
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {}
-            for task_data in tasks:
-                if self.check_stop():
-                    logger.info("用户已停止爬取")
-                    break
-                
-                future = executor.submit(
-                    self._process_single_task,
-                    task_data,
-                    callback
-                )
-                future_to_task[future] = task_data.get('task_id', 'unknown')
-            
-            # 收集结果
-            for future in as_completed(future_to_task):
-                task_id = future_to_task[future]
+        # 重置调度状态
+        with self._task_cond:
+            self._task_heap = []
+            self._running_tasks = 0
+            self._running_ranges = {}
+        with self.stats_lock:
+            self.task_timings = []
+        for task_data in tasks:
+            self._push_task(task_data)
+        
+        # 每个工作线程从共享优先级队列领取任务，队列空时窃取其他任务剩余的页码
+        results_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crawl-worker') as executor:
+            workers = [
+                executor.submit(self._worker_loop, callback, all_results, results_lock)
+                for _ in range(max_workers)
+            ]
+            for future in as_completed(workers):
                 try:
-                    task_results = future.result()
-                    all_results.extend(task_results)
-                    
-                    # 实时显示进度
-                    with self.stats_lock:
-                        completed = self.stats['completed_tasks']
-                        failed = self.stats['failed_tasks']
-                        total = self.stats['total_tasks']
-                        active = self.stats['active_threads']
-                    
-                    if callback:
-                        callback(f"任务 {task_id} 完成，当前进度: {completed}/{total} 完成, {failed} 失败, {active} 活跃线程")
-                    
-                    # 检查是否需要停止
-                    if self.check_stop():
-                        logger.info("用户已停止爬取，等待剩余任务完成")
-                        if callback:
-                            callback("用户已停止爬取，等待剩余任务完成")
-                        break
-                    
+                    future.result()
                 except Exception as e:
-                    logger.error(f"任务 {task_id} 执行异常: {e}")
-                    if callback:
-                        callback(f"任务 {task_id} 执行失败: {e}")
+                    logger.error(f"工作线程异常退出: {e}")
+        
+        if self.check_stop():
+            logger.info("用户已停止爬取")
+            if callback:
+                callback("用户已停止爬取")
         
         # 最终统计
         with self.stats_lock:
@@ -368,6 +639,10 @@ class MultiThreadBaseCrawler:
         logger.info(f"  失败任务数: {self.stats['failed_tasks']} 个")
         logger.info(f"  总爬取数量: {self.stats['total_crawled']} 条")
         logger.info(f"  最终保存数量: {self.stats['total_saved']} 条")
+        timing = self.get_task_timing_stats()
+        if timing['tasks']:
+            logger.info(f"  单任务耗时: 最长 {timing['max_elapsed']:.2f} 秒, 平均 {timing['mean_elapsed']:.2f} 秒, "
+                        f"线程负载不均衡度: {timing['imbalance']:.2f}")
         if was_stopped:
             logger.info("  爬取被用户停止")
         
@@ -387,6 +662,33 @@ class MultiThreadBaseCrawler:
                 stats['elapsed_time'] = (stats['end_time'] - stats['start_time']).total_seconds()
             return stats
     
+    def get_task_timing_stats(self) -> Dict:
+        """
+        获取任务耗时统计
+        
+        Returns:
+            Dict: tasks（每个任务的耗时明细）、threads（每个线程的忙碌秒数）、
+                  max_elapsed / mean_elapsed（单任务耗时）、imbalance（最忙线程 / 平均线程忙碌时间，1.0 表示均衡）
+        """
+        with self.stats_lock:
+            timings = [dict(item) for item in self.task_timings]
+        
+        executed = [item for item in timings if item['status'] != 'split']
+        threads: Dict[str, float] = {}
+        for item in timings:
+            threads[item['thread']] = threads.get(item['thread'], 0.0) + item['elapsed']
+        
+        elapsed = [item['elapsed'] for item in executed]
+        busy = list(threads.values())
+        mean_busy = sum(busy) / len(busy) if busy else 0.0
+        return {
+            'tasks': timings,
+            'threads': {name: round(seconds, 3) for name, seconds in threads.items()},
+            'max_elapsed': max(elapsed) if elapsed else 0.0,
+            'mean_elapsed': sum(elapsed) / len(elapsed) if elapsed else 0.0,
+            'imbalance': (max(busy) / mean_busy) if mean_busy else 1.0,
+        }
+    
     def get_error_summary(self) -> List[tuple]:
         """获取错误摘要"""
         errors = []
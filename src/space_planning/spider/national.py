@@ -5,7 +5,9 @@ from typing import Dict, Optional
 
 from ..core import database as db
 from .anti_crawler import AntiCrawlerManager
+from .incremental import HighWaterMark
 from .monitor import CrawlerMonitor
+from .page_size import get_negotiator
 from .spider_config import SpiderConfig
 from bs4 import BeautifulSoup, Tag
 
@@ -74,7 +76,7 @@ class NationalSpider:
         
         return False
 
-    def crawl_policies(self, keywords=None, callback=None, start_date=None, end_date=None, speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, policy_callback=None):
+    def crawl_policies(self, keywords=None, callback=None, start_date=None, end_date=None, speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, policy_callback=None, incremental=None):
         """
         通过API获取住建部政策文件，基于时间区间过滤
         Args:
@@ -86,6 +88,7 @@ class NationalSpider:
             disable_speed_limit: 是否禁用速度限制
             stop_callback: 停止回调函数
             policy_callback: 政策数据回调函数，每解析到一条政策时调用
+            incremental: 增量模式，翻页到上次爬取的高水位即停止；None 时读取配置
         """
         logger.info(f"NationalSpider.crawl_policies 开始执行: keywords={keywords}, start_date={start_date}, end_date={end_date}, speed_mode={speed_mode}")
         
@@ -96,7 +99,7 @@ class NationalSpider:
         policies = []
         # 从通用配置获取页面大小
         common_config = SpiderConfig.get_common_config()
-        page_size = common_config['page_size']
+        page_size = self._negotiate_page_size(common_config['page_size'])
         
         page_no = 1
         total_processed = 0
@@ -111,6 +114,10 @@ class NationalSpider:
         in_target_range = False  # 是否已进入目标时间区间
         consecutive_out_of_range = 0  # 连续超出范围的页数
         
+        # 增量爬取高水位（列表按发布日期从新到旧）
+        watermark = HighWaterMark('national', incremental, keywords, start_date, end_date)
+        completed = False
+        
         while True:
             # 检查是否停止
             if stop_callback and stop_callback():
@@ -164,22 +171,26 @@ class NationalSpider:
                     logger.warning(f"第 {page_no} 页无HTML内容，响应数据结构: {list(data.keys()) if isinstance(data, dict) else type(data)}")
                     logger.warning(f"第 {page_no} 页 data['data'] 内容: {data.get('data')}")
                     logger.info(f"第 {page_no} 页无HTML内容，停止检索，已获取 {len(policies)} 条政策")
-                    return policies
+                    completed = True
+                    break
                 
                 soup = BeautifulSoup(html_content, 'html.parser')
                 table = soup.find('table')
                 if not isinstance(table, Tag):
                     logger.warning(f"第 {page_no} 页未找到表格，HTML长度: {len(html_content)}, 停止检索")
                     logger.debug(f"第 {page_no} 页HTML前500字符: {html_content[:500]}")
-                    return policies
+                    completed = True
+                    break
                 tbody = table.find('tbody')
                 if not isinstance(tbody, Tag):
                     logger.warning(f"第 {page_no} 页未找到tbody，停止检索")
-                    return policies
+                    completed = True
+                    break
                 rows = tbody.find_all('tr')
                 logger.debug(f"第 {page_no} 页找到 {len(rows)} 条政策")
                 page_policies = []
                 page_dates = []
+                known_count = 0  # 已入库（高水位以内）的条目数
                 
                 for row in rows:
                     if not isinstance(row, Tag):
@@ -237,6 +248,12 @@ class NationalSpider:
                             except Exception:
                                 continue
                             
+                            # 增量模式：跳过已入库的条目
+                            policy_key = HighWaterMark.policy_key(url, title, pub_date)
+                            if watermark.is_known(pub_date, policy_key):
+                                known_count += 1
+                                continue
+                            
                             # 时间区间过滤
                             if dt_start and dt_pub < dt_start:
                                 continue
@@ -267,6 +284,7 @@ class NationalSpider:
                                 'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                             }
                             page_policies.append(policy_data)
+                            watermark.observe(pub_date, policy_key)
                             self.anti_crawler.register_policy_success()
                             
                             # 调用 policy_callback 实时返回政策数据
@@ -286,6 +304,15 @@ class NationalSpider:
                 total_processed += len(page_policies)
                 policies.extend(page_policies)
                 
+                # 增量模式：整页都已入库，说明已翻到上次爬取的位置
+                if page_dates and known_count == len(page_dates):
+                    watermark.reached = True
+                    logger.info(f"第 {page_no} 页已全部入库，到达上次爬取位置，停止检索")
+                    if callback:
+                        callback(f"增量模式：第 {page_no} 页已全部入库，停止检索")
+                    completed = True
+                    break
+                
                 # 时间区间状态检查 - 优化版本
                 if dt_start and dt_end and page_dates:
                     # 更精确的时间区间判断
@@ -307,7 +334,8 @@ class NationalSpider:
                             # 如果连续多页都脱离范围，停止检索
                             if consecutive_out_of_range >= max_consecutive_out_of_range:
                                 logger.info(f"连续 {max_consecutive_out_of_range} 页脱离目标时间区间，停止检索")
-                                return policies
+                                completed = True
+                                break
                         else:
                             consecutive_out_of_range = 0
                 
@@ -362,12 +390,53 @@ class NationalSpider:
                     logger.error("遇到严重错误，停止爬取")
                     break
         
+        if completed and not (stop_callback and stop_callback()):
+            watermark.commit()
+        
         logger.info(f"爬取完成，共获取 {len(policies)} 条政策")
         if callback:
             callback(f"爬取完成，共获取 {len(policies)} 条政策")
         
         return policies
 
+    def _fetch_list_rows(self, page_no, page_size):
+        """请求列表页并返回各行文本；请求失败或页面结构异常时返回None"""
+        import json
+        params = self.base_params.copy()
+        params['paramJson'] = json.dumps({
+            "pageNo": page_no,
+            "pageSize": page_size,
+            "loadEnabled": True,
+            "search": "{}"
+        })
+        try:
+            resp = self.anti_crawler.make_request(self.api_url, method='GET', params=params,
+                                                  headers=self.special_headers.copy())
+            html_content = resp.json().get('data', {}).get('html', '')
+        except Exception as e:
+            logger.warning(f"列表页请求失败（页大小 {page_size}）: {e}")
+            return None
+        table = BeautifulSoup(html_content or '', 'html.parser').find('table')
+        tbody = table.find('tbody') if isinstance(table, Tag) else None
+        if not isinstance(tbody, Tag):
+            return None
+        return [row.get_text(' ', strip=True) for row in tbody.find_all('tr') if isinstance(row, Tag)]
+
+    def _negotiate_page_size(self, default_page_size):
+        """协商列表接口的页大小：返回整页时再请求第2页，确认翻页正常且不是第1页的重复"""
+        def probe(page_size):
+            first_page = self._fetch_list_rows(1, page_size)
+            if first_page is None:
+                return None
+            if len(first_page) >= page_size:
+                second_page = self._fetch_list_rows(2, page_size)
+                if second_page is None or second_page == first_page:
+                    return None
+            return len(first_page)
+
+        self._ensure_proxy_initialized()
+        return get_negotiator(self.api_url, default_page_size).negotiate(probe)
+
     def get_crawler_status(self):
         """获取爬虫状态"""
         return {
@@ -483,28 +552,8 @@ class NationalSpider:
             return ""  # 返回空字符串而不是抛出异常
 
     def save_to_db(self, policies):
-        """保存政策到数据库"""
-        for policy in policies:
-            # 检查policy是字典还是其他格式
-            if isinstance(policy, dict):
-                db.insert_policy(
-                    policy['level'],
-                    policy['title'],
-                    policy['pub_date'],
-                    policy['source'],
-                    policy['content'],
-                    policy['crawl_time']
-                )
-            elif isinstance(policy, (list, tuple)) and len(policy) >= 6:
-                # 如果是元组格式：(id, level, title, pub_date, source, content)
-                db.insert_policy(
-                    policy[1],  # level
-                    policy[2],  # title
-                    policy[3],  # pub_date
-                    policy[4],  # source
-                    policy[5],  # content
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # crawl_time
-                )
+        """保存政策到数据库（批量插入，单事务去重）"""
+        return db.insert_policies_bulk(policies)
 
 # 为兼容性添加别名类
 class NationalPolicyCrawler(NationalSpider):
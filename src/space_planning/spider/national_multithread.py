@@ -11,13 +11,17 @@ from bs4 import BeautifulSoup, Tag
 import logging
 import threading
 
-from .multithread_base_crawler import MultiThreadBaseCrawler
+from .multithread_base_crawler import MultiThreadBaseCrawler, PageRange, last_page_from_response
 from .anti_crawler import AntiCrawlerManager
+from .incremental import HighWaterMark
 from .monitor import CrawlerMonitor
+from .page_size import cached_page_size
 from .spider_config import SpiderConfig
 
 logger = logging.getLogger(__name__)
 
+MAX_PAGES_PER_TASK = 50  # 每个任务最多爬取50页
+
 
 class NationalMultiThreadSpider(MultiThreadBaseCrawler):
     """国家住建部多线程爬虫"""
@@ -69,6 +73,11 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
             'X-Requested-With': 'XMLHttpRequest'
         })
         
+        # 增量爬取高水位（每次爬取开始时创建，各任务共用）
+        self.watermark: Optional[HighWaterMark] = None
+        self.watermark_lock = threading.Lock()
+        self._interrupted_tasks = 0
+        
         logger.info(f"初始化国家住建部多线程爬虫，线程数: {max_workers}, 代理启用: {enable_proxy}")
     
     def _prepare_tasks(self) -> List[Dict]:
@@ -113,7 +122,9 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                 'end_date': month_end.strftime('%Y-%m-%d'),
                 'year': current_date.year,
                 'month': current_date.month,
-                'description': f"{current_date.year}年{current_date.month}月"
+                'description': f"{current_date.year}年{current_date.month}月",
+                'page_end': MAX_PAGES_PER_TASK,  # 页码区间，空闲线程可接手剩余页码
+                'page_end_estimated': True  # 末页是估计值，首页确定实际末页之前不允许窃取
             }
             
             tasks.append(task_data)
@@ -138,9 +149,9 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
         
         # 从通用配置获取参数
         common_config = SpiderConfig.get_common_config()
-        page_size = common_config['page_size']
-        page_no = 1  # 每个任务从第1页开始
-        max_pages = 50  # 每个任务最多爬取50页
+        page_size = cached_page_size(self.api_url, common_config['page_size'])  # 单线程爬取时协商得到的页大小
+        # 页码区间（由调度器创建，剩余页码可能被空闲线程接手）
+        page_range = task_data.get('page_range') or PageRange(1, MAX_PAGES_PER_TASK, bounded=False)
         max_consecutive_out_of_range = common_config['max_consecutive_out_of_range']
         
         # 基于速度模式应用统一配置
@@ -153,6 +164,8 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
         dt_end = datetime.strptime(end_date, '%Y-%m-%d')
         in_target_range = False  # 是否已进入目标时间区间
         consecutive_out_of_range = 0  # 连续超出范围的页数
+        watermark = self.watermark or HighWaterMark('national', False)
+        interrupted = False  # 是否因请求或解析错误提前结束
         
         # 检查代理状态
         if self.enable_proxy and hasattr(self, 'proxy_manager') and self.proxy_manager:
@@ -168,7 +181,8 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
         else:
             logger.info(f"线程 {thread_name} 代理已禁用")
         
-        while page_no <= max_pages:
+        page_no = page_range.claim()
+        while page_no is not None:
             try:
                 # 检查是否需要停止
                 if hasattr(self, 'check_stop') and self.check_stop():
@@ -208,6 +222,7 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                         if self._rotate_thread_proxy():
                             logger.info(f"线程 {thread_name} 轮换代理后重试")
                             continue
+                    interrupted = True
                     break
                 
                 # 解析响应数据
@@ -215,6 +230,7 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                     data = response.json()
                 except Exception as e:
                     logger.error(f"线程 {thread_name} 解析JSON失败: {e}")
+                    interrupted = True
                     break
                 
                 # 检查是否有数据
@@ -237,9 +253,13 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                 
                 rows = tbody.find_all('tr')
                 logger.info(f"线程 {thread_name} 第{page_no}页找到 {len(rows)} 条政策")
+                if not page_range.bounded:
+                    # 不满一页或页面给出总数时确定实际末页，之后剩余页码才可被空闲线程接手
+                    page_range.bound(last_page_from_response(page_no, len(rows), page_size, data, html_content))
                 
                 page_policies = []
                 page_dates = []  # 记录当前页的日期范围
+                known_count = 0  # 已入库（高水位以内）的条目数
                 
                 for row in rows:
                     try:
@@ -281,6 +301,12 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                                 # 如果日期解析失败，跳过该政策
                                 continue
                             
+                            # 增量模式：跳过已入库的条目
+                            policy_key = HighWaterMark.policy_key(url, title, pub_date)
+                            if watermark.is_known(pub_date, policy_key):
+                                known_count += 1
+                                continue
+                            
                             # 时间区间过滤（与原始爬虫完全一致）
                             # 检查是否取消时间限制
                             user_start_date = getattr(self, 'user_start_date', None)
@@ -305,6 +331,8 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                             }
                             
                             page_policies.append(policy)
+                            with self.watermark_lock:
+                                watermark.observe(pub_date, policy_key)
                             self.anti_crawler.register_policy_success()
                             
                     except Exception as e:
@@ -317,6 +345,12 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                 if hasattr(self, 'check_stop') and self.check_stop():
                     break
                 
+                # 增量模式：整页都已入库，说明已翻到上次爬取的位置
+                if page_dates and known_count == len(page_dates):
+                    watermark.reached = True
+                    logger.info(f"线程 {thread_name} 第{page_no}页已全部入库，到达上次爬取位置，停止检索")
+                    break
+                
                 # 时间区间状态检查（与原始爬虫完全一致）
                 # 只有当用户指定了时间范围时才进行状态检查
                 user_start_date = getattr(self, 'user_start_date', None)
@@ -348,12 +382,21 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
                 if callback:
                     callback(f"线程 {thread_name} {description} 第{page_no}页: 获取{len(rows)}条，范围内{len(page_policies)}条")
                 
-                page_no += 1
+                page_no = page_range.claim()
                 
             except Exception as e:
                 logger.error(f"线程 {thread_name} 第{page_no}页处理失败: {e}")
+                interrupted = True
                 break
         
+        if interrupted:
+            with self.watermark_lock:
+                self._interrupted_tasks += 1
+        
+        if page_no is not None:
+            # 提前结束（到达末页、脱离时间区间或出错）：同一任务的其他区间也不再继续往后翻页
+            page_range.stop_after(page_no)
+        
         logger.info(f"线程 {thread_name} {description} 完成，共获取 {len(policies)} 条政策")
         if callback:
             callback(f"线程 {thread_name} {description} 完成，共获取 {len(policies)} 条政策")
@@ -438,7 +481,7 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
             self.user_end_date = None
             logger.info("未指定时间范围，使用默认范围")
         
-        return self.crawl_multithread(callback, stop_callback)
+        return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
     
     def crawl_policies_multithread(self, keywords=None, callback=None, start_date=None, end_date=None, 
                                   speed_mode="正常速度", disable_speed_limit=False, stop_callback=None, max_workers=None):
@@ -462,11 +505,22 @@ class NationalMultiThreadSpider(MultiThreadBaseCrawler):
             original_max_workers = self.max_workers
             self.max_workers = max_workers
             try:
-                return self.crawl_multithread(callback, stop_callback)
+                return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
             finally:
                 self.max_workers = original_max_workers
         else:
-            return self.crawl_multithread(callback, stop_callback)
+            return self._crawl_incremental(keywords, start_date, end_date, callback, stop_callback)
+    
+    def _crawl_incremental(self, keywords, start_date, end_date, callback, stop_callback) -> List[Dict]:
+        """多线程爬取，所有任务正常结束（未停止、未出错）后更新增量爬取高水位"""
+        self.watermark = HighWaterMark('national', None, keywords, start_date, end_date)
+        self._interrupted_tasks = 0
+        policies = self.crawl_multithread(callback, stop_callback)
+        with self.stats_lock:
+            failed_tasks = self.stats['failed_tasks']
+        if not failed_tasks and not self._interrupted_tasks and not self.check_stop():
+            self.watermark.commit()
+        return policies
     
     def get_crawler_status(self) -> Dict:
         """获取爬虫状态"""
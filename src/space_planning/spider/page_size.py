@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表接口页大小协商
+列表接口默认每页20条，翻页请求数与页大小成反比。部分接口接受更大的页大小参数，
+因此首次爬取时按从大到小的顺序试探候选页大小，取接口实际生效且不触发翻页校验/验证码的最大值，
+按接口保存在数据库 system_info 表中，后续爬取（包括并行单元、多线程任务）直接使用。
+
+判定规则：
+- 试探请求失败、被限制访问或返回验证码页：该页大小不可用，继续试探较小的候选
+- 返回满一页（条数等于试探的页大小）：接口按该页大小返回，采用并保存
+- 返回条数多于默认页大小但不满一页：可能只是结果总数不足，本次使用默认页大小且不保存结果
+- 返回条数等于默认页大小：接口忽略了页大小参数，继续试探较小的候选
+- 返回条数少于默认页大小：数据不足无法判断，本次使用默认页大小且不保存结果
+
+无法判断的结果只记在内存中，UNDETERMINED_TTL 内同一接口的后续单元/任务不再试探。
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+from .config import crawler_config
+from ..core import database as db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CANDIDATES = (100, 50)
+DEFAULT_TTL_DAYS = 7
+# 无法判断页大小时，在这段时间内不再试探（约为一次爬取的时长）
+UNDETERMINED_TTL = timedelta(hours=1)
+
+
+def is_negotiation_enabled() -> bool:
+    """配置中是否启用页大小协商"""
+    enabled = crawler_config.get_config('page_size_settings.enabled')
+    return True if enabled is None else bool(enabled)
+
+
+class PageSizeNegotiator:
+    """
+    单个列表接口的页大小协商
+
+    同一接口共用一个实例（见 get_negotiator）。同一时间只有一个线程进行试探，
+    试探的网络请求不持有锁；试探期间开始的其余单元直接使用默认页大小，不等待结果。
+    """
+
+    def __init__(self, endpoint: str, default: int, candidates: Optional[Iterable[int]] = None,
+                 ttl_days: Optional[float] = None):
+        """
+        Args:
+            endpoint: 接口标识（通常为列表接口URL）
+            default: 接口默认页大小
+            candidates: 候选页大小，None 时读取配置 page_size_settings.candidates
+            ttl_days: 协商结果有效天数，None 时读取配置 page_size_settings.ttl_days
+        """
+        self.endpoint = endpoint
+        self.default = int(default)
+        if candidates is None:
+            candidates = crawler_config.get_config('page_size_settings.candidates') or DEFAULT_CANDIDATES
+        self.candidates = sorted({int(size) for size in candidates if int(size) > self.default}, reverse=True)
+        if ttl_days is None:
+            ttl_days = crawler_config.get_config('page_size_settings.ttl_days') or DEFAULT_TTL_DAYS
+        self.ttl = timedelta(days=float(ttl_days))
+        self._page_size: Optional[int] = None
+        self._undetermined_at: Optional[datetime] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Optional[int]:
+        """读取数据库中未过期的协商结果"""
+        record = db.get_negotiated_page_size(self.endpoint) or {}
+        try:
+            page_size = int(record.get('page_size') or 0)
+            negotiated_at = datetime.strptime(record.get('negotiated_at', ''), '%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError):
+            return None
+        if page_size <= 0 or datetime.now() - negotiated_at > self.ttl:
+            return None
+        return page_size
+
+    def cached(self) -> Optional[int]:
+        """已协商的页大小；没有有效结果时返回None（不发起试探）"""
+        if self._page_size is None:
+            self._page_size = self._load()
+        return self._page_size
+
+    def _save(self, page_size: int) -> None:
+        self._page_size = page_size
+        db.save_negotiated_page_size(self.endpoint, {
+            'page_size': page_size,
+            'default': self.default,
+            'negotiated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        })
+
+    def negotiate(self, probe: Callable[[int], Optional[int]]) -> int:
+        """
+        返回接口可用的最大页大小，没有有效的保存结果时进行试探
+
+        Args:
+            probe: probe(page_size) 按该页大小请求第一页，返回条目数；
+                   请求失败、被限制访问或触发验证码时返回None
+
+        Returns:
+            int: 页大小（无法确定时为默认页大小）
+        """
+        if not is_negotiation_enabled() or not self.candidates:
+            return self.default
+        with self._lock:
+            cached = self.cached()
+            if cached is not None:
+                return cached
+            if self._probing:
+                # 其他线程正在试探：不等待，本次使用默认页大小
+                return self.default
+            if self._undetermined_at and datetime.now() - self._undetermined_at < UNDETERMINED_TTL:
+                return self.default
+            self._probing = True
+
+        determined = False
+        try:
+            page_size, determined = self._probe_candidates(probe)
+            if determined:
+                self._save(page_size)
+            return page_size
+        finally:
+            with self._lock:
+                self._probing = False
+                if not determined:
+                    self._undetermined_at = datetime.now()
+
+    def _probe_candidates(self, probe: Callable[[int], Optional[int]]):
+        """
+        按候选页大小从大到小试探（不持有锁）
+
+        Returns:
+            tuple: (页大小, 是否可以保存为协商结果)
+        """
+        ignored = False  # 是否有试探确认接口忽略了页大小参数
+        for size in self.candidates:
+            try:
+                returned = probe(size)
+            except Exception as e:
+                logger.warning(f"试探页大小 {size} 失败 [{self.endpoint}]: {e}")
+                returned = None
+            if returned is None:
+                logger.info(f"页大小 {size} 不可用（请求失败或触发校验） [{self.endpoint}]")
+                continue
+            if returned >= size:
+                logger.info(f"列表接口页大小协商为 {size} [{self.endpoint}]")
+                return size, True
+            if returned > self.default:
+                # 返回了不满一页的结果：可能只是结果总数不足，不能确认接口支持该页大小
+                logger.info(f"试探页大小 {size} 只返回 {returned} 条，无法确认页大小，本次使用默认值 [{self.endpoint}]")
+                return self.default, False
+            if returned < self.default:
+                logger.info(f"试探结果不足 {self.default} 条，无法判断页大小，本次使用默认值 [{self.endpoint}]")
+                return self.default, False
+            # 返回条数等于默认页大小：接口忽略了该参数
+            ignored = True
+
+        if not ignored:
+            # 所有试探都没有得到响应（网络或代理故障等），不能据此判断接口不支持更大的页大小
+            logger.info(f"页大小试探均未得到响应，本次使用默认值 [{self.endpoint}]")
+            return self.default, False
+        logger.info(f"列表接口不支持更大的页大小，使用默认值 {self.default} [{self.endpoint}]")
+        return self.default, True
+
+
+_negotiators: Dict[str, PageSizeNegotiator] = {}
+_negotiators_lock = threading.Lock()
+
+
+def get_negotiator(endpoint: str, default: int,
+                   candidates: Optional[Iterable[int]] = None) -> PageSizeNegotiator:
+    """获取接口共用的页大小协商实例"""
+    with _negotiators_lock:
+        negotiator = _negotiators.get(endpoint)
+        if negotiator is None:
+            negotiator = PageSizeNegotiator(endpoint, default, candidates)
+            _negotiators[endpoint] = negotiator
+        return negotiator
+
+
+def cached_page_size(endpoint: str, default: int) -> int:
+    """已协商的页大小（不发起试探），没有结果或未启用时返回默认页大小"""
+    if not is_negotiation_enabled():
+        return default
+    return get_negotiator(endpoint, default).cached() or default
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析进程池
+BeautifulSoup 解析是CPU密集型操作，在线程中执行时受GIL限制无法并行。
+启用后（配置 parse_settings.processes > 0），抓取仍在I/O线程或异步协程中进行，
+列表页和详情页的解析交给 ProcessPoolExecutor：子进程接收原始HTML字节，只返回精简的字典。
+
+本模块顶层的解析函数是纯函数（不依赖爬虫实例），可以在子进程中执行。
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from .config import crawler_config
+
+logger = logging.getLogger(__name__)
+
+# 详情页标题为这些站点通用名称或拦截提示时，回退使用列表标题
+GENERIC_DETAIL_TITLES = {
+    '广东省法规规章数据库',
+    '广东省法规规章数据库检索结果',
+    '广东省法规规章数据库-检索结果',
+    '广东省法规规章数据库（移动版）'
+}
+GENERIC_DETAIL_TITLE_TOKENS = (
+    '登录注册首页',
+    '抱歉，您已超过全文最大访问数',
+    '北大法宝',
+    '返回广东省人大',
+    '错误提示'
+)
+
+
+def policy_checksum(policy: Dict) -> str:
+    """政策 checksum：有效正文的MD5，正文过短时使用 标题|日期|文号 的MD5"""
+    content = (policy.get('content') or '').strip()
+    if content and len(content) > 50:
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+    hash_string = f"{policy.get('title', '')}|{policy.get('pub_date', '')}|{policy.get('doc_number', '')}"
+    return hashlib.md5(hash_string.encode('utf-8')).hexdigest()
+
+
+def extract_checkbox_items(html_content, base_url: str, link_path: str,
+                           category_name: Optional[str] = None) -> List[Dict]:
+    """
+    从广东列表页的 checkbox 提取政策条目（不获取详情）
+
+    Returns:
+        List[Dict]: 带 _need_detail_fetch 标记的条目；页面没有 checkbox 时为空列表
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    items = []
+    crawl_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for checkbox in soup.select('input.checkbox[name="recordList"]'):
+        policy_id = checkbox.get('value', '').strip()
+        if not policy_id or len(policy_id) <= 10:  # 无效 ID
+            continue
+        url = f"{base_url}/{link_path}/{policy_id}.html"
+        policy_data = {
+            'level': '广东省人民政府',
+            'title': f'政策ID: {policy_id}',  # 临时标题，后续详情提取
+            'pub_date': '',
+            'source': url,
+            'url': url,
+            'content': '',
+            'category': category_name or '',
+            'crawl_time': crawl_time,
+            'policy_id': policy_id,
+            '_need_detail_fetch': True  # 标记需要详情
+        }
+        # 计算 checksum (基于临时数据)
+        policy_data['checksum'] = policy_checksum(policy_data)
+        items.append(policy_data)
+    return items
+
+
+def parse_policy_detail(content, expected_title: Optional[str] = None) -> Dict:
+    """
+    解析广东详情页，提取标题、文号、日期、时效性、发布机关和正文
+
+    Args:
+        content: 响应原始内容（交给BeautifulSoup按页面声明的编码解析）
+        expected_title: 列表页标题，详情页标题无效时回退使用
+
+    Returns:
+        Dict: title / doc_number / pub_date / validity / issue_department / content
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # 标题提取
+    real_title = ''
+    title_h2 = soup.select_one('h2.title')
+    if title_h2 and title_h2.get_text(strip=True):
+        real_title = title_h2.get_text(strip=True)
+
+    if not real_title:
+        title_tag = soup.find('title')
+        if title_tag and title_tag.get_text(strip=True):
+            title_text = re.sub(r' - .*$', '', title_tag.get_text(strip=True)).strip()
+            if title_text and not title_text.startswith('政策ID:'):
+                real_title = title_text
+
+    if not real_title:
+        for tag_name in ['h1', 'h2', 'h3']:
+            for heading in soup.find_all(tag_name):
+                heading_text = heading.get_text(strip=True)
+                if heading_text and len(heading_text) > 5 and '政策ID:' not in heading_text:
+                    real_title = heading_text
+                    break
+            if real_title:
+                break
+
+    # 元数据提取
+    doc_number = ''
+    pub_date = ''
+    validity = ''
+    issue_department = ''  # 发布机关（用于地区识别）
+
+    for li in soup.select('li'):
+        strong = li.find('strong')
+        if not strong:
+            continue
+        label = strong.get_text(strip=True)
+        value = li.get_text(strip=True).replace(label, '').replace('：', '').strip()
+        if '发文字号' in label and value:
+            doc_number = value
+        elif '公布日期' in label and value:
+            pub_date = value.replace('.', '-')
+        elif '施行日期' in label and value and not pub_date:
+            pub_date = value.replace('.', '-')
+        elif ('发布机关' in label or '制定机关' in label) and value:
+            issue_department = value
+
+    validity_elem = soup.select_one('.timelinessDic')
+    if validity_elem:
+        validity = validity_elem.get_text(strip=True)
+
+    # 内容提取
+    content_text = ''
+    content_div = soup.select_one('div.content')
+    if content_div:
+        for tag in content_div.find_all(['script', 'style', 'section', 'aside']):
+            tag.decompose()
+        content_text = content_div.get_text('\n', strip=True)
+
+    if not content_text or len(content_text) < 100:
+        for div in soup.find_all('div'):
+            div_text = div.get_text('\n', strip=True)
+            if div_text and len(div_text) > 200 and ('第一条' in div_text or '条例' in div_text):
+                content_text = div_text
+                break
+
+    if not content_text:
+        for tag in soup.find_all(['nav', 'header', 'footer', 'script', 'style']):
+            tag.decompose()
+        content_text = re.sub(r'\s+', ' ', soup.get_text(strip=True))
+
+    # 如果提取到的标题疑似为通用站点名称或拦截页内容，则回退到列表标题
+    normalized_title = real_title.strip()
+    if normalized_title:
+        fallback_required = (
+            normalized_title in GENERIC_DETAIL_TITLES
+            or (normalized_title.endswith('数据库') and len(normalized_title) <= 12)
+            or any(token in normalized_title for token in GENERIC_DETAIL_TITLE_TOKENS)
+            or len(normalized_title) >= 100
+        )
+        if fallback_required:
+            expected_clean = (expected_title or '').strip()
+            if expected_clean:
+                logger.debug("详情页返回泛化/拦截标题[%s]，改用列表标题[%s]", normalized_title[:120], expected_clean)
+            real_title = expected_clean
+
+    return {
+        'title': real_title.strip(),
+        'doc_number': doc_number.strip(),
+        'pub_date': pub_date.strip(),
+        'validity': validity.strip(),
+        'issue_department': issue_department.strip(),
+        'content': content_text.strip(),
+    }
+
+
+class ParsePool:
+    """
+    解析进程池
+
+    run() 在调用线程中阻塞等待子进程返回结果（等待期间释放GIL），
+    因此多个I/O线程可以同时把解析交给不同的子进程。进程池损坏时自动退回到当前线程解析。
+    """
+
+    def __init__(self, processes: int):
+        self.processes = max(1, int(processes))
+        # 使用 spawn 启动子进程，避免在多线程进程中 fork 继承锁状态
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=multiprocessing.get_context('spawn')
+        )
+        self._broken = False
+
+    def run(self, func: Callable, *args, **kwargs):
+        """在子进程中执行解析函数（必须是模块顶层函数）并返回结果"""
+        if self._broken:
+            return func(*args, **kwargs)
+        try:
+            return self._executor.submit(func, *args, **kwargs).result()
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning(f"解析进程池不可用，改为在当前线程解析: {e}")
+            self._broken = True
+            return func(*args, **kwargs)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_shared_pool: Optional[ParsePool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_parse_processes() -> int:
+    """配置的解析进程数，0 表示不启用进程池"""
+    try:
+        return max(0, int(crawler_config.get_config('parse_settings.processes') or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """获取共享的解析进程池，未启用时返回None"""
+    global _shared_pool
+    processes = get_parse_processes()
+    if processes <= 0:
+        return None
+    if _shared_pool is not None:
+        return _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ParsePool(processes)
+            logger.info(f"HTML解析进程池已启动: {_shared_pool.processes} 个进程")
+    return _shared_pool
+
+
+def run_parser(func: Callable, *args, **kwargs):
+    """启用进程池时在子进程中执行解析函数，否则在当前线程执行"""
+    pool = get_parse_pool()
+    if pool is None:
+        return func(*args, **kwargs)
+    return pool.run(func, *args, **kwargs)
+
+
+def shutdown_parse_pool() -> None:
+    """关闭共享的解析进程池"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.shutdown()
+            _shared_pool = None
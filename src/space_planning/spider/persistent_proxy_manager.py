@@ -32,6 +32,8 @@ except ImportError:
     KdlStatusError = Exception
 import requests
 
+from .state_store import WriteBehindStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -317,10 +319,18 @@ class PersistentProxyManager:
             os.path.dirname(__file__), 
             'persistent_proxy_state.json'
         )
+        # 代理历史日志（追加写入，记录每个代理的获取、失效等事件）
+        self.history_file = os.path.join(
+            os.path.dirname(__file__),
+            'persistent_proxy_history.jsonl'
+        )
         
         # 加载上次的代理状态
         self._load_state()
         
+        # 状态改动只做标记，由后台线程按间隔合并写入
+        self._state_store = WriteBehindStore(self.state_file, self._state_snapshot, self.history_file)
+        
         logger.info("持久化代理管理器初始化完成")
     
     def _load_config(self, config_file: Optional[str] = None) -> Dict:
@@ -493,19 +503,42 @@ class PersistentProxyManager:
             logger.debug(f"从状态文件加载代理失败: {e}")
             return None
     
-    def _save_state(self):
-        """保存当前代理状态"""
+    def _state_snapshot(self) -> Dict:
+        """当前代理状态（由状态写入线程调用）"""
+        if not self.lock.acquire(timeout=2.0):
+            raise TimeoutError("获取代理锁超时")
         try:
-            state_data = {
+            return {
                 'current_proxy': self.current_proxy.to_dict() if self.current_proxy else None,
                 'last_update': datetime.now().isoformat()
             }
-            
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, ensure_ascii=False, indent=2)
-                
-        except Exception as e:
-            logger.error(f"保存代理状态失败: {e}")
+        finally:
+            self.lock.release()
+    
+    def _save_state(self):
+        """标记代理状态已改动（后台线程按间隔写入状态文件）"""
+        self._state_store.mark_dirty()
+    
+    def flush_state(self):
+        """立即写入代理状态和历史日志（不要在持有 self.lock 时调用）"""
+        self._state_store.flush()
+    
+    def _record_history(self, event: str, proxy: Optional[PersistentProxyInfo]):
+        """记录代理历史事件"""
+        if proxy is None:
+            return
+        self._state_store.append_history({
+            'time': datetime.now().isoformat(),
+            'event': event,
+            'ip': proxy.ip,
+            'port': proxy.port,
+            'proxy_type': proxy.proxy_type,
+            'age_hours': round(proxy.age_hours, 3),
+            'use_count': proxy.use_count,
+            'success_count': proxy.success_count,
+            'failure_count': proxy.failure_count,
+            'consecutive_failures': proxy.consecutive_failures,
+        })
     
     def _get_new_proxy(self) -> Optional[PersistentProxyInfo]:
         """获取新的代理（增强错误处理和回退机制）"""
@@ -711,6 +744,7 @@ class PersistentProxyManager:
                 if self.current_proxy.proxy_type != expected_type:
                     logger.info(f"代理类型不匹配，当前: {self.current_proxy.proxy_type}, 期望: {expected_type}，强制刷新")
                     self.current_proxy.is_active = False
+                    self._record_history('type_mismatch', self.current_proxy)
                     self.current_proxy = None
                 else:
                     return self.current_proxy.proxy_dict
@@ -718,11 +752,13 @@ class PersistentProxyManager:
             # 当前代理失效，获取新代理
             if self.current_proxy:
                 logger.info(f"当前代理失效，获取新代理。失效原因: 连续失败{self.current_proxy.consecutive_failures}次")
+                self._record_history('expired', self.current_proxy)
             
             new_proxy = self._get_new_proxy()
             if new_proxy:
                 self.current_proxy = new_proxy
                 self._save_state()
+                self._record_history('acquired', new_proxy)
                 logger.info(f"获取到新代理: {new_proxy.ip}:{new_proxy.port} (类型: {new_proxy.proxy_type})")
                 return new_proxy.proxy_dict
             else:
@@ -736,6 +772,7 @@ class PersistentProxyManager:
                             logger.info(f"使用状态文件中保存的代理: {saved_proxy.ip}:{saved_proxy.port}")
                             self.current_proxy = saved_proxy
                             self._save_state()
+                            self._record_history('restored', saved_proxy)
                             return saved_proxy.proxy_dict
                         else:
                             logger.warning(f"状态文件中的代理已过期或失效: {saved_proxy.ip}:{saved_proxy.port}")
@@ -751,9 +788,13 @@ class PersistentProxyManager:
         """报告代理使用结果"""
         with self.lock:
             if self.current_proxy:
+                was_active = self.current_proxy.is_active
                 self.current_proxy.mark_used(success, response_time)
                 self._save_state()
                 
+                if was_active and not self.current_proxy.is_active:
+                    self._record_history('retired', self.current_proxy)
+                
                 if not success:
                     logger.warning(f"代理使用失败: {self.current_proxy.ip}:{self.current_proxy.port} "
                                  f"(连续失败: {self.current_proxy.consecutive_failures}次)")
@@ -805,11 +846,13 @@ class PersistentProxyManager:
             if self.current_proxy:
                 logger.info(f"强制刷新代理: {self.current_proxy.ip}:{self.current_proxy.port}")
                 self.current_proxy.is_active = False
+                self._record_history('refreshed', self.current_proxy)
             
             new_proxy = self._get_new_proxy()
             if new_proxy:
                 self.current_proxy = new_proxy
                 self._save_state()
+                self._record_history('acquired', new_proxy)
                 logger.info(f"强制刷新后获取新代理: {new_proxy.ip}:{new_proxy.port}")
     
     def clear_proxy(self):
@@ -820,6 +863,7 @@ class PersistentProxyManager:
                 try:
                     if self.current_proxy:
                         logger.info(f"清空当前代理: {self.current_proxy.ip}:{self.current_proxy.port}")
+                        self._record_history('cleared', self.current_proxy)
                         self.current_proxy = None
                         self._save_state()
                         logger.info("代理已清空")
@@ -844,12 +888,14 @@ class PersistentProxyManager:
             # 清空当前代理
             if self.current_proxy:
                 logger.info(f"清空当前代理: {self.current_proxy.ip}:{self.current_proxy.port}")
+                self._record_history('reset', self.current_proxy)
                 self.current_proxy = None
             
-            # 删除状态文件
+            # 删除状态文件（同时丢弃尚未写入的状态）
             try:
-                if os.path.exists(self.state_file):
-                    os.remove(self.state_file)
+                existed = os.path.exists(self.state_file)
+                self._state_store.discard(remove_file=True)
+                if existed:
                     logger.info(f"已删除代理状态文件: {self.state_file}")
                 else:
                     logger.info("代理状态文件不存在")
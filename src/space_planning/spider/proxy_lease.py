@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享代理租约管理
+代理由后台线程按批次从代理商获取，在内存中以租约形式分配给各线程：
+
+- 每个线程同一时间持有一个租约，再次获取时自动归还上一个租约
+- 每个代理同时被租用的线程数有上限，超过上限时分配其他代理或触发补充
+- 代理在到期前（refill_ahead 秒）由后台线程提前补充，最近没有取用需求时不补充
+- 连续失败达到上限的代理下线，不再分配
+- 可选的准入检查（validator）在入池前剔除慢代理和不可用代理
+- 再次获取到池中已有的代理时延长其有效期（不算获取失败）
+- 隧道代理（tunnel=True）：代理商总是返回同一个入口，由入口切换出口IP，
+  租约池只保留这一个代理，不设到期时间和租用线程数上限
+
+获取代理只访问内存，代理商接口的调用次数取决于代理的到期和下线数量，与线程数无关。
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 距到期不足该秒数的代理不再分配
+LEASE_MARGIN = 5.0
+# 两次获取之间的最短间隔（秒），避免代理商返回不可用代理时连续请求
+MIN_FETCH_INTERVAL = 2.0
+
+
+class _PooledProxy:
+    """租约池中的一个代理"""
+    __slots__ = ('key', 'proxy_dict', 'expires_at', 'leases', 'failures')
+
+    def __init__(self, proxy_dict: Dict[str, str], expires_at: float):
+        self.key = proxy_dict.get('https') or proxy_dict.get('http') or ''
+        self.proxy_dict = proxy_dict
+        self.expires_at = expires_at
+        self.leases = 0
+        self.failures = 0
+
+
+class ProxyLeaseManager:
+    """代理租约管理器（线程安全）"""
+
+    def __init__(self, fetcher: Callable[[int], List[Dict[str, str]]], batch_size: int = 5,
+                 proxy_ttl: float = 180.0, max_concurrency: int = 4, refill_ahead: float = 30.0,
+                 max_failures: int = 3, retry_interval: float = 30.0,
+                 validator: Optional[Callable[[List[Dict[str, str]]], List[Dict[str, str]]]] = None,
+                 tunnel: bool = False):
+        """
+        Args:
+            fetcher: fetcher(num) 从代理商获取 num 个代理，返回代理字典列表（失败时返回空列表）
+            batch_size: 每次获取的代理数，也是保持可用的代理数
+            proxy_ttl: 代理有效期（秒）
+            max_concurrency: 单个代理同时租用的线程数上限
+            refill_ahead: 提前补充的秒数（距到期不足该时间的代理不计为可用）
+            max_failures: 连续失败该次数后下线代理
+            retry_interval: 获取失败后的重试间隔（秒）
+            validator: validator(代理列表) 返回可以入池的代理（在锁外调用）
+            tunnel: 是否为隧道代理（只保留一个代理，忽略 batch_size、proxy_ttl 和 max_concurrency）
+        """
+        self.fetcher = fetcher
+        self.tunnel = bool(tunnel)
+        self.batch_size = 1 if self.tunnel else max(1, int(batch_size))
+        self.proxy_ttl = float(proxy_ttl)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.refill_ahead = min(float(refill_ahead), self.proxy_ttl / 2)
+        self.max_failures = max(1, int(max_failures))
+        self.retry_interval = float(retry_interval)
+        self.validator = validator
+        self.lease_margin = min(LEASE_MARGIN, self.refill_ahead / 2)
+
+        self._cond = threading.Condition()
+        self._proxies: Dict[str, _PooledProxy] = {}
+        self._thread_leases: Dict[int, str] = {}  # 线程ident -> 代理key
+        self._refill_requested = False
+        self._starved = False  # 有线程因容量不足未取到代理
+        self._fetching = False
+        self._next_fetch_at = 0.0  # 下次允许获取的时间
+        self._failed_until = 0.0  # 获取失败后的重试间隔结束时间
+        self._last_demand = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'fetches': 0, 'fetched': 0, 'refreshed': 0, 'leases': 0, 'retired': 0, 'expired': 0,
+                      'rejected': 0}
+
+    # ---- 生命周期 ----
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._refill_loop, name='proxy-lease-refill', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    # ---- 租约 ----
+
+    def _usable(self, proxy: _PooledProxy, now: float) -> bool:
+        return proxy.failures < self.max_failures and proxy.expires_at - now > self.lease_margin
+
+    def _pick(self, now: float, exclude: Optional[str] = None) -> Optional[_PooledProxy]:
+        """选择租用数最少的可用代理（相同时选剩余有效期较长的）"""
+        best = None
+        for proxy in self._proxies.values():
+            if proxy.key == exclude or not self._usable(proxy, now):
+                continue
+            if not self.tunnel and proxy.leases >= self.max_concurrency:
+                continue
+            if best is None or (proxy.leases, -proxy.expires_at) < (best.leases, -best.expires_at):
+                best = proxy
+        return best
+
+    def _release_locked(self, ident: int) -> Optional[str]:
+        key = self._thread_leases.pop(ident, None)
+        proxy = self._proxies.get(key) if key else None
+        if proxy and proxy.leases > 0:
+            proxy.leases -= 1
+        return key
+
+    def _reap_dead_leases_locked(self) -> None:
+        """归还已结束线程未归还的租约"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._thread_leases if ident not in alive]:
+            self._release_locked(ident)
+
+    def _healthy_count(self, now: float) -> int:
+        return sum(1 for proxy in self._proxies.values()
+                   if proxy.failures < self.max_failures and proxy.expires_at - now > self.refill_ahead)
+
+    def _request_refill_locked(self) -> None:
+        self._refill_requested = True
+        self._cond.notify_all()
+
+    def acquire(self, rotate: bool = False, wait: float = 10.0) -> Optional[Dict[str, str]]:
+        """
+        为当前线程租用一个代理（归还该线程之前的租约）
+
+        Args:
+            rotate: 是否换用与之前不同的代理
+            wait: 租约池中没有可用代理时等待补充的最长秒数
+
+        Returns:
+            Dict[str, str]: 代理字典；没有可用代理时返回None
+        """
+        ident = threading.get_ident()
+        deadline = time.monotonic() + wait
+        with self._cond:
+            if not self._running:
+                self.start()
+            now = time.monotonic()
+            self._last_demand = now
+            previous = self._release_locked(ident)
+            # 隧道代理由入口切换出口IP，换用代理时仍使用同一个入口
+            exclude = previous if rotate and not self.tunnel else None
+            reaped = False
+            while True:
+                proxy = self._pick(now, exclude)
+                if proxy is None and not reaped:
+                    self._reap_dead_leases_locked()
+                    reaped = True
+                    proxy = self._pick(now, exclude)
+                if proxy is not None:
+                    proxy.leases += 1
+                    self._thread_leases[ident] = proxy.key
+                    self.stats['leases'] += 1
+                    if self._healthy_count(now) < self.batch_size:
+                        self._request_refill_locked()
+                    return dict(proxy.proxy_dict)
+
+                self._starved = True
+                self._request_refill_locked()
+                # 获取失败后的重试间隔内不等待，直接返回
+                if not self._fetching and now < self._failed_until:
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+                now = time.monotonic()
+
+            # 等待超时：换用代理时退回原代理
+            if exclude is not None:
+                proxy = self._pick(now)
+                if proxy is not None:
+                    proxy.leases += 1
+                    self._thread_leases[ident] = proxy.key
+                    return dict(proxy.proxy_dict)
+        return None
+
+    def release(self) -> None:
+        """归还当前线程的租约"""
+        with self._cond:
+            self._release_locked(threading.get_ident())
+
+    def report(self, success: bool) -> None:
+        """报告当前线程所租代理的使用结果，连续失败达到上限时下线该代理"""
+        with self._cond:
+            key = self._thread_leases.get(threading.get_ident())
+            proxy = self._proxies.get(key) if key else None
+            if proxy is None:
+                return
+            if success:
+                proxy.failures = 0
+                return
+            proxy.failures += 1
+            if proxy.failures >= self.max_failures:
+                self._proxies.pop(proxy.key, None)
+                self.stats['retired'] += 1
+                logger.info(f"代理连续失败 {proxy.failures} 次，已下线")
+                self._request_refill_locked()
+
+    # ---- 后台补充 ----
+
+    def _needs_refill(self, now: float) -> bool:
+        if self._starved:
+            return True
+        recently_used = now - self._last_demand < self.proxy_ttl
+        return recently_used and self._healthy_count(now) < self.batch_size
+
+    def _next_check_delay(self, now: float) -> float:
+        """到下一个代理进入提前补充窗口的秒数"""
+        upcoming = [proxy.expires_at - self.refill_ahead - now for proxy in self._proxies.values()]
+        delay = min(upcoming, default=30.0)
+        return min(30.0, max(1.0, delay))
+
+    def _drop_expired_locked(self, now: float) -> None:
+        for key in [key for key, proxy in self._proxies.items() if proxy.expires_at <= now]:
+            del self._proxies[key]
+            self.stats['expired'] += 1
+
+    def _refill_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                if not self._refill_requested:
+                    self._cond.wait(self._next_check_delay(now))
+                    if not self._running:
+                        return
+                    now = time.monotonic()
+                self._refill_requested = False
+                self._drop_expired_locked(now)
+                if now < self._next_fetch_at or not self._needs_refill(now):
+                    continue
+                self._fetching = True
+
+            # 在锁外请求代理商接口（有效期从获取时算起，不含准入检查耗时）
+            fetched_at = time.monotonic()
+            try:
+                batch = self.fetcher(self.batch_size) or []
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"批量获取代理失败: {e}")
+                batch = []
+            rejected = 0
+            if batch and self.validator is not None:
+                try:
+                    accepted = self.validator(batch)
+                    rejected = len(batch) - len(accepted)
+                    batch = accepted
+                except Exception as e:  # noqa: BLE001
+                    logger.error(f"代理准入检查失败，跳过检查: {e}")
+
+            with self._cond:
+                self._fetching = False
+                now = time.monotonic()
+                self.stats['fetches'] += 1
+                expires_at = math.inf if self.tunnel else fetched_at + self.proxy_ttl
+                added = refreshed = 0
+                for proxy_dict in batch:
+                    proxy = _PooledProxy(proxy_dict, expires_at)
+                    if not proxy.key:
+                        continue
+                    existing = self._proxies.get(proxy.key)
+                    if existing is not None:
+                        # 代理商再次返回池中已有的代理：延长有效期
+                        existing.expires_at = max(existing.expires_at, expires_at)
+                        refreshed += 1
+                    else:
+                        self._proxies[proxy.key] = proxy
+                        added += 1
+                self.stats['fetched'] += added
+                self.stats['refreshed'] += refreshed
+                self.stats['rejected'] += rejected
+                if added or refreshed:
+                    self._starved = False
+                    # 只延长了已有代理：代理商暂时没有新代理，按重试间隔再获取
+                    self._next_fetch_at = now + (MIN_FETCH_INTERVAL if added else self.retry_interval)
+                    logger.info(f"代理租约池补充 {added} 个代理，延长 {refreshed} 个代理的有效期，"
+                                f"当前 {len(self._proxies)} 个")
+                else:
+                    self._next_fetch_at = self._failed_until = now + self.retry_interval
+                self._cond.notify_all()
+
+    # ---- 状态 ----
+
+    def get_status(self) -> Dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'proxies': len(self._proxies),
+                'healthy': self._healthy_count(now),
+                'active_leases': sum(proxy.leases for proxy in self._proxies.values()),
+                'running': self._running,
+                **self.stats,
+            }
@@ -12,9 +12,14 @@ import time
 import logging
 import threading
 import random
+import heapq
+import itertools
 from typing import Optional, Dict, List
 from datetime import datetime
 
+from .proxy_lease import ProxyLeaseManager
+from .proxy_verifier import get_health_checker, proxy_key
+
 # Conditional import for kdl
 try:
     from kdl.auth import Auth
@@ -29,6 +34,11 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 代理缓存有改动时最迟多少秒后写入文件
+CACHE_SAVE_INTERVAL = 30
+# 代理池为空时等待后台刷新的最长秒数
+REFRESH_WAIT_SECONDS = 10
+
 
 def is_valid_ip(ip: str) -> bool:
     """验证IP地址格式是否正确"""
@@ -159,6 +169,7 @@ class ProxyInfo:
         self.response_times = []  # 响应时间记录
         self.last_score = 100.0  # 初始评分100分
         self.consecutive_failures = 0  # 连续失败次数
+        self.health = None  # 健康检查记录（ProxyHealth），未检查时为None
         
         logger.debug(f"成功解析代理: {proxy_str}")
     
@@ -172,9 +183,13 @@ class ProxyInfo:
         """计算代理质量评分"""
         score = 100.0
         
-        # 1. 响应时间评分 (占比30分)
-        if self.response_times:
+        # 1. 响应时间评分 (占比30分)：有健康检查记录时使用其延迟中位数
+        avg_response_time = None
+        if self.health is not None and self.health.latency.count:
+            avg_response_time = self.health.latency.percentile(0.5)
+        elif self.response_times:
             avg_response_time = sum(self.response_times) / len(self.response_times)
+        if avg_response_time is not None:
             if avg_response_time < 1:  # 1秒以内
                 time_score = 30
             elif avg_response_time < 2:  # 1-2秒
@@ -192,6 +207,10 @@ class ProxyInfo:
         # 3. 连续失败惩罚 (每次失败-5分)
         score -= self.consecutive_failures * 5
         
+        # 健康检查失败惩罚 (成功窗口内失败比例 × 20分)
+        if self.health is not None and self.health.samples:
+            score -= (1 - self.health.success_rate) * 20
+        
         # 4. 使用频率评分 (占比30分)
         if self.use_count > 0:
             usage_score = 30 * (1 - (self.use_count / 100))  # 使用100次后分数为0
@@ -280,11 +299,24 @@ class ProxyPool:
             logger.error(f"请检查订单号: {secret_id[:8]}... 和密钥配置是否正确")
             self.client = None
         
+        # proxies 整体替换而不原地修改（双缓冲），读取方无需加锁即可得到一致的快照
         self.proxies: List[ProxyInfo] = []
         self.lock = threading.Lock()
         self.running = False
         self.check_thread = None
         
+        # 按评分排序的最大堆：[-评分, 序号, 代理]，代理为None表示该条目已失效（惰性删除）
+        self._heap: List[list] = []
+        self._heap_entries: Dict[int, list] = {}
+        self._heap_seq = itertools.count()
+        
+        # 后台线程：刷新代理、写入缓存（网络和文件I/O都不在 self.lock 内进行）
+        self._wake = threading.Event()
+        self._refresh_requested = False
+        self._refresh_done = threading.Event()
+        self._cache_dirty = False
+        self._next_health_check = 0.0
+        
         # 是否使用隧道代理
         self.use_tunnel = bool(self.username and self.password)
         
@@ -305,18 +337,18 @@ class ProxyPool:
             # 首先加载本地缓存
             cached_proxies = self._load_proxy_cache()
             if cached_proxies:
-                with self.lock:
-                    self.proxies = cached_proxies
+                self._install_proxies(cached_proxies)
                 logger.info(f"从本地缓存加载了 {len(cached_proxies)} 个代理")
             
             self.running = True
-            self.check_thread = threading.Thread(target=self._check_loop, daemon=True)
+            self.check_thread = threading.Thread(target=self._check_loop, name='proxy-pool-refresher', daemon=True)
             self.check_thread.start()
             logger.info("代理池已启动")
     
     def stop(self):
         """停止代理池"""
         self.running = False
+        self._wake.set()
         if self.check_thread:
             self.check_thread.join()
         # 保存代理缓存
@@ -324,9 +356,10 @@ class ProxyPool:
         logger.info("代理池已停止")
     
     def _save_proxy_cache(self):
-        """保存代理缓存到本地文件"""
+        """保存代理缓存到本地文件（在锁内取快照，在锁外写临时文件后替换）"""
         try:
             with self.lock:
+                self._cache_dirty = False
                 cache_data = []
                 for proxy in self.proxies:
                     if not proxy.is_overused and proxy.last_score > 30:  # 只保存好代理
@@ -342,11 +375,13 @@ class ProxyPool:
                             'last_score': proxy.last_score,
                             'consecutive_failures': proxy.consecutive_failures
                         })
-                
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                
-                logger.info(f"已保存 {len(cache_data)} 个代理到本地缓存")
+            
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+            
+            logger.info(f"已保存 {len(cache_data)} 个代理到本地缓存")
         except Exception as e:
             logger.error(f"保存代理缓存失败: {e}")
     
@@ -393,14 +428,119 @@ class ProxyPool:
             return []
     
     def _check_loop(self):
-        """代理检查循环"""
+        """代理检查循环：定期或按需刷新代理，定期检查代理健康状况，缓存有改动时写入文件"""
+        next_check = 0.0
         while self.running:
+            timeout = min(max(0.0, min(next_check, self._next_health_check) - time.time()), CACHE_SAVE_INTERVAL)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if not self.running:
+                break
             try:
-                self._refresh_proxies()
-                time.sleep(self.check_interval)
+                if self._cache_dirty:
+                    self._save_proxy_cache()
+                if self._refresh_requested or time.time() >= next_check:
+                    self._refresh_requested = False
+                    try:
+                        self._refresh_proxies()
+                    finally:
+                        self._refresh_done.set()
+                    next_check = time.time() + self.check_interval
+                if time.time() >= self._next_health_check:
+                    self._check_health()
             except Exception as e:
                 logger.error(f"代理检查循环出错: {e}")
-                time.sleep(60)
+                next_check = time.time() + 60
+    
+    def _request_refresh(self):
+        """请求后台线程刷新代理（不等待）"""
+        self._refresh_requested = True
+        self._refresh_done.clear()
+        self._wake.set()
+    
+    # ---- 健康检查（网络请求不在 self.lock 内进行） ----
+    
+    def _health_check_interval(self) -> float:
+        from .config import crawler_config
+        return float(crawler_config.get_config('proxy_health_settings.interval') or 300)
+    
+    def _check_health(self):
+        """并发检查代理池中的代理，更新评分并移除不健康的代理"""
+        self._next_health_check = time.time() + self._health_check_interval()
+        checker = get_health_checker()
+        proxies = self.proxies  # 快照
+        if checker is None or not proxies:
+            return
+        results = checker.check_all([proxy.proxy_dict for proxy in proxies])
+        evicted = []
+        with self.lock:
+            for proxy in proxies:
+                health = results.get(proxy_key(proxy.proxy_dict))
+                if health is None or id(proxy) not in self._heap_entries:
+                    continue  # 检查期间已离开代理池
+                proxy.health = health
+                if checker.is_healthy(health):
+                    self._rescore_locked(proxy)
+                else:
+                    self._discard_locked(proxy)
+                    evicted.append(proxy)
+            if evicted:
+                self._cache_dirty = True
+        if evicted:
+            checker.forget(proxy_key(proxy.proxy_dict) for proxy in evicted)
+            logger.info(f"健康检查移除 {len(evicted)} 个慢代理或不可用代理："
+                        f"{', '.join(f'{p.ip}:{p.port}' for p in evicted)}")
+            self._request_refresh()
+    
+    def _filter_healthy(self, proxies: List[ProxyInfo]) -> List[ProxyInfo]:
+        """新代理入池前的准入检查，只保留健康的代理"""
+        checker = get_health_checker()
+        if checker is None or not proxies:
+            return proxies
+        results = checker.check_all([proxy.proxy_dict for proxy in proxies])
+        healthy = []
+        for proxy in proxies:
+            proxy.health = results.get(proxy_key(proxy.proxy_dict))
+            if checker.is_healthy(proxy.health):
+                healthy.append(proxy)
+        if len(healthy) < len(proxies):
+            logger.info(f"准入检查剔除 {len(proxies) - len(healthy)} 个慢代理或不可用代理")
+        return healthy
+    
+    # ---- 评分堆（调用方持有 self.lock） ----
+    
+    def _push_locked(self, proxy: ProxyInfo):
+        entry = [-proxy.calculate_score(), next(self._heap_seq), proxy]
+        self._heap_entries[id(proxy)] = entry
+        heapq.heappush(self._heap, entry)
+    
+    def _rescore_locked(self, proxy: ProxyInfo):
+        """代理统计变化后重新入堆（O(log n)，其他代理的评分不受影响）"""
+        entry = self._heap_entries.pop(id(proxy), None)
+        if entry is None:
+            return  # 已不在代理池中
+        entry[2] = None
+        self._push_locked(proxy)
+        # 失效条目过多时重建堆
+        if len(self._heap) > 4 * max(1, len(self._heap_entries)):
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+    
+    def _discard_locked(self, proxy: ProxyInfo):
+        """从代理池移除代理（生成新列表）"""
+        entry = self._heap_entries.pop(id(proxy), None)
+        if entry is not None:
+            entry[2] = None
+        self.proxies = [p for p in self.proxies if p is not proxy]
+    
+    def _install_proxies(self, proxies: List[ProxyInfo]):
+        """整体替换代理列表并重建评分堆"""
+        with self.lock:
+            self.proxies = list(proxies)
+            self._heap = []
+            self._heap_entries = {}
+            for proxy in self.proxies:
+                self._push_locked(proxy)
     
     def _refresh_proxies(self):
         """刷新代理列表"""
@@ -478,8 +618,7 @@ class ProxyPool:
                     try:
                         cached_proxies = self._load_proxy_cache()
                         if cached_proxies:
-                            with self.lock:
-                                self.proxies = cached_proxies
+                            self._install_proxies(cached_proxies)
                             logger.info(f"从本地缓存文件加载了 {len(cached_proxies)} 个代理，将继续工作")
                             return
                     except Exception as cache_error:
@@ -514,8 +653,7 @@ class ProxyPool:
                     try:
                         cached_proxies = self._load_proxy_cache()
                         if cached_proxies:
-                            with self.lock:
-                                self.proxies = cached_proxies
+                            self._install_proxies(cached_proxies)
                             logger.info(f"从本地缓存文件加载了 {len(cached_proxies)} 个代理，将继续工作")
                             return
                     except Exception:
@@ -532,8 +670,7 @@ class ProxyPool:
                     try:
                         cached_proxies = self._load_proxy_cache()
                         if cached_proxies:
-                            with self.lock:
-                                self.proxies = cached_proxies
+                            self._install_proxies(cached_proxies)
                             logger.info(f"从本地缓存文件加载了 {len(cached_proxies)} 个代理，将继续工作")
                             return
                     except Exception:
@@ -587,19 +724,19 @@ class ProxyPool:
                     invalid_count += 1
             
             logger.info(f"代理解析完成: 成功 {len(new_proxies)} 个, 无效 {invalid_count} 个")
+            new_proxies = self._filter_healthy(new_proxies)
             
-            with self.lock:
-                # 保留现有的好代理
-                existing_good_proxies = [p for p in self.proxies if not p.is_overused and p.last_score > 30]
-                
-                # 合并新旧代理，但限制总数
-                all_proxies = existing_good_proxies + new_proxies
-                if len(all_proxies) > self.max_proxies:
-                    # 按评分排序，保留最好的代理
-                    all_proxies.sort(key=lambda p: p.last_score, reverse=True)
-                    self.proxies = all_proxies[:self.max_proxies]
-                else:
-                    self.proxies = all_proxies
+            # 保留现有的好代理
+            existing_good_proxies = [p for p in self.proxies if not p.is_overused and p.last_score > 30]
+            
+            # 合并新旧代理，但限制总数
+            all_proxies = existing_good_proxies + new_proxies
+            if len(all_proxies) > self.max_proxies:
+                # 按评分排序，保留最好的代理
+                all_proxies.sort(key=lambda p: p.last_score, reverse=True)
+                all_proxies = all_proxies[:self.max_proxies]
+            self._install_proxies(all_proxies)
+            self._cache_dirty = True
                     
             logger.info(f"代理池更新完成，当前代理数量: {len(self.proxies)}，其中新代理: {len(new_proxies)}")
             
@@ -608,63 +745,70 @@ class ProxyPool:
             import traceback
             logger.error(f"详细错误信息: {traceback.format_exc()}")
     
+    def _select_locked(self) -> Optional[ProxyInfo]:
+        """从评分堆中选择代理：80%概率选择最高分，20%概率随机选择其他代理"""
+        while self._heap:
+            top = self._heap[0][2]
+            if top is None:
+                heapq.heappop(self._heap)
+            elif top.is_overused:
+                # 移除过度使用的代理
+                heapq.heappop(self._heap)
+                self._discard_locked(top)
+            else:
+                break
+        if not self._heap:
+            return None
+        
+        top = self._heap[0][2]
+        if len(self.proxies) > 1 and random.random() >= 0.8:
+            for _ in range(3):
+                other = random.choice(self.proxies)
+                if other is not top and not other.is_overused:
+                    return other
+        return top
+    
     def get_proxy(self) -> Optional[ProxyInfo]:
-        """获取一个可用代理（智能选择策略）"""
+        """获取一个可用代理（智能选择策略，不在锁内访问网络）"""
         with self.lock:
-            if not self.proxies:
-                # 尝试从本地缓存加载
-                cached_proxies = self._load_proxy_cache()
-                if cached_proxies:
-                    self.proxies = cached_proxies
-                    logger.info(f"从本地缓存加载了 {len(cached_proxies)} 个代理")
-                else:
-                    # 如果本地缓存也没有，则获取新代理
-                    self._refresh_proxies()
-            
-            if not self.proxies:
-                return None
-            
-            # 移除过度使用的代理
-            self.proxies = [p for p in self.proxies if not p.is_overused]
-            
-            if not self.proxies:
-                # 如果所有代理都过度使用，尝试获取新代理
+            proxy = self._select_locked()
+            if proxy is None:
+                self._request_refresh()
+        
+        if proxy is None:
+            # 代理池为空：先尝试本地缓存，再等待后台刷新
+            cached_proxies = self._load_proxy_cache()
+            if cached_proxies:
+                self._install_proxies(cached_proxies)
+                logger.info(f"从本地缓存加载了 {len(cached_proxies)} 个代理")
+            elif self.running:
+                self._refresh_done.wait(REFRESH_WAIT_SECONDS)
+            else:
                 self._refresh_proxies()
-                if not self.proxies:
-                    return None
-            
-            # 根据评分选择代理
-            scored_proxies = [(p, p.calculate_score()) for p in self.proxies]
-            scored_proxies.sort(key=lambda x: x[1], reverse=True)  # 按评分降序排序
-            
-            # 选择策略：优先使用本地保存的好代理
-            if len(scored_proxies) > 0:
-                # 80%概率选择最高分，20%概率随机选择其他代理
-                if random.random() < 0.8:
-                    proxy = scored_proxies[0][0]  # 选择最高分代理
-                else:
-                    # 随机选择其他代理（如果有的话）
-                    other_proxies = scored_proxies[1:] if len(scored_proxies) > 1 else scored_proxies
-                    proxy = random.choice(other_proxies)[0] if other_proxies else scored_proxies[0][0]
-                
-                # 更新使用时间
-                proxy.mark_used()
-                
-                # 定期保存代理缓存（每10次使用保存一次）
-                if proxy.use_count % 10 == 0:
-                    self._save_proxy_cache()
-                
-                return proxy
+            with self.lock:
+                proxy = self._select_locked()
+            if proxy is None:
+                return None
+        
+        with self.lock:
+            # 更新使用时间
+            proxy.mark_used()
+            self._rescore_locked(proxy)
             
-            return None
+            # 定期保存代理缓存（每10次使用标记一次，由后台线程写入）
+            if proxy.use_count % 10 == 0:
+                self._cache_dirty = True
+        return proxy
     
     def report_proxy_result(self, proxy: ProxyInfo, success: bool, response_time: Optional[float] = None):
-        """报告代理使用结果"""
+        """报告代理使用结果（增量更新该代理的评分）"""
         if proxy:
-            proxy.mark_used(success, response_time)
-            # 如果代理评分过低或连续失败，触发刷新
+            with self.lock:
+                proxy.mark_used(success, response_time)
+                self._rescore_locked(proxy)
+            # 如果代理评分过低或连续失败，请求后台刷新
             if proxy.last_score < 30 or proxy.consecutive_failures >= 3:
-                self._refresh_proxies()
+                self._request_refresh()
     
     def get_proxy_dict(self) -> Optional[Dict[str, str]]:
         """获取代理字典格式"""
@@ -674,51 +818,52 @@ class ProxyPool:
     def get_proxy_stats(self) -> Dict:
         """获取代理统计信息"""
         try:
-            with self.lock:
-                active_proxies = [p for p in self.proxies if not p.is_overused]
-                proxy_details = []
-                
-                for p in self.proxies:
-                    try:
-                        # 安全计算平均响应时间
-                        avg_response_time = None
-                        if p.response_times and len(p.response_times) > 0:
-                            avg_response_time = sum(p.response_times) / len(p.response_times)
-                        
-                        # 安全格式化最后使用时间
-                        last_used = None
-                        if p.last_used_at:
-                            try:
-                                last_used = p.last_used_at.strftime('%Y-%m-%d %H:%M:%S')
-                            except:
-                                last_used = '未知'
-                        
-                        proxy_details.append({
-                            'ip': p.ip,
-                            'port': p.port,
-                            'age_seconds': p.age_seconds,
-                            'use_count': p.use_count,
-                            'success_rate': p.success_rate,
-                            'score': p.last_score,
-                            'avg_response_time': avg_response_time,
-                            'consecutive_failures': p.consecutive_failures,
-                            'last_used': last_used
-                        })
-                    except Exception as e:
-                        # 如果单个代理信息获取失败，跳过它
-                        logger.warning(f"获取代理 {p.ip}:{p.port} 统计信息失败: {e}")
-                        continue
-                
-                return {
-                    'total_proxies': len(self.proxies),
-                    'active_proxies': len(active_proxies),
-                    'pool_size': len(self.proxies),  # 兼容性字段
-                    'available_proxies': len(active_proxies),  # 兼容性字段
-                    'running': self.running,
-                    'check_interval': self.check_interval,
-                    'last_refresh': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'proxy_details': proxy_details
-                }
+            proxies = self.proxies  # 快照（列表整体替换，不会被原地修改）
+            active_proxies = [p for p in proxies if not p.is_overused]
+            proxy_details = []
+            
+            for p in proxies:
+                try:
+                    # 安全计算平均响应时间
+                    avg_response_time = None
+                    if p.response_times and len(p.response_times) > 0:
+                        avg_response_time = sum(p.response_times) / len(p.response_times)
+                    
+                    # 安全格式化最后使用时间
+                    last_used = None
+                    if p.last_used_at:
+                        try:
+                            last_used = p.last_used_at.strftime('%Y-%m-%d %H:%M:%S')
+                        except:
+                            last_used = '未知'
+                    
+                    proxy_details.append({
+                        'ip': p.ip,
+                        'port': p.port,
+                        'age_seconds': p.age_seconds,
+                        'use_count': p.use_count,
+                        'success_rate': p.success_rate,
+                        'score': p.last_score,
+                        'avg_response_time': avg_response_time,
+                        'consecutive_failures': p.consecutive_failures,
+                        'last_used': last_used,
+                        'health': p.health.to_dict() if p.health is not None else None
+                    })
+                except Exception as e:
+                    # 如果单个代理信息获取失败，跳过它
+                    logger.warning(f"获取代理 {p.ip}:{p.port} 统计信息失败: {e}")
+                    continue
+            
+            return {
+                'total_proxies': len(proxies),
+                'active_proxies': len(active_proxies),
+                'pool_size': len(proxies),  # 兼容性字段
+                'available_proxies': len(active_proxies),  # 兼容性字段
+                'running': self.running,
+                'check_interval': self.check_interval,
+                'last_refresh': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'proxy_details': proxy_details
+            }
         except Exception as e:
             logger.error(f"获取代理统计信息失败: {e}")
             return {
@@ -759,6 +904,8 @@ class ProxyManager:
     
     def initialize(self, config_file: str) -> bool:
         """初始化代理池（支持加密配置）"""
+        # 账号或隧道模式可能已变化：丢弃按旧配置租用的代理，租约池下次使用时按新配置重建
+        reset_lease_manager()
         if config_file and os.path.exists(config_file):
             try:
                 # 尝试使用SecureConfig读取（自动解密敏感信息）
@@ -930,8 +1077,8 @@ _global_proxy_fail_count = 0
 _global_max_fail_count = 3  # 最大失败次数后切换代理
 
 
-def _fetch_direct_proxy_from_kdl() -> Optional[Dict[str, str]]:
-    """直接调用快代理获取最新代理（跳过本地代理池缓存）"""
+def _fetch_proxies_from_kdl(num: int = 1) -> List[Dict[str, str]]:
+    """直接调用快代理批量获取最新代理（跳过本地代理池缓存）"""
     manager = _proxy_manager
 
     client = getattr(manager, 'client', None)
@@ -942,7 +1089,7 @@ def _fetch_direct_proxy_from_kdl() -> Optional[Dict[str, str]]:
 
     if not client:
         logger.warning("直接获取代理失败：快代理客户端未配置")
-        return None
+        return []
 
     use_tunnel = getattr(manager, 'use_tunnel', False)
     username = getattr(manager, 'username', '')
@@ -951,33 +1098,88 @@ def _fetch_direct_proxy_from_kdl() -> Optional[Dict[str, str]]:
     try:
         if use_tunnel:
             raw_data = client.get_tps(
-                num=1,
+                num=num,
                 username=username,
                 password=password
             )
         else:
-            raw_data = client.get_dps(num=1)
+            raw_data = client.get_dps(num=num)
 
         if not raw_data:
             logger.warning("快代理未返回可用IP")
-            return None
-
-        proxy_entry = raw_data
-        if isinstance(raw_data, (list, tuple)):
-            proxy_entry = raw_data[0] if raw_data else None
+            return []
 
-        if isinstance(proxy_entry, (list, tuple)):
-            proxy_entry = proxy_entry[0] if proxy_entry else None
+        entries = raw_data if isinstance(raw_data, (list, tuple)) else [raw_data]
+        proxies = []
+        for entry in entries:
+            if isinstance(entry, (list, tuple)):
+                entry = entry[0] if entry else None
+            if isinstance(entry, str):
+                lines = [line.strip() for line in entry.splitlines() if line.strip()]
+            else:
+                lines = [entry] if entry else []
+            for line in lines:
+                try:
+                    proxies.append(ProxyInfo(line).proxy_dict)
+                except ValueError as exc:
+                    logger.warning("跳过无效代理数据: %s (%s)", line, exc)
 
-        if not proxy_entry:
+        if not proxies:
             logger.warning("快代理返回数据格式异常: %s", raw_data)
-            return None
-
-        proxy_info = ProxyInfo(proxy_entry)
-        return proxy_info.proxy_dict
+        return proxies
     except Exception as exc:  # noqa: BLE001
         logger.error("直接从快代理获取代理失败: %s", exc, exc_info=True)
-        return None
+        return []
+
+
+def _fetch_direct_proxy_from_kdl() -> Optional[Dict[str, str]]:
+    """直接调用快代理获取一个最新代理"""
+    proxies = _fetch_proxies_from_kdl(1)
+    return proxies[0] if proxies else None
+
+
+_lease_manager: Optional[ProxyLeaseManager] = None
+
+
+def reset_lease_manager() -> None:
+    """停止并丢弃共享代理租约管理器（代理配置重新初始化或代理被禁用时调用）"""
+    global _lease_manager, _global_current_proxy
+    with _global_proxy_lock:
+        manager, _lease_manager = _lease_manager, None
+        _global_current_proxy = None
+    if manager is not None:
+        # 在锁外停止：补充线程可能正在获取代理
+        manager.stop()
+        logger.info("代理租约池已重置")
+
+
+def _validate_lease_proxies(proxy_dicts: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """租约池准入检查：并发检查新获取的代理，剔除慢代理和不可用代理（未启用健康检查时全部保留）"""
+    checker = get_health_checker()
+    return checker.filter_healthy(proxy_dicts) if checker is not None else proxy_dicts
+
+
+def get_lease_manager() -> ProxyLeaseManager:
+    """获取共享代理租约管理器（参数见爬虫配置 proxy_lease_settings）"""
+    global _lease_manager
+    if _lease_manager is not None:
+        return _lease_manager
+    with _global_proxy_lock:
+        if _lease_manager is None:
+            from .config import crawler_config
+            settings = crawler_config.get_config('proxy_lease_settings') or {}
+            _lease_manager = ProxyLeaseManager(
+                _fetch_proxies_from_kdl,
+                batch_size=settings.get('batch_size', 5),
+                proxy_ttl=settings.get('proxy_ttl', 180),
+                max_concurrency=settings.get('max_concurrency', 4),
+                refill_ahead=settings.get('refill_ahead', 30),
+                max_failures=settings.get('max_failures', _global_max_fail_count),
+                validator=_validate_lease_proxies,
+                tunnel=getattr(_proxy_manager, 'use_tunnel', False),
+            )
+            _lease_manager.start()
+    return _lease_manager
 
 
 def initialize_proxy_pool(config_file: str):
@@ -1000,12 +1202,13 @@ def get_proxy_stats() -> Dict:
 
 def set_global_proxy_enabled(enabled: bool):
     """设置全局代理启用状态"""
-    global _global_proxy_enabled
+    global _global_proxy_enabled, _global_proxy_fail_count
     with _global_proxy_lock:
         _global_proxy_enabled = enabled
         if not enabled:
-            _global_current_proxy = None
             _global_proxy_fail_count = 0
+    if not enabled:
+        reset_lease_manager()
 
 
 def is_global_proxy_enabled() -> bool:
@@ -1013,24 +1216,29 @@ def is_global_proxy_enabled() -> bool:
     return _global_proxy_enabled
 
 
-def get_shared_proxy() -> Optional[Dict[str, str]]:
-    """获取共享代理（直接向快代理请求最新IP，不使用本地代理池缓存）"""
+def get_shared_proxy(rotate: bool = False) -> Optional[Dict[str, str]]:
+    """
+    获取共享代理（从代理租约池中为当前线程租用，不直接请求快代理）
+
+    Args:
+        rotate: 换用与当前线程上一个代理不同的代理（会话被限制访问时使用）
+    """
     global _global_current_proxy, _global_proxy_fail_count
 
     if not _global_proxy_enabled:
         return None
 
-    proxy_dict = _fetch_direct_proxy_from_kdl()
+    proxy_dict = get_lease_manager().acquire(rotate=rotate)
     if proxy_dict:
         with _global_proxy_lock:
             _global_current_proxy = proxy_dict.copy()
             _global_proxy_fail_count = 0
         return proxy_dict
 
-    # 如果直接获取失败，保留原有退化逻辑，尽量保证服务不断
+    # 如果租约池没有可用代理，保留原有退化逻辑，尽量保证服务不断
     with _global_proxy_lock:
         if _global_current_proxy:
-            logger.warning("直接获取代理失败，继续使用上一次代理")
+            logger.warning("租约池无可用代理，继续使用上一次代理")
             return _global_current_proxy
 
     try:
@@ -1038,7 +1246,7 @@ def get_shared_proxy() -> Optional[Dict[str, str]]:
         if fallback_proxy:
             with _global_proxy_lock:
                 _global_current_proxy = fallback_proxy.copy()
-            logger.warning("直接获取代理失败，回退至代理池缓存")
+            logger.warning("租约池无可用代理，回退至代理池缓存")
             return fallback_proxy
     except Exception as exc:  # noqa: BLE001
         logger.error("回退获取代理失败: %s", exc, exc_info=True)
@@ -1046,13 +1254,21 @@ def get_shared_proxy() -> Optional[Dict[str, str]]:
     return None
 
 
+def release_shared_proxy():
+    """归还当前线程租用的共享代理（线程结束前调用）"""
+    if _lease_manager is not None:
+        _lease_manager.release()
+
+
 def report_shared_proxy_result(success: bool):
-    """报告共享代理使用结果"""
+    """报告共享代理使用结果（当前线程所租代理连续失败达到上限时下线）"""
     global _global_proxy_fail_count
     
     if not _global_proxy_enabled:
         return
     
+    if _lease_manager is not None:
+        _lease_manager.report(success)
     with _global_proxy_lock:
         if success:
             _global_proxy_fail_count = 0  # 成功时重置失败计数
@@ -1067,5 +1283,6 @@ def get_shared_proxy_status() -> Dict:
         'enabled': _global_proxy_enabled,
         'current_proxy': _global_current_proxy,
         'fail_count': _global_proxy_fail_count,
-        'max_fail_count': _global_max_fail_count
-    } 
\ No newline at end of file
+        'max_fail_count': _global_max_fail_count,
+        'leases': _lease_manager.get_status() if _lease_manager is not None else None
+    }
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按代理划分的会话注册表
+每个代理（出口IP）对应一个 requests.Session：独立的连接池（HTTPAdapter）和 Cookie，
+会话创建时绑定代理，之后不再修改 session.proxies。
+
+换用代理只是切换到另一个代理的会话：原会话的 keep-alive/TLS 连接和 Cookie 保留，
+换回该代理时继续使用；不同出口IP之间不会混用 Cookie。
+被目标网站限制访问的会话调用 retire() 丢弃，该代理下次使用时重新建立会话。
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import crawler_config
+from .proxy_verifier import proxy_key
+
+logger = logging.getLogger(__name__)
+
+# 不使用代理（直接连接）的会话标识
+DIRECT = 'direct'
+
+
+def session_key(proxy_dict: Optional[Dict[str, str]]) -> str:
+    """会话标识：代理的 host:port，直接连接时为 DIRECT"""
+    return proxy_key(proxy_dict) if proxy_dict else DIRECT
+
+
+class ProxySessionRegistry:
+    """代理会话注册表（线程安全）"""
+
+    def __init__(self, setup: Optional[Callable[[requests.Session], None]] = None,
+                 pool_maxsize: Optional[int] = None, max_sessions: Optional[int] = None):
+        """
+        Args:
+            setup: setup(session) 配置新建的会话（请求头、Cookie 等），在锁外调用
+            pool_maxsize: 每个会话连接池的最大连接数，None 时读取配置 proxy_session_settings.pool_maxsize
+            max_sessions: 最多保留的会话数，超过时丢弃最久未使用的会话，
+                          None 时读取配置 proxy_session_settings.max_sessions
+        """
+        settings = crawler_config.get_config('proxy_session_settings') or {}
+        self.setup = setup
+        self.pool_maxsize = int(pool_maxsize or settings.get('pool_maxsize') or 8)
+        self.max_sessions = int(max_sessions or settings.get('max_sessions') or 32)
+        self._lock = threading.Lock()
+        self._sessions: 'OrderedDict[str, requests.Session]' = OrderedDict()
+
+    def _new_session(self, proxy_dict: Optional[Dict[str, str]]) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if proxy_dict:
+            session.proxies.update(proxy_dict)
+        if self.setup is not None:
+            self.setup(session)
+        return session
+
+    def get(self, proxy_dict: Optional[Dict[str, str]]) -> Tuple[requests.Session, bool]:
+        """
+        获取代理对应的会话，没有时新建
+
+        Returns:
+            (会话, 是否新建)
+        """
+        key = session_key(proxy_dict)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session, False
+
+        session = self._new_session(proxy_dict)
+        with self._lock:
+            existing = self._sessions.get(key)
+            if existing is not None:  # 其他线程已同时建立
+                self._sessions.move_to_end(key)
+                return existing, False
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                # 只移出注册表，不关闭：其他线程可能仍在使用
+                self._sessions.popitem(last=False)
+        logger.debug(f"新建代理会话: {key}")
+        return session, True
+
+    def retire(self, session: Optional[requests.Session]) -> None:
+        """丢弃会话（被限制访问等），该代理下次使用时重新建立会话"""
+        if session is None:
+            return
+        with self._lock:
+            for key, existing in list(self._sessions.items()):
+                if existing is session:
+                    del self._sessions[key]
+                    logger.debug(f"丢弃代理会话: {key}")
+                    break
+
+    def close(self) -> None:
+        """关闭所有会话"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"关闭会话失败: {e}")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -2,16 +2,27 @@
 # -*- coding: utf-8 -*-
 """
 代理验证工具模块
-用于验证代理是否真正被使用
+用于验证代理是否真正被使用，以及并发检查代理健康状况（延迟直方图、成功率窗口）
 """
 
+import bisect
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# 延迟直方图的桶上界（秒），最后一个桶收纳更慢的请求
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0)
+DEFAULT_HEALTH_TARGET = 'http://httpbin.org/get'
+# 健康记录最多保留的代理数，超过时删除最久未检查的记录
+MAX_TRACKED_PROXIES = 500
+
 
 class ProxyVerifier:
     """代理验证器"""
@@ -179,3 +190,228 @@ class ProxyVerifier:
             logger.warning(f"[代理验证] ⚠ 代理连接测试失败 - {error_msg}")
             return False, error_msg
 
+
+def proxy_key(proxy_dict: Dict[str, str]) -> str:
+    """代理标识（host:port，不含认证信息），用于跨模块对应同一代理"""
+    proxy_url = proxy_dict.get('https') or proxy_dict.get('http') or ''
+    parsed = urlparse(proxy_url if '://' in proxy_url else f'http://{proxy_url}')
+    if parsed.hostname and parsed.port:
+        return f"{parsed.hostname}:{parsed.port}"
+    return parsed.hostname or proxy_url
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（计数累积，不保存原始样本）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p 分位延迟所在桶的上界（落在最后一个桶时返回最大上界的两倍）；没有样本时返回None"""
+        if not self.count:
+            return None
+        rank = p * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.buckets[-1] * 2
+        return self.buckets[-1] * 2
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> Dict:
+        labels = [f"<={bound}s" for bound in self.buckets] + [f">{self.buckets[-1]}s"]
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class ProxyHealth:
+    """单个代理的健康记录：延迟直方图 + 最近若干次检查的成功窗口"""
+
+    def __init__(self, window: int = 20):
+        self.latency = LatencyHistogram()
+        self.results = deque(maxlen=window)
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def record(self, success: bool, latency: Optional[float] = None, error: Optional[str] = None) -> None:
+        self.results.append(bool(success))
+        if success and latency is not None:
+            self.latency.record(latency)
+        self.last_error = None if success else error
+        self.last_checked = time.time()
+
+    @property
+    def samples(self) -> int:
+        return len(self.results)
+
+    @property
+    def success_rate(self) -> float:
+        return sum(self.results) / len(self.results) if self.results else 0.0
+
+    def score(self) -> Optional[float]:
+        """健康评分（0-100）：成功率占70分，p90延迟占30分；没有检查记录时返回None"""
+        if not self.results:
+            return None
+        score = self.success_rate * 70
+        p90 = self.latency.percentile(0.9)
+        if p90 is not None:
+            score += 30 * max(0.0, 1 - p90 / LATENCY_BUCKETS[-1])
+        return round(score, 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            'samples': self.samples,
+            'success_rate': self.success_rate,
+            'score': self.score(),
+            'latency': self.latency.to_dict(),
+            'last_error': self.last_error,
+        }
+
+
+class ProxyHealthChecker:
+    """
+    并发代理健康检查
+    用线程池同时检查一批代理（每个代理一次请求），记录每个代理的延迟直方图和成功窗口，
+    成功率过低或 p90 延迟过高的代理判定为不健康，由代理池在分配之前移除。
+    """
+
+    def __init__(self, target_url: str = DEFAULT_HEALTH_TARGET, timeout: float = 5.0, workers: int = 8,
+                 window: int = 20, min_samples: int = 1, min_success_rate: float = 0.5,
+                 max_p90: float = 5.0):
+        """
+        Args:
+            target_url: 检查请求的目标地址（可指向本地服务）
+            timeout: 单次检查超时（秒）
+            workers: 并发检查线程数
+            window: 成功窗口长度（最近检查次数）
+            min_samples: 至少有该次数检查记录后才判定是否健康
+            min_success_rate: 成功窗口内最低成功率
+            max_p90: p90 延迟上限（秒）
+        """
+        self.target_url = target_url
+        self.timeout = float(timeout)
+        self.workers = max(1, int(workers))
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self.min_success_rate = float(min_success_rate)
+        self.max_p90 = float(max_p90)
+        self._lock = threading.Lock()
+        self._health: Dict[str, ProxyHealth] = {}
+
+    def probe(self, proxy_dict: Dict[str, str]) -> Tuple[bool, Optional[float], Optional[str]]:
+        """通过代理请求一次目标地址，返回 (是否成功, 延迟秒数, 错误信息)"""
+        started = time.perf_counter()
+        try:
+            with requests.get(self.target_url, proxies=proxy_dict, timeout=self.timeout, stream=True) as resp:
+                latency = time.perf_counter() - started
+                if resp.status_code == 200:
+                    return True, latency, None
+                return False, latency, f"HTTP状态码: {resp.status_code}"
+        except requests.exceptions.Timeout:
+            return False, None, "连接超时"
+        except Exception as e:  # noqa: BLE001
+            return False, None, str(e)
+
+    def _record(self, key: str, success: bool, latency: Optional[float], error: Optional[str]) -> ProxyHealth:
+        with self._lock:
+            health = self._health.get(key)
+            if health is None:
+                if len(self._health) >= MAX_TRACKED_PROXIES:
+                    oldest = min(self._health, key=lambda k: self._health[k].last_checked or 0)
+                    del self._health[oldest]
+                health = self._health[key] = ProxyHealth(self.window)
+            health.record(success, latency, error)
+        return health
+
+    def check_all(self, proxy_dicts: List[Dict[str, str]]) -> Dict[str, ProxyHealth]:
+        """
+        并发检查一批代理，返回 {代理标识: 健康记录}
+
+        全部检查都失败时更可能是目标地址或本机网络的问题，而不是代理都不可用：
+        本次结果视为无法判定，不记录、返回空字典（调用方保留全部代理）。
+        """
+        if not proxy_dicts:
+            return {}
+        workers = min(self.workers, len(proxy_dicts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='proxy-health') as executor:
+            probes = list(executor.map(self.probe, proxy_dicts))
+        if not any(success for success, _, _ in probes):
+            logger.warning(f"[代理健康检查] {len(probes)} 个代理全部检查失败（{probes[0][2]}），"
+                           f"检查目标可能不可达，本次结果不计入")
+            return {}
+        results = {}
+        for proxy_dict, (success, latency, error) in zip(proxy_dicts, probes):
+            key = proxy_key(proxy_dict)
+            results[key] = self._record(key, success, latency, error)
+        unhealthy = sum(1 for health in results.values() if not self.is_healthy(health))
+        logger.info(f"[代理健康检查] 检查 {len(results)} 个代理，不健康 {unhealthy} 个")
+        return results
+
+    def is_healthy(self, health: Optional[ProxyHealth]) -> bool:
+        """检查记录不足时视为健康"""
+        if health is None or health.samples < self.min_samples:
+            return True
+        if health.success_rate < self.min_success_rate:
+            return False
+        p90 = health.latency.percentile(0.9)
+        return p90 is None or p90 <= self.max_p90
+
+    def get_health(self, proxy_dict: Dict[str, str]) -> Optional[ProxyHealth]:
+        return self._health.get(proxy_key(proxy_dict))
+
+    def filter_healthy(self, proxy_dicts: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """检查一批代理，只返回健康的代理（用于代理入池前的准入检查）"""
+        results = self.check_all(proxy_dicts)
+        return [proxy_dict for proxy_dict in proxy_dicts if self.is_healthy(results.get(proxy_key(proxy_dict)))]
+
+    def forget(self, keys) -> None:
+        """删除代理的健康记录（代理离开代理池后调用）"""
+        with self._lock:
+            for key in keys:
+                self._health.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {key: health.to_dict() for key, health in self._health.items()}
+
+
+_health_checker: Optional[ProxyHealthChecker] = None
+_health_checker_lock = threading.Lock()
+
+
+def get_health_checker() -> Optional[ProxyHealthChecker]:
+    """获取共享的代理健康检查器（参数见爬虫配置 proxy_health_settings），未启用（默认）时返回None"""
+    global _health_checker
+    from .config import crawler_config
+    settings = crawler_config.get_config('proxy_health_settings') or {}
+    if not settings.get('enabled', False):
+        return None
+    with _health_checker_lock:
+        if _health_checker is None:
+            _health_checker = ProxyHealthChecker(
+                target_url=settings.get('target_url') or DEFAULT_HEALTH_TARGET,
+                timeout=settings.get('timeout', 5),
+                workers=settings.get('workers', 8),
+                window=settings.get('window', 20),
+                min_samples=settings.get('min_samples', 1),
+                min_success_rate=settings.get('min_success_rate', 0.5),
+                max_p90=settings.get('max_p90', 5.0),
+            )
+        return _health_checker
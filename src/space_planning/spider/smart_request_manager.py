@@ -17,6 +17,7 @@ from urllib.parse import urlparse
 from .config import crawler_config, AntiDetectionMode
 from .advanced_anti_detection import AdvancedAntiDetection
 from .javascript_fingerprint import JavaScriptFingerprint
+from .http_cache import get_http_cache
 
 class RetryStrategy:
     """智能重试策略"""
@@ -194,19 +195,28 @@ class SmartRequestManager:
         # 准备请求参数
         request_params = self._prepare_request_params(url, method, data, headers)
         
-        # 模拟人类行为
-        self._simulate_behavior()
+        def send(request_headers: Dict) -> requests.Response:
+            # 模拟人类行为
+            self._simulate_behavior()
+            return self._send_request_with_retry(dict(request_params, headers=request_headers))
         
-        # 发送请求
-        response = self._send_request_with_retry(request_params)
+        # 发送请求（命中HTTP缓存时不发送）
+        http_cache = get_http_cache()
+        if http_cache is not None:
+            response = http_cache.request(method, url, send, headers=request_params['headers'], data=data)
+        else:
+            response = send(request_params['headers'])
+        from_cache = getattr(response, 'from_cache', False)
         
         # 记录请求历史
-        self._record_request(url, method, response, time.time() - start_time)
+        if not from_cache:
+            self._record_request(url, method, response, time.time() - start_time)
         
         return response, {
             'response_time': time.time() - start_time,
             'status_code': response.status_code,
-            'mode': crawler_config.get_mode().value
+            'mode': crawler_config.get_mode().value,
+            'from_cache': from_cache
         }
     
     def _prepare_request_params(self, url: str, method: str, data: Optional[Dict], 
@@ -257,8 +267,8 @@ class SmartRequestManager:
                     timeout=request_params['timeout']
                 )
                 
-                # 检查响应状态
-                if response.status_code == 200:
+                # 检查响应状态（304为HTTP缓存的条件请求命中）
+                if response.status_code in (200, 304):
                     return response
                 else:
                     raise requests.RequestException(f"HTTP {response.status_code}")
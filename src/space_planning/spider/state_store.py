@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟写入的状态文件
+请求路径上只标记状态已改动，由后台线程按间隔（或关闭时）把最新状态写入文件：
+多次更新合并为一次写入，写入时先写临时文件再替换，中途退出不会留下半个文件。
+另提供追加式历史日志（JSON Lines），与状态一起批量写入，超过大小上限时轮转。
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+# 历史日志超过该大小时轮转为 .1（只保留一份旧日志）
+HISTORY_MAX_BYTES = 10 * 1024 * 1024
+
+
+class WriteBehindStore:
+    """延迟写入的JSON状态文件（线程安全）"""
+
+    def __init__(self, path: str, snapshot: Callable[[], Dict], history_path: Optional[str] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        Args:
+            path: 状态文件路径
+            snapshot: 返回当前状态的函数，在后台线程中调用（调用方不要在持有其内部锁时调用 flush）
+            history_path: 历史日志路径，None 时不记录历史
+            flush_interval: 写入间隔（秒）
+        """
+        self.path = path
+        self.snapshot = snapshot
+        self.history_path = history_path
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 保证同一时间只有一个线程写文件
+        self._dirty = False
+        self._generation = 0  # discard() 后递增，丢弃进行中的写入
+        self._history: List[Dict] = []
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, name='state-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def mark_dirty(self) -> None:
+        """标记状态已改动（请求路径上只做这一步）"""
+        self._dirty = True
+
+    def append_history(self, record: Dict) -> None:
+        """追加一条历史记录（与状态一起批量写入）"""
+        with self._lock:
+            self._history.append(record)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """立即写入已改动的状态和缓冲的历史记录"""
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, False
+                history, self._history = self._history, []
+                generation = self._generation
+            if history:
+                self._write_history(history)
+            if not dirty:
+                return
+            try:
+                state = self.snapshot()
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"生成状态快照失败: {e}")
+                self._retry_later(generation)
+                return
+            with self._lock:
+                if generation != self._generation:
+                    return  # 写入期间状态已被丢弃
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"保存状态文件失败: {e}")
+                self._retry_later(generation)
+
+    def _retry_later(self, generation: int) -> None:
+        """写入失败时重新标记为已改动（状态已被丢弃时除外）"""
+        with self._lock:
+            if generation == self._generation:
+                self._dirty = True
+
+    def _write_history(self, records: List[Dict]) -> None:
+        try:
+            if os.path.exists(self.history_path) and os.path.getsize(self.history_path) > HISTORY_MAX_BYTES:
+                os.replace(self.history_path, f"{self.history_path}.1")
+            with open(self.history_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"写入历史日志失败: {e}")
+
+    def discard(self, remove_file: bool = True) -> None:
+        """丢弃未写入的状态（历史记录照常写入），可同时删除状态文件"""
+        with self._lock:
+            self._dirty = False
+            self._generation += 1
+        if remove_file:
+            with self._flush_lock:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+
+    def close(self) -> None:
+        """写入剩余数据并停止后台线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
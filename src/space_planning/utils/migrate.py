@@ -11,6 +11,8 @@ import shutil
 import logging
 from datetime import datetime
 
+from ..core import fts
+
 logger = logging.getLogger(__name__)
 
 def find_old_database():
@@ -52,8 +54,8 @@ def migrate_database(old_db_path, new_db_path):
         old_conn = sqlite3.connect(old_db_path)
         old_cursor = old_conn.cursor()
         
-        # 连接新数据库
-        new_conn = sqlite3.connect(new_db_path)
+        # 连接新数据库（注册全文检索分词函数）
+        new_conn = fts.register_functions(sqlite3.connect(new_db_path))
         new_cursor = new_conn.cursor()
         
         # 检查旧数据库表结构
@@ -92,12 +94,8 @@ def migrate_database(old_db_path, new_db_path):
         if 'policy_fts' in old_tables:
             logger.info("迁移全文检索数据...")
             try:
-                # 重新构建全文检索索引
-                new_cursor.execute("DELETE FROM policy_fts")
-                new_cursor.execute("""
-                    INSERT INTO policy_fts(rowid, title, content, level)
-                    SELECT id, title, content, level FROM policy
-                """)
+                # 重新构建全文检索索引（外部内容FTS表使用 rebuild 命令）
+                new_cursor.execute("INSERT INTO policy_fts(policy_fts) VALUES('rebuild')")
                 logger.info("全文检索数据迁移完成")
             except Exception as e:
                 logger.error(f"全文检索数据迁移失败: {e}", exc_info=True)
@@ -119,7 +117,7 @@ def migrate_database(old_db_path, new_db_path):
 def check_database_integrity(db_path):
     """检查数据库完整性"""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = fts.register_functions(sqlite3.connect(db_path))
         cursor = conn.cursor()
         
         # 检查表是否存在
@@ -148,8 +146,30 @@ def check_database_integrity(db_path):
         logger.error(f"数据库完整性检查失败: {e}", exc_info=True)
         return False
 
+def convert_content_storage_main(codec):
+    """转换当前数据库的正文存储格式（压缩/解压）"""
+    from space_planning.core import database as db
+    
+    print(f"=== 正文存储格式转换: {codec} ===")
+    db.init_db()
+    result = db.convert_content_storage(
+        codec, vacuum=True, progress_callback=lambda n: print(f"\r已处理 {n} 条", end='', flush=True))
+    print()
+    if not result['success']:
+        print(f"转换失败: {result.get('error')}")
+        return
+    print(f"处理 {result['total']} 条，转换 {result['converted']} 条")
+    print(f"正文大小: {result['bytes_before'] / 1048576:.1f}MB -> {result['bytes_after'] / 1048576:.1f}MB")
+    if result['codec'] != 'none':
+        print(f"请在配置文件 database 节设置 content_compression={result['codec']}，使新入库的正文同样压缩")
+
 def main():
     """主函数"""
+    # 正文压缩转换：python -m space_planning.utils.migrate --compress-content zstd|zlib|none
+    if len(sys.argv) > 2 and sys.argv[1] == '--compress-content':
+        convert_content_storage_main(sys.argv[2])
+        return
+    
     print("=== 数据库迁移工具 ===")
     print()
     